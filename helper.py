@@ -5,9 +5,10 @@ from path_utils import get_credentials_path, get_token_path
 
 load_dotenv()
 
-def refresh_gmail_token():
+def refresh_gmail_token(token_path=None):
     """
     Refresh Gmail token if expired using unified path system
+    `token_path` selects another account's token (defaults to token.json)
     Returns: (success: bool, message: str, was_refreshed: bool)
     """
     try:
@@ -15,7 +16,8 @@ def refresh_gmail_token():
         from google.auth.transport.requests import Request
         
         # Use unified path system
-        TOKEN_PATH = get_token_path()
+        from pathlib import Path
+        TOKEN_PATH = Path(token_path) if token_path else get_token_path()
         CREDENTIALS_PATH = get_credentials_path()
         
         SCOPES = [
@@ -71,10 +73,11 @@ def check_gmail_api(gmail_toolkit, timeout_seconds: int = 10):
         if service is None:
             return False, "GmailToolkit has no api_resource – authentication not initialized."
 
+        from src.gmail_client import gmail_client
+
         # Try the API call first
         try:
-            labels_resp = service.users().labels().list(userId="me",).execute()
-            labels = labels_resp.get("labels", [])
+            labels = gmail_client(gmail_toolkit).list_labels()
             return True, f"Gmail API OK – found {len(labels)} labels."
             
         except Exception as api_error:
@@ -92,8 +95,7 @@ def check_gmail_api(gmail_toolkit, timeout_seconds: int = 10):
                     service = new_toolkit.api_resource
                     
                     # Try API call again with refreshed token
-                    labels_resp = service.users().labels().list(userId="me",).execute()
-                    labels = labels_resp.get("labels", [])
+                    labels = gmail_client(new_toolkit).list_labels()
                     return True, f"Gmail API OK after token refresh – found {len(labels)} labels."
                     
                 except Exception as retry_error:
@@ -69,6 +69,10 @@ class EmailApp:
                  workflow_model: str = "gpt-4o-mini", 
                  db_path: str = "db/checkpoints.sqlite" ,
                  check_interval: int = 10,
+                 min_check_interval: float = None,
+                 max_check_interval: float = None,
+                 event_budget_ms: float = 8,
+                 backend_process: bool = False,
                  ):
         
         # Initialize components
@@ -80,6 +84,10 @@ class EmailApp:
         # Configuration
         self.workflow_model = workflow_model
         self.check_interval = check_interval
+        self.min_check_interval = min_check_interval
+        self.max_check_interval = max_check_interval
+        self.event_budget_ms = event_budget_ms
+        self.backend_process = backend_process
         
         # Threading
         self.backend_thread = None
@@ -91,6 +99,7 @@ class EmailApp:
         
         # Store initialized components
         self.gmail_tool = None
+        self.api_server = None
 
     def show_startup_progress(self):
         """Show startup progress using the GUI"""
@@ -307,6 +316,20 @@ class EmailApp:
         """Start the email monitoring backend (simplified - health checks already done)"""
         print("==Starting backend==")
         
+        if self.backend_process:
+            # EmailManager runs in a supervised child process; this thread relays its queues
+            from src.backend_process import BackendProcess
+            self.backend = BackendProcess(
+                communicator=self.communicator,
+                model=self.workflow_model,
+                check_interval=self.check_interval,
+                db_path=self.db_path,
+                min_check_interval=self.min_check_interval,
+                max_check_interval=self.max_check_interval
+            )
+            self.backend.run()
+            return
+        
         from src.backend import EmailManager
         
         self.backend = EmailManager(
@@ -314,7 +337,9 @@ class EmailApp:
             communicator=self.communicator,
             gmail_api=self.gmail_tool,
             check_interval=self.check_interval,
-            db_path=self.db_path
+            db_path=self.db_path,
+            min_check_interval=self.min_check_interval,
+            max_check_interval=self.max_check_interval
         )
         
         if not self.backend:
@@ -338,7 +363,7 @@ class EmailApp:
             notification.startup(len(notify_emails), len(pending_emails))
         
         from src.ui.gui import EmailAgentGUI
-        self.gui = EmailAgentGUI(communicator=self.communicator)
+        self.gui = EmailAgentGUI(communicator=self.communicator, event_budget_ms=self.event_budget_ms)
     
     def run(self):
         """Main application entry point (after initialization is complete)"""
@@ -366,6 +391,29 @@ class EmailApp:
         finally:
             self.shutdown()
     
+    def run_headless(self, host: str = "127.0.0.1", port: int = 8765):
+        """Run the backend with the local control API instead of the GUI"""
+        try:
+            self.running = True
+            
+            self.backend_thread = threading.Thread(target=self.start_backend, daemon=True)
+            self.backend_thread.start()
+            print("\n===BACKEND STARTED===")
+            
+            from src.api import serve
+            self.api_server = serve(self.communicator, host, port)
+            print("===CONTROL API STARTED===")
+            
+            # Blocks until interrupted
+            self.api_server.serve_forever()
+            
+        except KeyboardInterrupt:
+            print("\nApplication stopped by user.")
+        except Exception as e:
+            print(f"Application error: {e}")
+        finally:
+            self.shutdown()
+    
     def shutdown(self):
         """Graceful shutdown"""
         from src.email_service import EmailService
@@ -379,6 +427,9 @@ class EmailApp:
             except Exception as e:
                 print(f"Error shutting down GUI: {e}")
         
+        if self.api_server:
+            self.api_server.server_close()
+        
         # Record shutdown in backend if it exists
         if self.backend:
             self.backend.shutdown()
@@ -428,6 +479,7 @@ def main():
         app = EmailApp(
             workflow_model="gpt-4o-mini",
             check_interval=120,
+            backend_process=os.environ.get("BACKEND_PROCESS", "").lower() in ("1", "true", "yes"),
         )
         
         # Show startup progress and initialize
@@ -450,5 +502,49 @@ def main():
         sys.exit(1)
 
 
+def main_headless():
+    """Run without Tk (no setup wizard, no GUI); control through the local HTTP API"""
+    try:
+        print("=== SmartEmailBot HEADLESS STARTUP ===")
+        load_environment()
+        
+        from path_utils import get_credentials_path, get_token_path
+        missing = [path.name for path in (get_credentials_path(), get_token_path()) if not path.exists()]
+        if missing:
+            print(f"Missing {', '.join(missing)}. Run setup.py (or the GUI once) first.")
+            sys.exit(1)
+        
+        app = EmailApp(
+            workflow_model="gpt-4o-mini",
+            check_interval=120,
+            backend_process=os.environ.get("BACKEND_PROCESS", "").lower() in ("1", "true", "yes"),
+        )
+        
+        # Same health checks as the GUI startup, minus the progress screen
+        app.load_config_step()
+        app.init_gmail_step()
+        app.check_openai_step()
+        
+        app.run_headless(
+            host=os.environ.get("API_HOST", "127.0.0.1"),
+            port=int(os.environ.get("API_PORT", "8765")),
+        )
+        
+    except Exception as e:
+        print(f"Failed to start headless application: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    main()
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
+    if "--batch" in sys.argv:
+        from src.batch import main as main_batch
+        sys.exit(main_batch([arg for arg in sys.argv[1:] if arg != "--batch"]))
+    elif "--headless" in sys.argv:
+        main_headless()
+    else:
+        main()
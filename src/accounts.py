@@ -0,0 +1,118 @@
+"""
+Gmail accounts monitored by the backend.
+
+Extra mailboxes are listed in accounts.json next to token.json:
+
+    [
+        {"name": "work", "email": "me@work.com", "token": "token_work.json"},
+        {"name": "home", "email": "me@home.com", "token": "token_home.json",
+         "source": {"type": "imap", "host": "imap.gmail.com", "user": "me@home.com",
+                    "password_env": "IMAP_PASSWORD_HOME"}},
+        {"name": "archive", "email": "me@work.com", "token": "token_work.json",
+         "source": {"type": "mbox", "path": "~/Mail/2019.mbox"}}
+    ]
+
+File sources ("mbox", "maildir", "eml") replay a local archive once through the
+same pipeline, e.g. to backfill-classify old mail.
+
+Without that file the backend monitors a single account from MY_EMAIL and
+token.json, exactly as before.
+"""
+import os
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from path_utils import get_app_dir, get_credentials_path, get_token_path
+
+DEFAULT_ACCOUNT = "default"
+
+GMAIL_SCOPES = [
+    "https://www.googleapis.com/auth/gmail.readonly",
+    "https://www.googleapis.com/auth/gmail.send",
+]
+
+
+@dataclass(slots=True)
+class Account:
+    name: str
+    email: str
+    token_path: str
+    state_file: str
+    # Ingestion source config (see src.sources.build_source); None = Gmail API polling
+    source: Optional[Dict] = None
+
+
+def get_accounts_path():
+    return get_app_dir() / "accounts.json"
+
+
+def load_accounts(path: Optional[str] = None) -> List[Account]:
+    """Read accounts.json, falling back to the single MY_EMAIL/token.json account"""
+    accounts_path = path or get_accounts_path()
+
+    if os.path.exists(accounts_path):
+        try:
+            with open(accounts_path, "r") as f:
+                entries = json.load(f)
+
+            accounts = []
+            for entry in entries:
+                name = entry["name"]
+                token_path = entry.get("token", f"token_{name}.json")
+                if not os.path.isabs(token_path):
+                    token_path = str(get_app_dir() / token_path)
+
+                accounts.append(Account(
+                    name=name,
+                    email=entry["email"],
+                    token_path=token_path,
+                    state_file=entry.get("state_file", f"db/email_state_{name}.json"),
+                    source=entry.get("source"),
+                ))
+
+            if accounts:
+                return accounts
+
+        except Exception as e:
+            print(f"Error loading {accounts_path}: {e} - falling back to the default account")
+
+    return [Account(
+        name=DEFAULT_ACCOUNT,
+        email=os.environ.get("MY_EMAIL", ""),
+        token_path=str(get_token_path()),
+        state_file="db/email_state.json",
+    )]
+
+
+def build_gmail_toolkit(account: Account):
+    """GmailToolkit authorised with the account's own token"""
+    from langchain_google_community import GmailToolkit
+
+    if account.name == DEFAULT_ACCOUNT:
+        return GmailToolkit()
+
+    from langchain_google_community.gmail.utils import build_resource_service, get_gmail_credentials
+
+    credentials = get_gmail_credentials(
+        token_file=account.token_path,
+        client_sercret_file=str(get_credentials_path()),
+        scopes=GMAIL_SCOPES,
+    )
+    return GmailToolkit(api_resource=build_resource_service(credentials=credentials))
+
+
+# Account name -> GmailToolkit, so shared workflow graphs send from the right mailbox
+_gmail_registry: Dict[str, object] = {}
+_gmail_registry_lock = threading.Lock()
+
+
+def register_gmail(account_name: str, gmail_api) -> None:
+    with _gmail_registry_lock:
+        _gmail_registry[account_name] = gmail_api
+
+
+def get_gmail(account_name: Optional[str]):
+    with _gmail_registry_lock:
+        return _gmail_registry.get(account_name or DEFAULT_ACCOUNT)
@@ -0,0 +1,300 @@
+"""
+Local HTTP/JSON control API for running SmartEmailBot without the GUI.
+
+Exposes the same surface the GUI uses through FrontendCommunicator:
+
+    GET  /health
+    GET  /usage                             Gmail quota units and calls per account and method
+    GET  /emails?category=home|notify|ignore|human|failed
+    GET  /events                            Server-Sent Events stream, one per client
+    POST /emails/<id>/ignore                notify email -> ignore
+    POST /emails/<id>/respond               {"context": "..."}
+    POST /emails/<id>/approve               send the pending draft
+    POST /emails/<id>/reject                {"feedback": "..."}
+    POST /emails/<id>/retry                 failed email -> retry its workflow now
+    POST /emails/<id>/discard               failed email -> drop its workflow
+    POST /generate                          {"from_email", "to_email", "users_intent"}
+    POST /drafts/<workflow_id>/approve
+    POST /drafts/<workflow_id>/reject       {"feedback": "..."}
+    POST /drafts/<workflow_id>/cancel       stop the draft's workflow and drop its state
+    POST /commands                          {"type": <GUI command name>, "data": {...}}
+
+Only the standard library is used, so the daemon never imports Tk.
+"""
+import json
+import uuid
+import threading
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue, Empty, Full
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+from src.connect import Communicator, FrontendCommunicator
+from src.email_service import EmailService
+
+
+def event_to_json(event) -> Dict:
+    return {"type": type(event).__name__, "data": asdict(event)}
+
+
+class EventHub:
+    """
+    Single consumer of the backend event queue. Applies each batch to EmailService
+    (like the GUI does) and fans the events out to every attached client.
+    """
+
+    def __init__(self, communicator: Communicator, lock: threading.Lock,
+                 batch_size: int = 50, client_buffer: int = 1000):
+        self.frontend = FrontendCommunicator(
+            events= communicator.events,
+            commands= communicator.commands
+        )
+        self.lock = lock
+        self.batch_size = batch_size
+        self.client_buffer = client_buffer
+        self.clients: List[Queue] = []
+        self.clients_lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self) -> None:
+        self.running = False
+        self.frontend.events.put(None)
+
+    def subscribe(self) -> Queue:
+        client = Queue(maxsize=self.client_buffer)
+        with self.clients_lock:
+            self.clients.append(client)
+        return client
+
+    def unsubscribe(self, client: Queue) -> None:
+        with self.clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def _run(self) -> None:
+        while self.running:
+            first = self.frontend.events.get()
+            if first is None:
+                break
+
+            events = [first] + self.frontend.drain_events(self.batch_size - 1)
+            events = [event for event in events if event is not None]
+
+            with self.lock:
+                self.frontend.apply_events(events)
+
+            self._broadcast(events)
+
+    def _broadcast(self, events: List) -> None:
+        payloads = [event_to_json(event) for event in events]
+
+        with self.clients_lock:
+            clients = list(self.clients)
+
+        for client in clients:
+            for payload in payloads:
+                try:
+                    client.put_nowait(payload)
+                except Full:
+                    # A stalled client must not hold back the others
+                    print(f"\nDropping event for slow API client - (EventHub)")
+                    break
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, communicator: Communicator):
+        super().__init__(address, ApiRequestHandler)
+        self.communicator = communicator
+        self.lock = threading.Lock()
+        self.hub = EventHub(communicator, self.lock)
+
+    def serve_forever(self, poll_interval=0.5):
+        self.hub.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.hub.stop()
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    server: ApiServer
+
+    # ---------------------------------------------------------------- GET
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok"})
+
+        elif parts == ["usage"]:
+            from src.gmail_client import gmail_usage
+            self._send_json(200, {"gmail": gmail_usage()})
+
+        elif parts == ["emails"]:
+            category = parse_qs(url.query).get("category", ["home"])[0]
+            if category not in EmailService.emails:
+                self._send_json(400, {"error": f"Unknown category: {category}"})
+                return
+
+            with self.server.lock:
+                emails = [email.to_dict() for email in EmailService.load_emails_by_category(category)]
+            self._send_json(200, {"category": category, "emails": emails})
+
+        elif parts == ["events"]:
+            self._stream_events()
+
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _stream_events(self):
+        client = self.server.hub.subscribe()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        try:
+            while True:
+                try:
+                    payload = client.get(timeout=15)
+                    chunk = f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+                except Empty:
+                    chunk = ": keep-alive\n\n"
+
+                self.wfile.write(chunk.encode("utf-8"))
+                self.wfile.flush()
+
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.hub.unsubscribe(client)
+
+    # ---------------------------------------------------------------- POST
+
+    def do_POST(self):
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        body = self._read_json()
+        if body is None:
+            self._send_json(400, {"error": "Body must be a JSON object"})
+            return
+
+        try:
+            if len(parts) == 3 and parts[0] == "emails":
+                self._email_action(parts[1], parts[2], body)
+
+            elif len(parts) == 3 and parts[0] == "drafts":
+                self._draft_action(parts[1], parts[2], body)
+
+            elif parts == ["generate"]:
+                workflow_id = str(uuid.uuid4())
+                self.server.communicator.send_commands("generate_email", {**body, "workflow_id": workflow_id})
+                self._send_json(202, {"workflow_id": workflow_id})
+
+            elif parts == ["commands"]:
+                command_type, data = body.get("type"), body.get("data") or {}
+                if not isinstance(command_type, str) or not isinstance(data, dict):
+                    raise ValueError('Expected {"type": "<command>", "data": {...}}')
+                self.server.communicator.send_commands(command_type, data)
+                self._send_json(202, {"status": "queued"})
+
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+    def _email_action(self, email_id: str, action: str, body: Dict):
+        """Mirror the GUI's email detail buttons: update EmailService, then send the command"""
+        if action in ("approve", "reject"):
+            category = "human"
+        elif action in ("retry", "discard"):
+            category = "failed"
+        else:
+            category = "notify"
+
+        with self.server.lock:
+            email = EmailService.get_email(category, email_id)
+            if email is None:
+                self._send_json(404, {"error": f"No {category} email with id {email_id}"})
+                return
+
+            if action == "ignore":
+                command_type, data = "resume_workflow", {"flag": False}
+                EmailService.notify_to_ignore(email)
+
+            elif action == "respond":
+                command_type, data = "resume_workflow", {"flag": True, "feedback": body.get("context", "")}
+                EmailService.remove_notify(email)
+
+            elif action == "approve":
+                command_type, data = "approve", {"flag": True}
+                EmailService.approve_draft_response(email)
+
+            elif action == "reject":
+                command_type, data = "reject", {"flag": False, "feedback": body.get("feedback", "")}
+
+            elif action in ("retry", "discard"):
+                command_type, data = f"{action}_failed", {}
+                EmailService.remove_failed(email)
+
+            else:
+                self._send_json(404, {"error": f"Unknown action: {action}"})
+                return
+
+        self.server.communicator.send_commands(command_type, {**data, "workflow_id": email.workflow_id})
+        self._send_json(202, {"workflow_id": email.workflow_id})
+
+    def _draft_action(self, workflow_id: str, action: str, body: Dict):
+        if action == "approve":
+            self.server.communicator.send_commands("approve_draft", {"workflow_id": workflow_id})
+        elif action == "reject":
+            self.server.communicator.send_commands(
+                "reject_draft", {"workflow_id": workflow_id, "feedback": body.get("feedback", "")}
+            )
+        elif action == "cancel":
+            self.server.communicator.send_commands("cancel_workflow", {"workflow_id": workflow_id})
+        else:
+            self._send_json(404, {"error": f"Unknown action: {action}"})
+            return
+
+        self._send_json(202, {"workflow_id": workflow_id})
+
+    # ---------------------------------------------------------------- helpers
+
+    def _read_json(self) -> Optional[Dict]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    def _send_json(self, status: int, payload: Dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"[API] {self.address_string()} - {format % args}")
+
+
+def serve(communicator: Communicator, host: str = "127.0.0.1", port: int = 8765) -> ApiServer:
+    """Create the API server; call serve_forever() on it to start handling requests"""
+    server = ApiServer((host, port), communicator)
+    print(f"Control API listening on http://{host}:{port}")
+    return server
@@ -2,7 +2,10 @@ import os
 import time
 import uuid
 import json
+import random
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Set, Optional, List, Dict
 
 from datetime import datetime
@@ -10,16 +13,24 @@ from email.utils import parsedate_to_datetime
 from datetime import datetime
 
 from src.connect import Communicator, BackendCommunicator
+from src.deadlines import WORKFLOW_TIMEOUT, WorkflowCancelled, open_scope, abandoned_threads
+from src.deadlines import cancel as cancel_run
+from src.messages import NewEmailEvent, ApprovalEvent, WorkflowFailedEvent, event_from_result
+from src.accounts import Account, DEFAULT_ACCOUNT, load_accounts, build_gmail_toolkit, register_gmail
+from src.sources import EmailSource, build_source
+from src.gmail_client import GmailQuotaExceeded, gmail_client, gmail_usage
 
 from langchain_google_community import GmailToolkit
-from langchain_google_community.gmail.search import GmailSearch
 
 
 
-class EmailSearcher:
-    def __init__(self, gmail_api: GmailToolkit):
+class EmailSearcher(EmailSource):
+    """Default source: polls the Gmail API search endpoint"""
+    
+    def __init__(self, gmail_api: GmailToolkit, account: str = DEFAULT_ACCOUNT):
         self.gmail = gmail_api
-        self.search_tool = GmailSearch(api_resource= self.gmail.api_resource) 
+        # Charged against the account's Gmail quota (see src.gmail_client)
+        self.client = gmail_client(gmail_api, account)
         
     def _get_time(self, format: str) -> str:
         return datetime.now().strftime(format)
@@ -29,14 +40,14 @@ class EmailSearcher:
         
         if last_shutdown_date and isinstance(last_shutdown_date, str):
             print(f"\n**Fetch emails**")
-            return self.search_tool.invoke(f"label:inbox after:{last_shutdown_date}")
+            return self.client.search(f"label:inbox after:{last_shutdown_date}")
         else:
-            return self.search_tool.invoke(f"label:inbox after:{self._get_time(format='%Y/%m/%d')}")
+            return self.client.search(f"label:inbox after:{self._get_time(format='%Y/%m/%d')}")
 
 class EmailState:
     """Manages the state of processed emails and threads"""
     
-    def __init__(self, state_file: str = "db/email_state.json"):
+    def __init__(self, state_file: str = "db/email_state.json", my_email: Optional[str] = None):
         self.current_email_ids: Set[str] = set()
         self.processed_threads: Set[str] = set()
         self.state_file = state_file
@@ -44,6 +55,7 @@ class EmailState:
         self.is_first_run: bool = True
         self.last_shutdown_time: Optional[str] = None
         self.last_shutdown_date: Optional[str] = None
+        self.my_email = my_email if my_email is not None else os.environ.get("MY_EMAIL", "")
     
         self._load_state()
 
@@ -99,7 +111,7 @@ class EmailState:
     
     def is_new_email(self, email_id: str, thread_id: str, sender: str) -> bool:
         """Check if email is new and should be processed"""
-        my_email = os.environ.get("MY_EMAIL", "").strip().lower()
+        my_email = self.my_email.strip().lower()
         sender_lower = sender.lower().strip()
         
         # Check conditions
@@ -131,59 +143,139 @@ class EmailState:
         
     
 class WorkflowManager:
-    """Manages active workflows and their states"""
+    """
+    Registry of workflows still running or waiting on the user.
+    
+    One row per workflow in an indexed SQLite table, written as it changes.
+    Inputs are not stored: the checkpointer already holds them.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS workflows (
+        workflow_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        account TEXT NOT NULL,
+        email_id TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS workflows_status_updated ON workflows (status, updated_at);
+    CREATE INDEX IF NOT EXISTS workflows_status_created ON workflows (status, created_at);
+    CREATE INDEX IF NOT EXISTS workflows_account_status ON workflows (account, status);
+    CREATE INDEX IF NOT EXISTS workflows_email ON workflows (email_id);
+    """
     
-    def __init__(self, db_path: str = "db/workflows.json"):
-        self.active_workflows: Dict[str, Dict] = {}
+    def __init__(self, db_path: str = "db/workflows.sqlite"):
+        from src.checkpoint import connect
+        
         self.lock = threading.Lock()
         self.db_path = db_path
-        self.load_workflows = self._load_workflows()
-
         
-    def save_workflows(self):
-        with open(self.db_path, "w") as json_file:
-            json.dump(self.active_workflows, json_file, indent= 4)
-    
-    def _load_workflows(self):
-        if os.path.exists(self.db_path):
-            with open(self.db_path, "r") as f:
-                data = json.load(f)
-                if data:
-                    self.active_workflows = data
-                else:
-                    self.active_workflows = {}
-        else:
-            with open(self.db_path, 'w', encoding="utf-8") as f:
-                json.dump(self.active_workflows, f, indent= 4)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = connect(db_path)
+        self.conn.executescript(self.SCHEMA)
+        self._import_legacy_json(os.path.splitext(db_path)[0] + ".json")
+    
+    def _import_legacy_json(self, json_path: str) -> None:
+        """One-off import of the workflows.json written by earlier versions"""
+        if not os.path.exists(json_path):
+            return
+        
+        try:
+            with open(json_path, "r") as f:
+                data = json.load(f) or {}
+            
+            for workflow_id, workflow in data.items():
+                self.add_workflow(workflow_id, workflow.get("config") or {}, workflow.get("inputs") or {})
+                self.update_workflow_status(workflow_id, workflow.get("status", "active"))
             
-            print(f"--Succesfully create json file for storing workflows-- - (load_workflows)")
+            os.replace(json_path, json_path + ".migrated")
+            print(f"Imported {len(data)} workflow(s) from {json_path}")
+        
+        except Exception as e:
+            print(f"Error importing {json_path}: {e}")
+    
+    @staticmethod
+    def _row_to_workflow(row) -> Dict:
+        workflow_id, kind, status, account, email_id, created_at, updated_at = row
+        return {
+            "config": {"configurable": {"thread_id": workflow_id, "account": account}},
+            "thread_id": workflow_id,
+            "kind": kind,
+            "status": status,
+            "account": account,
+            "email_id": email_id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+    
+    def save_workflows(self):
+        """Rows are written as they change; fold the WAL back in for a compact file at shutdown"""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
         
     def add_workflow(self, workflow_id: str, config: Dict, inputs: Dict):
         """Add a new workflow to track"""
+        account = (config.get("configurable") or {}).get("account") or DEFAULT_ACCOUNT
+        input_email = inputs.get("input_email")
+        kind = "email_response" if input_email else "send_email"
+        now = time.time()
+        
         with self.lock:
-            self.active_workflows[workflow_id] = {
-                'config': config,
-                'inputs': inputs,
-                'thread_id': workflow_id,
-                'status': 'active'
-            }
+            self.conn.execute(
+                "INSERT OR REPLACE INTO workflows (workflow_id, kind, status, account, email_id, created_at, updated_at) "
+                "VALUES (?, ?, 'active', ?, ?, ?, ?)",
+                (workflow_id, kind, account, input_email.get("id") if input_email else None, now, now),
+            )
+            self.conn.commit()
     
     def get_workflow(self, workflow_id: str) -> Optional[Dict]:
         """Get workflow by ID"""
         with self.lock:
-            return self.active_workflows.get(workflow_id)
+            row = self.conn.execute(
+                "SELECT workflow_id, kind, status, account, email_id, created_at, updated_at "
+                "FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return self._row_to_workflow(row) if row else None
     
     def remove_workflow(self, workflow_id: str):
         """Remove completed workflow"""
         with self.lock:
-            if workflow_id in self.active_workflows:
-                del self.active_workflows[workflow_id]
+            self.conn.execute("DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,))
+            self.conn.commit()
+    
+    def active_ids(self) -> Set[str]:
+        """Ids of workflows still running or waiting on the user"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT workflow_id FROM workflows")}
     
     def update_workflow_status(self, workflow_id: str, status: str):
         """Update workflow status"""
         with self.lock:
-            if workflow_id in self.active_workflows:
-                self.active_workflows[workflow_id]['status'] = status
+            self.conn.execute(
+                "UPDATE workflows SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, time.time(), workflow_id),
+            )
+            self.conn.commit()
+    
+    def find_workflows(self, status: str, older_than: Optional[float] = None, limit: int = 1000) -> List[Dict]:
+        """Workflows in `status` not updated for `older_than` seconds, oldest first (index lookup)"""
+        cutoff = time.time() - (older_than or 0)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT workflow_id, kind, status, account, email_id, created_at, updated_at FROM workflows "
+                "WHERE status = ? AND updated_at <= ? ORDER BY updated_at LIMIT ?",
+                (status, cutoff, limit),
+            ).fetchall()
+        return [self._row_to_workflow(row) for row in rows]
+    
+    def count_open(self, account: str) -> int:
+        """Workflows of an account still running, retrying or waiting on the user"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM workflows WHERE account = ? AND status != 'failed'", (account,)
+            ).fetchone()[0]
 
 
     def initialize_inputs(self, email_input: dict = {}, send_email: bool = False):
@@ -212,12 +304,248 @@ class WorkflowManager:
                     
                 return inputs
         
-    def initialize_config(self, workflow_id: str):
+    def initialize_config(self, workflow_id: str, account: Optional[str] = None):
+        
+        with self.lock:
+            config = {"configurable": {"thread_id": workflow_id}}
+            if account:
+                # Lets shared graphs pick the mailbox to send from (see Nodes._gmail_for)
+                config["configurable"]["account"] = account
+            return config
+
+class FairShareScheduler:
+    """
+    Hands queued work to the executor round-robin across lanes (one per mailbox),
+    so a burst in one account cannot starve the others.
+    """
+    
+    def __init__(self, executor: ThreadPoolExecutor, max_in_flight: int):
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.lanes: "OrderedDict[str, deque]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Signalled whenever queued work starts, for producers waiting on wait_for_room
+        self.room = threading.Condition(self.lock)
+    
+    def submit(self, lane: str, func, *args) -> None:
+        with self.lock:
+            self.lanes.setdefault(lane, deque()).append((func, args))
+            self._pump()
+    
+    def _pump(self) -> None:
+        """Start queued work while there are free workers (caller holds the lock)"""
+        while self.lanes and self.in_flight < self.max_in_flight:
+            lane, queue = next(iter(self.lanes.items()))
+            func, args = queue.popleft()
+            
+            if queue:
+                self.lanes.move_to_end(lane)
+            else:
+                del self.lanes[lane]
+            
+            self.in_flight += 1
+            self.executor.submit(self._run, func, args)
+            self.room.notify_all()
+    
+    def _run(self, func, args) -> None:
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Error in scheduled workflow task: {e}")
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self._pump()
+    
+    def pending(self) -> Dict[str, int]:
+        with self.lock:
+            return {lane: len(queue) for lane, queue in self.lanes.items()}
+    
+    def wait_for_room(self, lane: str, limit: int) -> None:
+        """Block until at most `limit` tasks are queued on the lane (bulk producers' backpressure)"""
+        with self.room:
+            self.room.wait_for(lambda: len(self.lanes.get(lane, ())) <= limit)
+
+
+# Scheduler lane for dead-letter retries: one lane among the mailboxes, so fresh mail keeps its share
+RETRY_LANE = "__retry__"
+
+# Exception class names (anywhere in the MRO) worth retrying: OpenAI, httpx/requests and socket errors
+TRANSIENT_ERRORS = {
+    "APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError",
+    "TimeoutException", "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError",
+    "TimeoutError", "ConnectionError", "IncompleteRead", "RemoteDisconnected",
+}
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts, connection drops, rate limits and 5xx responses; everything else fails for good"""
+    if _quota_retry_after(error) is not None:
+        return True
+    
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "resp", None), "status", None)
+    try:
+        if status is not None and (int(status) >= 500 or int(status) == 429):
+            return True
+    except (TypeError, ValueError):
+        pass
+    
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class DeadLetterQueue:
+    """
+    Failed workflows, next to the workflow registry. Transient failures are
+    retried with capped exponential backoff and jitter; the rest (or those out
+    of attempts) stay here as "failed" until the user retries or discards them.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        workflow_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        email_id TEXT,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        error_class TEXT NOT NULL,
+        error TEXT NOT NULL,
+        resume_inputs TEXT,
+        next_retry_at REAL,
+        failed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS dead_letters_due ON dead_letters (status, next_retry_at);
+    """
+    
+    def __init__(self, db_path: str = "db/workflows.sqlite", max_attempts: int = 5,
+                 base_delay: float = 30, max_delay: float = 3600):
+        from src.checkpoint import connect
+        
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        
+        self.lock = threading.Lock()
+        # Set when something becomes due sooner than the retry loop expects
+        self.wakeup = threading.Event()
+        
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = connect(db_path)
+        self.conn.executescript(self.SCHEMA)
+        
+        # Retries that were queued or running when the app stopped
+        self.conn.execute("UPDATE dead_letters SET status = 'retrying' WHERE status = 'running'")
+        self.conn.commit()
+    
+    def _delay(self, attempts: int) -> float:
+        # "Equal jitter": at least half the backoff, so retries never bunch up at zero
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def record_failure(self, workflow: Dict, error: Exception, resume_inputs: Optional[Dict] = None):
+        """Store a failure; returns ("retrying", delay) or ("failed", 0)"""
+        workflow_id = workflow["thread_id"]
+        now = time.time()
+        
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT attempts, resume_inputs FROM dead_letters WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            # A retry passes its resume inputs back, but keep them if it did not
+            stored_inputs = json.dumps(resume_inputs) if resume_inputs else (row[1] if row else None)
+            
+            if _is_transient(error) and attempts <= self.max_attempts:
+                status, delay = "retrying", self._delay(attempts)
+                retry_after = _quota_retry_after(error)
+                if retry_after:
+                    delay = max(delay, retry_after)
+            else:
+                status, delay = "failed", 0.0
+            
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dead_letters "
+                "(workflow_id, kind, email_id, status, attempts, error_class, error, resume_inputs, next_retry_at, failed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (workflow_id, workflow.get("kind", "email_response"), workflow.get("email_id"), status, attempts,
+                 type(error).__name__, str(error)[:2000],
+                 stored_inputs,
+                 now + delay if status == "retrying" else None, now),
+            )
+            self.conn.commit()
+        
+        if status == "retrying":
+            self.wakeup.set()
+        return status, delay
+    
+    def take_due(self, limit: int) -> List[Dict]:
+        """Claim up to `limit` retries whose time has come, oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT workflow_id, kind, resume_inputs FROM dead_letters "
+                "WHERE status = 'retrying' AND next_retry_at <= ? ORDER BY next_retry_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE dead_letters SET status = 'running' WHERE workflow_id = ?", [(row[0],) for row in rows]
+            )
+            self.conn.commit()
         
+        return [
+            {"workflow_id": workflow_id, "kind": kind, "resume_inputs": json.loads(resume_inputs) if resume_inputs else None}
+            for workflow_id, kind, resume_inputs in rows
+        ]
+    
+    def next_due_in(self) -> Optional[float]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MIN(next_retry_at) FROM dead_letters WHERE status = 'retrying'"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+    
+    def retry_now(self, workflow_id: str) -> bool:
+        """User-requested retry: due immediately, with a fresh attempt budget"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE dead_letters SET status = 'retrying', attempts = 0, next_retry_at = ? WHERE workflow_id = ?",
+                (time.time(), workflow_id),
+            )
+            self.conn.commit()
+        self.wakeup.set()
+        return cursor.rowcount > 0
+    
+    def resolve(self, workflow_id: str) -> None:
+        """Forget a workflow that succeeded or was discarded"""
+        with self.lock:
+            self.conn.execute("DELETE FROM dead_letters WHERE workflow_id = ?", (workflow_id,))
+            self.conn.commit()
+    
+    def failed(self, limit: int = 500) -> List[Dict]:
+        """Permanently failed items, newest first"""
         with self.lock:
-            return {"configurable": {"thread_id": workflow_id}}
+            rows = self.conn.execute(
+                "SELECT workflow_id, kind, email_id, attempts, error_class, error, failed_at FROM dead_letters "
+                "WHERE status = 'failed' ORDER BY failed_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        keys = ("workflow_id", "kind", "email_id", "attempts", "error_class", "error", "failed_at")
+        return [dict(zip(keys, row)) for row in rows]
+
 
 class WorkflowProcessor:
+    def __init__(self, max_workers: int = 8, workflow_timeout: float = WORKFLOW_TIMEOUT):
+        # Shared by every mailbox's workflows and by GUI commands
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow")
+        self.scheduler = FairShareScheduler(self.executor, max_in_flight=max_workers)
+        self.max_workers = max_workers
+        # Set by EmailManager; without it failed workflows are dropped as before
+        self.dead_letters: Optional[DeadLetterQueue] = None
+        
+        # Wall-clock budget of one invoke; hung nodes are abandoned past it (see src.deadlines)
+        self.workflow_timeout = workflow_timeout
+        # Workflows cancelled before their run started: workflow_id -> time of the cancel
+        self.cancelled: Dict[str, float] = {}
+        self.cancelled_lock = threading.Lock()
+
     def process_email(self, 
                 email: Dict = {}, 
                 workflow_id: str = "",
@@ -226,15 +554,18 @@ class WorkflowProcessor:
                 communicator: BackendCommunicator = None,
                 resume: bool = False, 
                 resume_inputs: Dict = None,
-                send_email: bool = False) -> None:
+                send_email: bool = False,
+                wait: bool = False,
+                account: Optional[str] = None) -> None:
         
-        """Process email in a separate thread"""
+        """Process email on the executor, or inline on the caller's thread if `wait`"""
         if send_email:
             print(f"Generating email...")    
 
             self._start_execution(
                 self._generate_email,
-                email, workflow_id, wf, wf_manager, communicator
+                email, workflow_id, wf, wf_manager, communicator, account,
+                wait=wait, lane=account
             )
         
         elif not resume:
@@ -246,25 +577,33 @@ class WorkflowProcessor:
 
             self._start_execution(
                 self._process,
-                email, wf, wf_manager, communicator
+                email, wf, wf_manager, communicator,
+                wait=wait, lane=email.get("account")
             )
 
         else:
             print(f"Resuming workflow: {workflow_id}")
             self._start_execution(
                 self._resume,
-                workflow_id, wf, resume_inputs, wf_manager, communicator
+                workflow_id, wf, resume_inputs, wf_manager, communicator,
+                wait=wait
             )
 
-    def _generate_email(self, email: Dict, workflow_id: str, wf, wf_manager, communicator):
+    def continue_workflow(self, workflow_id: str, wf, wf_manager: WorkflowManager,
+                          communicator: BackendCommunicator, account: Optional[str] = None) -> None:
+        """Finish a workflow cut off mid-step, from its last checkpoint (completed nodes are not re-run)"""
+        print(f"Continuing workflow: {workflow_id}")
+        self._start_execution(self._continue, workflow_id, wf, wf_manager, communicator, lane=account)
+
+    def _generate_email(self, email: Dict, workflow_id: str, wf, wf_manager, communicator, account: Optional[str] = None):
         
         inputs = wf_manager.initialize_inputs(email, send_email=True)
-        thread_config = wf_manager.initialize_config(workflow_id)
+        thread_config = wf_manager.initialize_config(workflow_id, account)
         
         wf_manager.add_workflow(workflow_id, thread_config, inputs)
         
         try:
-            result = wf.invoke(inputs, config=thread_config)
+            result = self._invoke(wf, inputs, thread_config)
             
             # Check if workflow needs user interaction
             if self._should_sendback(result):
@@ -278,23 +617,28 @@ class WorkflowProcessor:
             print(f"Error in send email workflow {workflow_id}: {e}")
             import traceback
             traceback.print_exc()
-            wf_manager.remove_workflow(workflow_id)
+            self._fail(workflow_id, wf_manager, communicator, e)
 
     def _process(self, email: Dict, wf, wf_manager, communicator):
         
         workflow_id = email["workflow_id"]
-        inputs = wf_manager.initialize_inputs(email)
-        thread_config = wf_manager.initialize_config(workflow_id)
+        
+        # State (and so every checkpoint) keeps only a reference; the body is stored once
+        input_email = email
+        if hasattr(wf.checkpointer, "put_email"):
+            input_email = wf.checkpointer.put_email(email, workflow_id)
+        inputs = wf_manager.initialize_inputs(input_email)
+        thread_config = wf_manager.initialize_config(workflow_id, email.get("account"))
         
         wf_manager.add_workflow(workflow_id, thread_config, inputs)
         
         try:
-            result = wf.invoke(inputs, config= thread_config)
+            result = self._invoke(wf, inputs, thread_config)
             self._sendback(result, workflow_id, communicator, wf_manager)
                         
         except Exception as e:
             print(f"Error processing email in WorkflowProcessor -> process():\n{workflow_id}:\n   {e}")
-            wf_manager.remove_workflow(workflow_id)
+            self._fail(workflow_id, wf_manager, communicator, e)
         
         
     def _resume(self, workflow_id: str, wf, resume_inputs: Dict, wf_manager, communicator):
@@ -324,7 +668,7 @@ class WorkflowProcessor:
             from langgraph.types import Command
             
             command = Command(resume=resume_inputs)
-            result = wf.invoke(command, config= thread_config)
+            result = self._invoke(wf, command, thread_config)
             
             if self._should_sendback(result):
                 self._sendback(result, workflow_id, communicator, wf_manager)
@@ -340,12 +684,137 @@ class WorkflowProcessor:
             print(f"  Exception message: {str(e)}")
             import traceback
             traceback.print_exc()
+            self._fail(workflow_id, wf_manager, communicator, e, resume_inputs)
+    
+            
+    def _continue(self, workflow_id: str, wf, wf_manager, communicator):
+        workflow_data = wf_manager.get_workflow(workflow_id)
+        if not workflow_data:
+            print(f"Workflow {workflow_id} not found")
+            return
+        
+        try:
+            # None input: run the pending tasks of the latest checkpoint
+            result = self._invoke(wf, None, workflow_data["config"])
+            
+            if self._should_sendback(result):
+                self._sendback(result, workflow_id, communicator, wf_manager)
+            else:
+                print(f"Workflow {workflow_id} completed successfully")
+                wf_manager.remove_workflow(workflow_id)
+        
+        except Exception as e:
+            print(f"Error continuing workflow {workflow_id}: {e}")
+            self._fail(workflow_id, wf_manager, communicator, e)
+    
+    # ------------------------------------------------------------ dead letters
+    
+    def _fail(self, workflow_id: str, wf_manager, communicator, error: Exception,
+              resume_inputs: Optional[Dict] = None) -> None:
+        """Dead-letter a failed workflow instead of dropping it (transient errors get retried)"""
+        if isinstance(error, WorkflowCancelled):
+            self._discard(workflow_id, wf_manager)
+            return
+        
+        workflow = wf_manager.get_workflow(workflow_id)
+        if self.dead_letters is None or workflow is None:
             wf_manager.remove_workflow(workflow_id)
+            return
+        
+        status, delay = self.dead_letters.record_failure(workflow, error, resume_inputs)
+        wf_manager.update_workflow_status(workflow_id, status)
+        
+        if status == "retrying":
+            print(f"Workflow {workflow_id} failed ({type(error).__name__}), retrying in {delay:.0f}s")
+        else:
+            print(f"Workflow {workflow_id} failed permanently ({type(error).__name__})")
+            if workflow.get("email_id"):
+                communicator.send_event(WorkflowFailedEvent(
+                    workflow["email_id"], workflow_id, type(error).__name__, str(error)
+                ))
+    
+    def retry_workflow(self, workflow_id: str, wf, resume_inputs: Optional[Dict],
+                       wf_manager: WorkflowManager, communicator: BackendCommunicator) -> None:
+        """Queue a dead-lettered workflow on its own lane, so retries only get a fair share of workers"""
+        self._start_execution(self._retry, workflow_id, wf, resume_inputs, wf_manager, communicator, lane=RETRY_LANE)
     
+    def _retry(self, workflow_id: str, wf, resume_inputs: Optional[Dict], wf_manager, communicator):
+        workflow = wf_manager.get_workflow(workflow_id)
+        if workflow is None:
+            self.dead_letters.resolve(workflow_id)
+            return
+        
+        wf_manager.update_workflow_status(workflow_id, "active")
+        try:
+            from langgraph.types import Command
+            
+            # Answer the interrupt again only if the failed resume never got past it
+            snapshot = wf.get_state(workflow["config"])
+            interrupted = any(task.interrupts for task in snapshot.tasks)
+            command = Command(resume=resume_inputs) if interrupted and resume_inputs else None
+            
+            if interrupted and command is None:
+                # Failed after reaching an interrupt: nothing to redo, the user has to answer
+                self.dead_letters.resolve(workflow_id)
+                wf_manager.update_workflow_status(workflow_id, "waiting")
+                return
             
-    def _start_execution(self, process_func, *args) -> None:
-        """Start execution in separate thread"""
-        threading.Thread(target=process_func, args=args).start()
+            result = self._invoke(wf, command, workflow["config"])
+            self.dead_letters.resolve(workflow_id)
+            
+            if self._should_sendback(result):
+                self._sendback(result, workflow_id, communicator, wf_manager)
+            else:
+                print(f"Workflow {workflow_id} completed successfully after retry")
+                wf_manager.remove_workflow(workflow_id)
+        
+        except Exception as e:
+            self._fail(workflow_id, wf_manager, communicator, e, resume_inputs)
+    
+    # ------------------------------------------------------------ deadlines
+    
+    def _invoke(self, wf, inputs, config: Dict):
+        """Invoke under the workflow deadline; cancel_workflow() stops it at its next check"""
+        workflow_id = config["configurable"]["thread_id"]
+        with self.cancelled_lock:
+            cancelled = self.cancelled.pop(workflow_id, None)
+        if cancelled is not None:
+            raise WorkflowCancelled(f"Workflow {workflow_id} cancelled before it started")
+        
+        with open_scope(workflow_id, self.workflow_timeout):
+            return wf.invoke(inputs, config=config)
+    
+    def cancel_workflow(self, workflow_id: str, wf_manager: WorkflowManager) -> None:
+        """Stop a workflow and delete its state; a running one cleans up when its run unwinds"""
+        if cancel_run(workflow_id):
+            print(f"Cancelling running workflow {workflow_id}")
+            return
+        
+        now = time.time()
+        with self.cancelled_lock:
+            # Still queued runs consume their entry; others are forgotten after an hour
+            self.cancelled = {key: at for key, at in self.cancelled.items() if now - at < 3600}
+            self.cancelled[workflow_id] = now
+        
+        print(f"Cancelled workflow {workflow_id}")
+        self._discard(workflow_id, wf_manager)
+    
+    def _discard(self, workflow_id: str, wf_manager: WorkflowManager) -> None:
+        """Forget a workflow everywhere: registry, dead-letter queue and checkpoints"""
+        wf_manager.remove_workflow(workflow_id)
+        if self.dead_letters is not None:
+            self.dead_letters.resolve(workflow_id)
+        
+        from src.checkpoint import open_checkpointers
+        for store in open_checkpointers():
+            store.delete_thread(workflow_id)
+    
+    def _start_execution(self, process_func, *args, wait: bool = False, lane: Optional[str] = None) -> None:
+        """Start execution on the shared executor, scheduled fairly per mailbox lane"""
+        if wait:
+            process_func(*args)
+        else:
+            self.scheduler.submit(lane or DEFAULT_ACCOUNT, process_func, *args)
                 
     def _should_sendback(self, event_results: Dict) -> bool:
         return "__interrupt__" in event_results
@@ -356,7 +825,8 @@ class WorkflowProcessor:
    
     
 class EmailProcessor:
-    def __init__(self, workflow_processor: WorkflowProcessor, wf_manager: WorkflowManager, communicator: BackendCommunicator, state: EmailState, model: str, gmail_api: GmailToolkit, db_path: str):
+    def __init__(self, workflow_processor: WorkflowProcessor, wf_manager: WorkflowManager, communicator: BackendCommunicator, state: EmailState, model: str, gmail_api: GmailToolkit, db_path: str, account: Optional[Account] = None):
+        self.account = account
         self.workflow_processor = workflow_processor
         self.wf_manager = wf_manager
         self.communicator = communicator
@@ -365,15 +835,14 @@ class EmailProcessor:
         self.gmail_api= gmail_api
         self.db_path = db_path
         
-    def process_generate_email(self, inputs: Dict, workflow_id: str = None) -> None: 
+    def process_generate_email(self, inputs: Dict, workflow_id: str = None, wait: bool = False) -> None: 
         """Generate draft email for user to send email"""
-        from src.workflow import SendEmailWorkflow
+        from src.workflow import SendEmailWorkflow, get_compiled_workflow
 
         if not workflow_id:
             workflow_id = str(uuid.uuid4())
             
-        workflow_instance = SendEmailWorkflow(self.model, self.db_path)
-        wf = workflow_instance.get_workflow      
+        wf = get_compiled_workflow(SendEmailWorkflow, self.model, self.db_path)
         
         self.workflow_processor.process_email(
             email=inputs,
@@ -381,13 +850,15 @@ class EmailProcessor:
             wf=wf,
             wf_manager=self.wf_manager, 
             communicator=self.communicator,
-            send_email=True
+            send_email=True,
+            wait=wait,
+            account=self.account.name if self.account else None
         )
         
         
 
-    def process_new_emails(self, search_results: List[Dict]) -> None:
-        """Process new emails from search results"""
+    def process_new_emails(self, search_results: List[Dict]) -> int:
+        """Process new emails from search results; returns how many were new"""
         
         new_emails_count = 0
         
@@ -406,11 +877,10 @@ class EmailProcessor:
                 
                 # add this email to current emails and threads state
                 self.state.add_email(email_id, thread_id)
-                self.communicator.send_events(type_event= "new_email", data= email_dict)
+                self.communicator.send_event(NewEmailEvent.from_email(email_dict))
                 
-                from src.workflow import EmailResponseWorkflow
-                workflow_instance = EmailResponseWorkflow(self.model, self.db_path)
-                wf = workflow_instance.get_workflow
+                from src.workflow import EmailResponseWorkflow, get_compiled_workflow
+                wf = get_compiled_workflow(EmailResponseWorkflow, self.model, self.db_path)
 
                 self.workflow_processor.process_email(
                     email=email_dict,
@@ -426,38 +896,212 @@ class EmailProcessor:
         else:
             print(f"\n=== Processed {new_emails_count} new emails ===")
         
+        return new_emails_count
+        
     def _preprocess_new_email(self, email: Dict) -> Dict:
-        """Assigning workflow id and sent time to email"""
-        service = self.gmail_api.api_resource
-        wf_id = str(uuid.uuid4())
-        
-        msg_id = email["id"]
-        message_data = service.users().messages().get(
-            userId="me",
-            id=msg_id,
-            format="full"
-        ).execute()
+        """Assigning workflow id, sent time and owning mailbox to email"""
+        email["workflow_id"] = str(uuid.uuid4())
+        if self.account:
+            # Prompts address the email to the mailbox it arrived in (see utils.parse_email)
+            email["account"] = self.account.name
+            email["account_email"] = self.account.email
+        
+        # Sources that parse the raw message (IMAP, files) already know the time;
+        # their ids mean nothing to the Gmail API, so never look them up there
+        gmail_source = not self.account or (self.account.source or {}).get("type", "gmail") == "gmail"
+        if "time" in email or not gmail_source:
+            email.setdefault("time", datetime.now().strftime("%d/%m/%Y - %H:%M"))
+            return email
+        
+        # Only the Date header is needed; concurrent lookups of one message share a call
+        client = gmail_client(self.gmail_api, self.account.name if self.account else None)
+        message_data = client.get_message(email["id"], format="metadata", metadataHeaders=["Date"])
         headers = message_data["payload"]["headers"]
         date_str = next(h["value"] for h in headers if h["name"].lower() == "date")
         
         sent_time = parsedate_to_datetime(date_str).strftime("%d/%m/%Y - %H:%M")
         
         email["time"] = sent_time
-        email["workflow_id"] = wf_id
         
         return email
     
     
     
+def _quota_retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds Gmail asked us to wait if `error` is a quota/rate-limit error
+    (0 when it gave no Retry-After), None for any other error.
+    """
+    if isinstance(error, GmailQuotaExceeded):
+        return error.retry_after
+    
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None)
+    
+    if status == 429 or (status == 403 and "ratelimit" in str(error).lower().replace(" ", "")):
+        try:
+            return float(resp.get("retry-after", 0))
+        except (TypeError, ValueError):
+            return 0.0
+    return None
+
+
+class AdaptivePollInterval:
+    """
+    Polling interval for one mailbox: drops to `minimum` when new mail arrives,
+    stays at or below `base` while workflows are open, and backs off
+    exponentially up to `maximum` while the inbox is quiet.
+    """
+    
+    def __init__(self, base: float, minimum: float, maximum: float, backoff: float = 2.0):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        
+        self.interval = base
+        self.reason = "startup"
+    
+    def record_cycle(self, new_emails: int, open_workflows: int) -> float:
+        if new_emails:
+            self.interval = self.minimum
+            self.reason = f"{new_emails} new email(s)"
+        elif open_workflows:
+            self.interval = max(self.minimum, min(self.interval * self.backoff, self.base))
+            self.reason = f"{open_workflows} open workflow(s)"
+        else:
+            self.interval = min(self.interval * self.backoff, self.maximum)
+            self.reason = "quiet inbox, backing off"
+        return self.interval
+    
+    def record_quota(self, retry_after: float) -> float:
+        """Gmail rate-limited us: honor Retry-After, otherwise back off"""
+        self.interval = max(retry_after or self.interval * self.backoff, self.minimum)
+        self.reason = f"Gmail quota (retry after {retry_after:.0f}s)" if retry_after else "Gmail quota, backing off"
+        return self.interval
+    
+    def record_error(self, error: Exception) -> float:
+        self.interval = self.base
+        self.reason = f"error: {error}"
+        return self.interval
+
+
+class Mailbox:
+    """One monitored Gmail account: its own credentials, state, searcher and processor"""
+    
+    def __init__(self, account: Account, gmail_api: GmailToolkit, processor: EmailProcessor, poll: AdaptivePollInterval):
+        self.account = account
+        self.poll = poll
+        self.next_check = 0.0
+        self.gmail_api = gmail_api
+        self.state = processor.state
+        self.searcher = EmailSearcher(gmail_api, account.name)
+        self.source: EmailSource = build_source(account.source, gmail_api) or self.searcher
+        self.processor = processor
+        # Push deliveries and polling cycles share the EmailState
+        self.lock = threading.Lock()
+        
+        register_gmail(account.name, gmail_api)
+    
+    @property
+    def push(self) -> bool:
+        return self.source.push
+    
+    def start_push(self) -> None:
+        """Start a push source; it calls back into the same pipeline as polling"""
+        print(f"\n=== Starting push ingestion for '{self.account.name}' ({type(self.source).__name__}) ===")
+        self.source.start(self._on_push, self.state.last_shutdown_date)
+    
+    def _on_push(self, search_results: List[Dict]) -> None:
+        try:
+            self._ingest(search_results)
+        except Exception as e:
+            print(f"Error processing pushed emails ({self.account.name}): {e}")
+    
+    def _ingest(self, search_results: List[Dict]) -> int:
+        bulk = getattr(self.source, "bulk", False)
+        
+        with self.lock:
+            # Archives are replayed in full, so nothing is skipped as "already there"
+            if self.state.is_first_run and not bulk:
+                self.state.handle_first_run(search_results)
+            
+            count = self.processor.process_new_emails(search_results)
+        
+        if bulk:
+            # Keep at most one batch queued so memory stays bounded however large the archive
+            self.processor.workflow_processor.scheduler.wait_for_room(self.account.name, len(search_results))
+        
+        return count
+    
+    def check(self) -> int:
+        """Run one fetch-and-process cycle for this account; returns the number of new emails"""
+        print(f"\n=== Checking mailbox '{self.account.name}' ===")
+        
+        search_results = self.source.fetch_email(self.state)
+        print(f"Number of emails in search results: {len(search_results)}")
+        
+        return self._ingest(search_results)
+
+    def _check_and_refresh_gmail_token(self):
+        """Check and refresh Gmail token, reinitialize searcher if needed"""
+        try:
+            from helper import refresh_gmail_token
+            
+            # Check if helper returns 3 values (enhanced version)
+            result = refresh_gmail_token(self.account.token_path)
+            if len(result) == 3:
+                refresh_success, message, was_refreshed = result
+            else:
+                # Fallback for old version
+                refresh_success, message = result
+                was_refreshed = "refreshed" in message.lower()
+            
+            if refresh_success:
+                print(f"Token check: {message}")
+                
+                # If token was refreshed, reinitialize searcher with new token
+                if was_refreshed:
+                    print("Token was refreshed - reinitializing Gmail searcher...")
+                    try:
+                        new_gmail_tool = build_gmail_toolkit(self.account)
+                        self.gmail_api = new_gmail_tool
+                        replace_source = self.source is self.searcher
+                        self.searcher = EmailSearcher(new_gmail_tool, self.account.name)
+                        if replace_source:
+                            self.source = self.searcher
+                        self.processor.gmail_api = new_gmail_tool
+                        register_gmail(self.account.name, new_gmail_tool)
+                        print("✅ Gmail searcher reinitialized with fresh token")
+                    except Exception as e:
+                        print(f"Failed to reinitialize Gmail searcher after refresh: {e}")
+                        return False
+                
+                return True
+                
+            else:
+                print(f"Token issue: {message}")
+                return False
+                        
+        except Exception as e:
+            print(f"Error checking Gmail token: {e}")
+            return False
+
+
 class EmailManager:
-    def __init__(self, model: str, communicator: Communicator, gmail_api: GmailToolkit, check_interval: int, db_path: str):
+    def __init__(self, model: str, communicator: Communicator, gmail_api: GmailToolkit, check_interval: int, db_path: str, accounts: Optional[List[Account]] = None,
+                 min_check_interval: Optional[float] = None, max_check_interval: Optional[float] = None):
         self.model = model
         self.db_path = db_path
         self.check_interval = check_interval
         
-        self.state = EmailState()
-        self.searcher = EmailSearcher(gmail_api)
+        # Adaptive polling bounds around the configured interval
+        self.min_check_interval = min_check_interval or max(5, check_interval / 8)
+        self.max_check_interval = max_check_interval or check_interval * 8
+        
+        # Shared by every mailbox: workflow registry, executor, compiled graphs (and so the LLM client)
         self.workflow_manager = WorkflowManager()
+        self.workflow_processor = WorkflowProcessor()
         self.communicator = BackendCommunicator(
             communicator.events, 
             communicator.commands
@@ -467,121 +1111,285 @@ class EmailManager:
         self.communicator.model = model
         self.communicator.db_path = db_path
         
-        self.processor = EmailProcessor(
-            workflow_processor= WorkflowProcessor(), 
-            wf_manager= self.workflow_manager,
-            communicator= self.communicator,
-            state = self.state,
-            model=self.model,
-            gmail_api= gmail_api,
-            db_path=self.db_path
-        )
+        self.mailboxes: List[Mailbox] = []
+        for account in accounts or load_accounts():
+            if account.name == DEFAULT_ACCOUNT and gmail_api is not None:
+                account_gmail = gmail_api
+            else:
+                account_gmail = build_gmail_toolkit(account)
+            
+            processor = EmailProcessor(
+                workflow_processor= self.workflow_processor, 
+                wf_manager= self.workflow_manager,
+                communicator= self.communicator,
+                state = EmailState(account.state_file, my_email=account.email),
+                model=self.model,
+                gmail_api= account_gmail,
+                db_path=self.db_path,
+                account=account
+            )
+            poll = AdaptivePollInterval(self.check_interval, self.min_check_interval, self.max_check_interval)
+            self.mailboxes.append(Mailbox(account, account_gmail, processor, poll))
         
+        print(f"Monitoring {len(self.mailboxes)} mailbox(es): {', '.join(m.account.name for m in self.mailboxes)}")
+        
+        # Commands are routed by workflow_id; new drafts go out from the matching mailbox
+        self.processor = self.mailboxes[0].processor
         self.communicator.set_dependencies(self.processor, self.workflow_manager)
+        self.communicator.processors_by_email = {
+            mailbox.account.email.strip().lower(): mailbox.processor for mailbox in self.mailboxes
+        }
+        
+        # Deletes checkpoints of finished workflows and trims waiting ones to their latest
+        from src.checkpoint import CheckpointCompactor, get_checkpointer
+        self.compactor = CheckpointCompactor(get_checkpointer(self.db_path), self.workflow_manager.active_ids)
+        
+        # Failed workflows are kept (registry rows and checkpoints) until they succeed or are discarded
+        self.dead_letters = DeadLetterQueue()
+        self.workflow_processor.dead_letters = self.dead_letters
+        self.communicator.dead_letters = self.dead_letters
+        self.retry_stop = threading.Event()
         
     
+    def recover_workflows(self) -> Dict[str, int]:
+        """
+        Rebuild the waiting-workflow index from the latest checkpoints.
+        
+        emails.json and the email state files are only written at clean
+        shutdown, so after a crash they miss every email handled since start
+        (as did workflows.json before the registry moved to SQLite). The
+        checkpoints are always current. Their state and pending
+        interrupts are read without running any node, the GUI queues are
+        re-sent, and the emails are marked as seen so polling does not start
+        them over. Only workflows cut off mid-step run again, from their last
+        checkpoint.
+        """
+        from src.workflow import EmailResponseWorkflow, get_compiled_workflow
+        
+        start = time.perf_counter()
+        wf = get_compiled_workflow(EmailResponseWorkflow, self.model, self.db_path)
+        store = wf.checkpointer
+        states = {mailbox.account.name: mailbox.state for mailbox in self.mailboxes}
+        counts = {"waiting": 0, "continued": 0, "finished": 0, "skipped": 0}
+        
+        for workflow_id in store.thread_ids():
+            try:
+                snapshot = wf.get_state({"configurable": {"thread_id": workflow_id}})
+                ref = snapshot.values.get("input_email")
+                if not ref:
+                    # SendEmailWorkflow drafts live in the compose view, which cannot be restored
+                    counts["skipped"] += 1
+                    continue
+                
+                email = ref if "body" in ref else store.get_email(ref)
+                account = snapshot.metadata.get("account") or email.get("account")
+                state = states.get(account or DEFAULT_ACCOUNT)
+                if state is not None:
+                    state.add_email(email["id"], email["threadId"])
+                
+                if not snapshot.next:
+                    counts["finished"] += 1
+                    self.workflow_manager.remove_workflow(workflow_id)
+                    continue
+                
+                if self.workflow_manager.get_workflow(workflow_id) is None:
+                    self.workflow_manager.add_workflow(
+                        workflow_id,
+                        self.workflow_manager.initialize_config(workflow_id, account),
+                        self.workflow_manager.initialize_inputs(ref),
+                    )
+                
+                # The GUI ignores emails it already shows (emails.json from a clean shutdown)
+                self.communicator.send_event(NewEmailEvent.from_email({**email, "workflow_id": workflow_id}))
+                
+                interrupted = [task.name for task in snapshot.tasks if task.interrupts]
+                if "send_response" in interrupted:
+                    event = ApprovalEvent(email["id"], snapshot.values.get("draft_response", ""))
+                elif interrupted:
+                    event = event_from_result(snapshot.values)
+                else:
+                    event = None
+                
+                registered = self.workflow_manager.get_workflow(workflow_id)
+                if registered and registered["status"] in ("retrying", "failed"):
+                    # The dead-letter queue owns it: retried on schedule or shown under "Failed"
+                    counts["skipped"] += 1
+                    continue
+                
+                if interrupted:
+                    self.workflow_manager.update_workflow_status(workflow_id, "waiting")
+                    if event is not None:
+                        self.communicator.send_event(event)
+                    counts["waiting"] += 1
+                else:
+                    self.workflow_processor.continue_workflow(
+                        workflow_id, wf, self.workflow_manager, self.communicator, account
+                    )
+                    counts["continued"] += 1
+            
+            except Exception as e:
+                print(f"Could not recover workflow {workflow_id}: {e}")
+                counts["skipped"] += 1
+        
+        for state in states.values():
+            state.save_state()
+        
+        print(f"Recovered workflows in {time.perf_counter() - start:.2f}s: {counts['waiting']} waiting, "
+              f"{counts['continued']} continued, {counts['finished']} finished, {counts['skipped']} skipped")
+        return counts
+    
     def run(self) -> None: 
         """Main monitoring loop with token refresh"""
         print("\n===Starting email monitoring===")
         
+        # Before commands are polled, so GUI actions find the rebuilt workflows
+        try:
+            self.recover_workflows()
+        except Exception as e:
+            print(f"Workflow recovery failed: {e}")
+        
         # Check token at startup
         print("\n=== Checking Gmail token at startup ===")
-        if not self._check_and_refresh_gmail_token():
-            print("⚠️ Warning: Gmail token check failed at startup - may encounter API issues")
+        for mailbox in self.mailboxes:
+            if not mailbox._check_and_refresh_gmail_token():
+                print(f"⚠️ Warning: Gmail token check failed at startup for '{mailbox.account.name}' - may encounter API issues")
 
-        else:
-            print("✅ Gmail token validated successfully at startup")
+            else:
+                print(f"✅ Gmail token validated successfully at startup for '{mailbox.account.name}'")
 
 
         self.commands_thread = threading.Thread(
             target=self.communicator.poll_commands, 
-            args=(self.communicator.process_commands,), 
+            args=(self.communicator.dispatch_command,), 
             daemon=True
         ).start()
 
+        for mailbox in self.mailboxes:
+            if mailbox.push:
+                mailbox.start_push()
+        
+        self.compactor.start()
+        
+        self.retry_thread = threading.Thread(target=self._retry_loop, daemon=True, name="dead-letters")
+        self.retry_thread.start()
+        
+        polled = [mailbox for mailbox in self.mailboxes if not mailbox.push]
+
         try:
             while True:
                 try:
-
-                    print("\n=== Checking Gmail token status ===")
-                    if not self._check_and_refresh_gmail_token():
-                        print("⚠️ Gmail token check failed - continuing with existing connection")
-                    
-                    # Search for today's emails
-                    search_results = self.searcher.fetch_email(self.state)
-                    print(f"Number of emails in search results: {len(search_results)}")
-                                    
-                    if self.state.is_first_run:
-                        self.state.handle_first_run(search_results)
-                    
-                    # Process new emails
-                    self.processor.process_new_emails(search_results)
+                    for mailbox in polled:
+                        if time.monotonic() >= mailbox.next_check:
+                            self._check_mailbox(mailbox)
                     
-                    # Wait before next check
-                    time.sleep(self.check_interval)
+                    # Sleep until the next mailbox is due
+                    next_due = min((mailbox.next_check for mailbox in polled), default=time.monotonic() + self.check_interval)
+                    time.sleep(max(0.5, next_due - time.monotonic()))
                     
                 except KeyboardInterrupt:
                     print("\nMonitoring stopped by user.")
                     break
-                except Exception as e:
-                    print(f"Error in monitoring loop: {e}")
-                    
-                    # If it's a Gmail API error, try token refresh
-                    if "gmail" in str(e).lower() or "auth" in str(e).lower():
-                        print("Detected potential Gmail auth error - attempting token refresh...")
-                        if self._check_and_refresh_gmail_token():
-                            print("✅ Token refreshed, retrying in next cycle")
-                            last_token_check = time.time()  # Update check time after refresh
-                        else:
-                            print("❌ Token refresh failed")
-                    
-                    time.sleep(self.check_interval)
                     
         finally:
             # Record shutdown time when exiting
             self.shutdown()     
     
-    def shutdown(self):
-        """Clean shutdown with state saving"""
-        print("Recording shutdown time...")
-        self.state.record_shutdown()
-        
-
-    def _check_and_refresh_gmail_token(self):
-        """Check and refresh Gmail token, reinitialize searcher if needed"""
+    def _check_mailbox(self, mailbox: "Mailbox") -> None:
+        """One cycle for one account; errors stay contained to that account"""
         try:
-            from helper import refresh_gmail_token
+            print(f"\n=== Checking Gmail token status ({mailbox.account.name}) ===")
+            if not mailbox._check_and_refresh_gmail_token():
+                print("⚠️ Gmail token check failed - continuing with existing connection")
             
-            # Check if helper returns 3 values (enhanced version)
-            result = refresh_gmail_token()
-            if len(result) == 3:
-                refresh_success, message, was_refreshed = result
+            new_emails = mailbox.check()
+            mailbox.poll.record_cycle(new_emails, self._open_workflows(mailbox.account.name))
+            
+        except Exception as e:
+            print(f"Error in monitoring loop ({mailbox.account.name}): {e}")
+            
+            retry_after = _quota_retry_after(e)
+            if retry_after is not None:
+                mailbox.poll.record_quota(retry_after)
             else:
-                # Fallback for old version
-                refresh_success, message = result
-                was_refreshed = "refreshed" in message.lower()
+                mailbox.poll.record_error(e)
             
-            if refresh_success:
-                print(f"Token check: {message}")
-                
-                # If token was refreshed, reinitialize searcher with new token
-                if was_refreshed:
-                    print("Token was refreshed - reinitializing Gmail searcher...")
-                    try:
-                        from langchain_google_community import GmailToolkit
-                        new_gmail_tool = GmailToolkit()
-                        self.searcher = EmailSearcher(new_gmail_tool)
-                        print("✅ Gmail searcher reinitialized with fresh token")
-                    except Exception as e:
-                        print(f"Failed to reinitialize Gmail searcher after refresh: {e}")
-                        return False
-                
-                return True
+                # If it's a Gmail API error, try token refresh
+                if "gmail" in str(e).lower() or "auth" in str(e).lower():
+                    print("Detected potential Gmail auth error - attempting token refresh...")
+                    if mailbox._check_and_refresh_gmail_token():
+                        print("✅ Token refreshed, retrying in next cycle")
+                    else:
+                        print("❌ Token refresh failed")
+        
+        mailbox.next_check = time.monotonic() + mailbox.poll.interval
+        print(f"Next check of '{mailbox.account.name}' in {mailbox.poll.interval:.0f}s ({mailbox.poll.reason})")
+    
+    def _retry_loop(self) -> None:
+        """Hand due retries to the executor a few at a time, sleeping until the next one is due"""
+        from src.workflow import EmailResponseWorkflow, SendEmailWorkflow, get_compiled_workflow
+        
+        workflows = {"email_response": EmailResponseWorkflow, "send_email": SendEmailWorkflow}
+        scheduler = self.workflow_processor.scheduler
+        
+        while not self.retry_stop.is_set():
+            try:
+                # Only refill once the previous batch has been picked up, so retries never pile up
+                # in the retry lane ahead of fresh mail
+                if not scheduler.pending().get(RETRY_LANE):
+                    for item in self.dead_letters.take_due(limit=max(1, self.workflow_processor.max_workers // 4)):
+                        wf = get_compiled_workflow(workflows.get(item["kind"], EmailResponseWorkflow), self.model, self.db_path)
+                        self.workflow_processor.retry_workflow(
+                            item["workflow_id"], wf, item["resume_inputs"], self.workflow_manager, self.communicator
+                        )
                 
-            else:
-                print(f"Token issue: {message}")
-                return False
-                        
-        except Exception as e:
-            print(f"Error checking Gmail token: {e}")
-            return False
\ No newline at end of file
+                due_in = self.dead_letters.next_due_in()
+            except Exception as e:
+                print(f"Error in dead-letter retry loop: {e}")
+                due_in = None
+            
+            self.dead_letters.wakeup.wait(timeout=60 if due_in is None else min(60, max(1.0, due_in)))
+            self.dead_letters.wakeup.clear()
+    
+    def _open_workflows(self, account_name: str) -> int:
+        """Workflows of this account still running or waiting on the user"""
+        return self.workflow_manager.count_open(account_name)
+    
+    def poll_status(self) -> Dict[str, Dict]:
+        """Current polling interval per mailbox and why it was chosen"""
+        now = time.monotonic()
+        return {
+            mailbox.account.name: {
+                "interval": mailbox.poll.interval,
+                "reason": mailbox.poll.reason,
+                "next_check_in": max(0.0, mailbox.next_check - now),
+            }
+            for mailbox in self.mailboxes
+        }
+    
+    def shutdown(self):
+        """Clean shutdown with state saving"""
+        print("Recording shutdown time...")
+        self.compactor.stop()
+        self.retry_stop.set()
+        self.dead_letters.wakeup.set()
+        for mailbox in self.mailboxes:
+            mailbox.source.stop()
+            mailbox.state.record_shutdown()
+        
+        stuck = abandoned_threads()
+        if stuck:
+            print(f"{stuck} node thread(s) still stuck in a call past their deadline")
+        
+        for account, usage in gmail_usage().items():
+            methods = ", ".join(f"{method} {stats['calls']:.0f}" for method, stats in usage["methods"].items())
+            print(f"Gmail ({account}): {usage['units_today']} quota units today ({methods or 'no calls'})")
+        
+        from src.ratelimit import rate_limit_stats
+        for model, stats in rate_limit_stats().items():
+            print(f"OpenAI ({model}): {stats['calls']} calls, {stats['rate_limited']} rate limited, "
+                  f"avg wait {stats['avg_wait_s']:.2f}s, limits {stats['rpm']:.0f} RPM / {stats['tpm']:.0f} TPM")
+        
+        from src.checkpoint import checkpoint_stats
+        for db_path, stats in checkpoint_stats().items():
+            print(f"Checkpoints ({db_path}): {stats['writes']} writes, {stats['bytes'] / 1024:.0f} KiB, "
+                  f"avg {stats['avg_write_ms']:.2f} ms, max {stats['max_write_ms']:.2f} ms")
@@ -0,0 +1,151 @@
+"""
+Run the EmailManager backend in a child process.
+
+The GUI keeps its normal Communicator; BackendProcess relays events and commands
+between it and a pair of multiprocessing queues, so neither side changes. Gmail
+polling, LLM calls and JSON parsing then no longer share the GUI's GIL.
+"""
+import sys
+import time
+import threading
+import multiprocessing
+
+from src.connect import Communicator
+from src.messages import BackendStoppedEvent
+
+
+def _run_backend(events, commands, stop_event, model: str, check_interval: int, db_path: str,
+                 min_check_interval=None, max_check_interval=None):
+    """Child process entry point: build an EmailManager on the IPC queues and run it"""
+    from path_utils import load_environment
+    load_environment()
+
+    from langchain_google_community import GmailToolkit
+    from src.backend import EmailManager
+
+    manager = EmailManager(
+        model=model,
+        communicator=Communicator(events, commands),
+        gmail_api=GmailToolkit(),
+        check_interval=check_interval,
+        db_path=db_path,
+        min_check_interval=min_check_interval,
+        max_check_interval=max_check_interval
+    )
+
+    run_thread = threading.Thread(target=manager.run, daemon=True, name="email-manager")
+    run_thread.start()
+
+    # A monitoring loop that died must end the process too, or the supervisor never restarts it
+    while not stop_event.wait(1.0):
+        if not run_thread.is_alive():
+            print("Backend monitoring loop exited unexpectedly")
+            sys.exit(1)
+
+    manager.shutdown()
+    manager.workflow_manager.save_workflows()
+    print("Backend process stopped")
+
+
+class BackendProcess:
+    """Supervises the backend child process and restarts it if it dies"""
+
+    def __init__(self, communicator: Communicator, model: str, check_interval: int, db_path: str,
+                 min_check_interval=None, max_check_interval=None,
+                 max_restarts: int = 5, restart_delay: float = 2.0, stable_after: float = 600.0):
+        self.communicator = communicator
+        self.model = model
+        self.check_interval = check_interval
+        self.min_check_interval = min_check_interval
+        self.max_check_interval = max_check_interval
+        self.db_path = db_path
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        # A child that stayed up this long counts as healthy again: crashes
+        # spread over weeks of uptime should not use up max_restarts
+        self.stable_after = stable_after
+
+        # spawn everywhere: forking a process that already runs Tk is unsafe
+        self.ctx = multiprocessing.get_context("spawn")
+        self.events = self.ctx.Queue()
+        self.commands = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+
+        self.process = None
+        self.restarts = 0
+        self.started = 0.0
+        self.running = False
+
+    def run(self) -> None:
+        """Start the child and keep it alive until shutdown (blocking, like EmailManager.run)"""
+        self.running = True
+
+        threading.Thread(target=self._relay_events, daemon=True).start()
+        threading.Thread(target=self._relay_commands, daemon=True).start()
+
+        while self.running:
+            if self.process is None:
+                self._spawn()
+
+            elif not self.process.is_alive():
+                if not self.running:
+                    break
+
+                print(f"\nBackend process exited with code {self.process.exitcode}")
+                if time.monotonic() - self.started >= self.stable_after:
+                    self.restarts = 0
+                if self.restarts >= self.max_restarts:
+                    print(f"Backend restarted {self.restarts} times, giving up")
+                    self.communicator.send_event(BackendStoppedEvent(self.restarts, self.process.exitcode))
+                    break
+
+                self.restarts += 1
+                time.sleep(self.restart_delay)
+                if self.running:
+                    print(f"Restarting backend process (attempt {self.restarts})")
+                    self._spawn()
+
+            self.process.join(timeout=1.0)
+
+    def _spawn(self) -> None:
+        self.process = self.ctx.Process(
+            target=_run_backend,
+            args=(self.events, self.commands, self.stop_event,
+                  self.model, self.check_interval, self.db_path,
+                  self.min_check_interval, self.max_check_interval),
+            name="SmartEmailBot-backend",
+            daemon=True
+        )
+        self.process.start()
+        self.started = time.monotonic()
+        print(f"Backend process started (pid {self.process.pid})")
+
+    def _relay_events(self) -> None:
+        """Child -> GUI: re-put on the local queue so its listener wakes the GUI"""
+        while True:
+            event = self.events.get()
+            if event is None:
+                break
+            self.communicator.events.put(event)
+
+    def _relay_commands(self) -> None:
+        """GUI -> child: commands queued while the child restarts are kept"""
+        while True:
+            command = self.communicator.commands.get()
+            if command is None:
+                break
+            self.commands.put(command)
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Ask the child to record its shutdown state and stop"""
+        self.running = False
+        self.stop_event.set()
+
+        if self.process and self.process.is_alive():
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                print("Backend process did not stop, terminating")
+                self.process.terminate()
+
+        self.events.put(None)
+        self.communicator.commands.put(None)
@@ -0,0 +1,280 @@
+"""
+Offline batch triage: classify and summarize an archive without the GUI.
+
+Runs EmailResponseWorkflow up to (not including) interrupts_handler for every
+message of an mbox file, Maildir or .eml folder, so nothing waits on a human
+and nothing is sent. Results are appended to a JSONL file as they finish, which
+doubles as the progress checkpoint: re-running the same command skips every
+email already triaged successfully and retries the failures.
+
+    python main.py --batch archive.mbox --out triage.jsonl --concurrency 16 --rps 8
+    python -m src.batch ~/Maildir --type maildir --out triage.parquet
+
+Parquet output needs pyarrow; the JSONL log is converted once the run completes.
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.sources import FILE_SOURCES
+
+# USD per 1M (input, output) tokens; override with --price-in/--price-out
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+class UsageTracker(BaseCallbackHandler):
+    """Sums token usage over every LLM call of the run (callbacks fire on worker threads)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        input_tokens = output_tokens = 0
+
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+
+        if not (input_tokens or output_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+
+        with self.lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def cost(self, price_in: float, price_out: float) -> float:
+        return (self.input_tokens * price_in + self.output_tokens * price_out) / 1_000_000
+
+
+def detect_source_type(path: Path) -> str:
+    if path.is_dir():
+        return "maildir" if (path / "cur").is_dir() or (path / "new").is_dir() else "eml"
+    return "mbox"
+
+
+def load_done_ids(log_path: Path) -> Set[str]:
+    """Ids triaged successfully by an earlier (possibly interrupted) run; failures are retried"""
+    done = set()
+    if not log_path.exists():
+        return done
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                if not row.get("error"):
+                    done.add(row["id"])
+            except (ValueError, KeyError):
+                # Last line of a run killed mid-write
+                continue
+    return done
+
+
+def write_parquet(log_path: Path, out_path: Path) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print(f"pyarrow is not installed - results left in {log_path}")
+        return
+
+    # Retried emails appear more than once; the last attempt wins
+    rows = {}
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                rows[row["id"]] = row
+            except (ValueError, KeyError):
+                continue
+    rows = list(rows.values())
+
+    pq.write_table(pa.Table.from_pylist(rows), out_path)
+    print(f"Wrote {len(rows)} rows to {out_path}")
+
+
+class BatchTriage:
+    """Runs classifier + summarizer over a corpus with bounded concurrency and memory"""
+
+    def __init__(self, model: str, concurrency: int = 8, requests_per_second: Optional[float] = None):
+        from src.workflow import EmailResponseWorkflow
+        from src.ratelimit import get_rate_limiter
+
+        # --rps caps the model's shared limiter, so the report shows the rate actually applied
+        if requests_per_second:
+            get_rate_limiter(model, rpm=requests_per_second * 60)
+
+        # No checkpointer: batch runs never resume a graph, they only need its output
+        self.workflow = EmailResponseWorkflow(model, db_path=None).get_workflow
+        self.concurrency = concurrency
+        self.usage = UsageTracker()
+        self.config = {"callbacks": [self.usage]}
+
+    def triage(self, email: Dict) -> Dict:
+        inputs = {
+            "input_email": email,
+            "messages": [],
+            "decision": "",
+            "interrupt_decision": "",
+            "send_decision": "",
+            "first_write": True,
+            "summary": "",
+            "draft_response": "",
+            "output_schema": {},
+        }
+
+        row = {
+            "id": email["id"],
+            "thread_id": email["threadId"],
+            "sender": email.get("sender", ""),
+            "subject": email.get("subject", ""),
+            "time": email.get("time", ""),
+            "decision": "",
+            "summary": "",
+            "error": "",
+        }
+
+        start = time.perf_counter()
+        try:
+            state = self.workflow.invoke(inputs, config=self.config, interrupt_before=["interrupts_handler"])
+            summary = state.get("summary")
+            row["decision"] = state.get("decision", "")
+            row["summary"] = getattr(summary, "summary_content", summary) or ""
+        except Exception as e:
+            row["error"] = str(e)
+
+        row["latency"] = round(time.perf_counter() - start, 3)
+        return row
+
+    def run(self, source, log_path: Path, limit: Optional[int] = None) -> Dict:
+        done = load_done_ids(log_path)
+        if done:
+            print(f"Resuming: {len(done)} email(s) already in {log_path}")
+
+        processed = failed = skipped = 0
+        start = time.perf_counter()
+
+        # At most 2x concurrency emails are held in memory at once
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor, \
+                open(log_path, "a", encoding="utf-8") as log:
+
+            def drain(block_until: int) -> None:
+                nonlocal pending, processed, failed
+                while len(pending) > block_until:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        row = future.result()
+                        log.write(json.dumps(row) + "\n")
+                        processed += 1
+                        failed += bool(row["error"])
+                    log.flush()
+
+                    if processed and processed % 100 == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"{processed} triaged ({processed / elapsed:.1f}/s), {failed} failed")
+
+            for email in source.iter_emails():
+                if email["id"] in done:
+                    skipped += 1
+                    continue
+                if limit is not None and processed + len(pending) >= limit:
+                    break
+
+                pending.add(executor.submit(self.triage, email))
+                drain(self.concurrency * 2)
+
+            drain(0)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "processed": processed,
+            "failed": failed,
+            "skipped": skipped,
+            "elapsed": elapsed,
+        }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="batch", description="Classify and summarize a mail archive offline")
+    parser.add_argument("path", help="mbox file, Maildir or folder of .eml files")
+    parser.add_argument("--type", choices=sorted(FILE_SOURCES), help="source type (detected from the path by default)")
+    parser.add_argument("--out", default="triage.jsonl", help="output file, .jsonl or .parquet")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--concurrency", type=int, default=8, help="emails triaged in parallel")
+    parser.add_argument("--rps", type=float, default=None, help="max LLM requests per second")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many new emails")
+    parser.add_argument("--price-in", type=float, default=None, help="USD per 1M input tokens")
+    parser.add_argument("--price-out", type=float, default=None, help="USD per 1M output tokens")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from path_utils import load_environment
+    load_environment()
+
+    path = Path(args.path).expanduser()
+    source = FILE_SOURCES[args.type or detect_source_type(path)](str(path))
+
+    out_path = Path(args.out)
+    parquet = out_path.suffix == ".parquet"
+    log_path = out_path.with_suffix(".partial.jsonl") if parquet else out_path
+
+    batch = BatchTriage(args.model, concurrency=args.concurrency, requests_per_second=args.rps)
+    print(f"=== Batch triage of {path} with {args.model} (concurrency {args.concurrency}) ===")
+
+    report = batch.run(source, log_path, limit=args.limit)
+
+    if parquet:
+        write_parquet(log_path, out_path)
+
+    default_in, default_out = MODEL_PRICES.get(args.model, (0.0, 0.0))
+    price_in = args.price_in if args.price_in is not None else default_in
+    price_out = args.price_out if args.price_out is not None else default_out
+
+    usage = batch.usage
+    elapsed = report["elapsed"]
+    processed = report["processed"]
+
+    print("\n=== Batch report ===")
+    print(f"Emails:      {processed} triaged, {report['failed']} failed, {report['skipped']} skipped (already done)")
+    print(f"Elapsed:     {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.2f} emails/s)")
+    print(f"LLM calls:   {usage.calls} ({usage.input_tokens} input / {usage.output_tokens} output tokens)")
+    from src.ratelimit import rate_limit_stats
+    limits = rate_limit_stats().get(args.model)
+    if limits:
+        print(f"Rate limits: {limits['rpm']:.0f} RPM / {limits['tpm']:.0f} TPM, {limits['rate_limited']} 429s, "
+              f"avg wait {limits['avg_wait_s']:.2f}s per call")
+    cost = usage.cost(price_in, price_out)
+    per_email = cost / processed if processed else 0
+    print(f"Cost:        ${cost:.4f} (${per_email:.6f} per email)")
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,414 @@
+"""
+Process-wide SQLite checkpointer shared by every workflow graph.
+
+One CheckpointStore per database file: a single tuned writer connection (SQLite
+allows one writer at a time anyway) plus a small pool of reader connections, so
+get_tuple calls from concurrent workflows no longer queue behind checkpoint
+writes. WAL journaling lets those readers run while a write commits.
+
+CheckpointCompactor keeps the file bounded: finished threads are deleted after
+a retention period, waiting threads keep only their latest checkpoint, and the
+freed pages are returned with incremental vacuum.
+
+Email content lives in the same file, once per message: workflow state only
+carries {"id", "hash"} (see put_email/get_email), so the body is no longer
+re-serialized into every checkpoint.
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from queue import Queue, Empty
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+PRAGMAS = (
+    # Only takes effect on a new file; CheckpointCompactor converts existing ones
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    # WAL + NORMAL is still crash-safe; only the last commits can be lost on power failure
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+# Last checkpoint time per thread, kept by SQLite itself so writes pay no extra round trip
+ACTIVITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thread_activity (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS checkpoint_activity AFTER INSERT ON checkpoints
+BEGIN
+    INSERT OR REPLACE INTO thread_activity (thread_id, updated_at)
+    VALUES (NEW.thread_id, (julianday('now') - 2440587.5) * 86400.0);
+END;
+CREATE TABLE IF NOT EXISTS email_content (
+    hash TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    email BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS email_content_thread ON email_content (thread_id);
+"""
+
+# Every table keyed by a workflow's thread_id
+THREAD_TABLES = ("checkpoints", "writes", "thread_activity", "email_content")
+
+
+class CheckpointStats:
+    """Read/write latency and payload size, updated from every workflow thread"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.reads = 0
+        self.read_seconds = 0.0
+        self.max_read_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.writes += 1
+            self.seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def record_read(self, seconds: float) -> None:
+        with self.lock:
+            self.reads += 1
+            self.read_seconds += seconds
+            self.max_read_seconds = max(self.max_read_seconds, seconds)
+
+    def add_bytes(self, size: int) -> None:
+        with self.lock:
+            self.bytes += size
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "writes": self.writes,
+                "bytes": self.bytes,
+                "avg_write_ms": (self.seconds / self.writes * 1000) if self.writes else 0.0,
+                "max_write_ms": self.max_seconds * 1000,
+                "reads": self.reads,
+                "avg_read_ms": (self.read_seconds / self.reads * 1000) if self.reads else 0.0,
+                "max_read_ms": self.max_read_seconds * 1000,
+            }
+
+
+class _MeasuredSerde:
+    """Wraps the saver's serializer to count the bytes it writes"""
+
+    def __init__(self, serde, stats: CheckpointStats):
+        self.serde = serde
+        self.stats = stats
+
+    def dumps_typed(self, obj):
+        type_, data = self.serde.dumps_typed(obj)
+        self.stats.add_bytes(len(data))
+        return type_, data
+
+    def __getattr__(self, name):
+        return getattr(self.serde, name)
+
+
+class CheckpointStore(SqliteSaver):
+    """SqliteSaver with a dedicated writer connection and pooled readers"""
+
+    def __init__(self, db_path: str, readers: int = 4, serde=None, email_cache_size: int = 256):
+        super().__init__(connect(db_path), serde=serde)
+        self.db_path = db_path
+        self.stats = CheckpointStats()
+        self.serde = _MeasuredSerde(self.serde, self.stats)
+
+        # Recently used email bodies; nodes of one workflow resolve the same email repeatedly
+        self.email_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.email_cache_size = email_cache_size
+        self.email_cache_lock = threading.Lock()
+
+        self.readers: "Queue[sqlite3.Connection]" = Queue()
+        self.all_readers = []
+        for _ in range(readers):
+            reader = connect(db_path)
+            self.readers.put(reader)
+            self.all_readers.append(reader)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(ACTIVITY_SCHEMA)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        if transaction:
+            with super().cursor(transaction=True) as cur:
+                yield cur
+            return
+
+        if not self.is_setup:
+            with self.lock:
+                self.setup()
+
+        try:
+            reader = self.readers.get(timeout=5)
+        except Empty:
+            reader = None
+
+        if reader is None:
+            # Pool exhausted (more concurrent readers than connections): share the writer
+            with super().cursor(transaction=False) as cur:
+                yield cur
+            return
+
+        cur = reader.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+            self.readers.put(reader)
+
+    def list(self, *args, **kwargs):
+        # Upstream reads pending writes through self.conn, which belongs to the writer lock
+        with self.lock:
+            items = [item for item in super().list(*args, **kwargs)]
+        yield from items
+
+    def get_tuple(self, config):
+        start = time.perf_counter()
+        try:
+            return super().get_tuple(config)
+        finally:
+            self.stats.record_read(time.perf_counter() - start)
+
+    def put(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().put(*args, **kwargs)
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+    def put_writes(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().put_writes(*args, **kwargs)
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints, writes, activity row and stored email"""
+        with self.cursor() as cur:
+            for table in THREAD_TABLES:
+                cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+
+    def thread_ids(self) -> List[str]:
+        """Every thread with a checkpoint (top-level graphs only)"""
+        with self.cursor(transaction=False) as cur:
+            return [row[0] for row in cur.execute("SELECT DISTINCT thread_id FROM checkpoints WHERE checkpoint_ns = ''")]
+
+    # ------------------------------------------------------------ email content
+
+    def put_email(self, email: Dict, thread_id: str) -> Dict:
+        """Store the full email once and return the reference kept in workflow state"""
+        data = json.dumps(email, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:32]
+
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO email_content (hash, thread_id, email) VALUES (?, ?, ?)",
+                (digest, thread_id, data),
+            )
+        self._cache_email(digest, email)
+
+        return {"id": email["id"], "hash": digest}
+
+    def get_email(self, ref: Dict) -> Dict:
+        """Full email for a reference made by put_email"""
+        digest = ref["hash"]
+        with self.email_cache_lock:
+            email = self.email_cache.get(digest)
+            if email is not None:
+                self.email_cache.move_to_end(digest)
+                return email
+
+        with self.cursor(transaction=False) as cur:
+            row = cur.execute("SELECT email FROM email_content WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Email content {digest} (id {ref.get('id')}) is missing")
+
+        email = json.loads(row[0])
+        self._cache_email(digest, email)
+        return email
+
+    def _cache_email(self, digest: str, email: Dict) -> None:
+        with self.email_cache_lock:
+            self.email_cache[digest] = email
+            self.email_cache.move_to_end(digest)
+            while len(self.email_cache) > self.email_cache_size:
+                self.email_cache.popitem(last=False)
+
+    def close(self) -> None:
+        with self.lock:
+            for reader in self.all_readers:
+                reader.close()
+            self.conn.close()
+
+
+class CheckpointCompactor:
+    """
+    Background cleanup of a CheckpointStore.
+
+    `active_ids` returns the workflow ids still tracked by WorkflowManager (the
+    ones waiting on the user or running). Every other thread is finished or
+    abandoned and is deleted once it has been idle for `retention` seconds.
+    """
+
+    def __init__(self, store: CheckpointStore, active_ids: Callable[[], Set[str]],
+                 retention: float = 24 * 3600, interval: float = 3600, vacuum_pages: int = 20000):
+        self.store = store
+        self.active_ids = active_ids
+        self.retention = retention
+        self.interval = interval
+        self.vacuum_pages = vacuum_pages
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self._enable_incremental_vacuum()
+        while not self._stop.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting checkpoints: {e}")
+            self._stop.wait(self.interval)
+
+    def _enable_incremental_vacuum(self) -> None:
+        """One-off conversion of databases created before auto_vacuum was set"""
+        with self.store.cursor() as cur:
+            mode = cur.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == 2:
+            return
+
+        print(f"Converting {self.store.db_path} to incremental vacuum (one-time full VACUUM)")
+        with self.store.lock:
+            self.store.conn.commit()
+            self.store.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.store.conn.execute("VACUUM")
+
+    def compact(self) -> Dict:
+        """Run one cleanup pass; returns what was removed"""
+        start = time.perf_counter()
+        active = set(self.active_ids())
+        cutoff = time.time() - self.retention
+
+        with self.store.cursor() as cur:
+            # Threads that ran before thread_activity existed count as idle since now
+            cur.execute(
+                "INSERT OR IGNORE INTO thread_activity (thread_id, updated_at) "
+                "SELECT DISTINCT thread_id, ? FROM checkpoints", (time.time(),)
+            )
+
+            idle = [
+                row[0] for row in cur.execute(
+                    "SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,)
+                )
+                if row[0] not in active
+            ]
+            for thread_id in idle:
+                for table in THREAD_TABLES:
+                    cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+            # Waiting threads resume from their latest checkpoint; its ancestors are history
+            cur.execute(
+                """
+                DELETE FROM checkpoints WHERE checkpoint_id < (
+                    SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest
+                    WHERE latest.thread_id = checkpoints.thread_id
+                      AND latest.checkpoint_ns = checkpoints.checkpoint_ns
+                )
+                """
+            )
+            pruned = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM writes WHERE checkpoint_id < (
+                    SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest
+                    WHERE latest.thread_id = writes.thread_id
+                      AND latest.checkpoint_ns = writes.checkpoint_ns
+                )
+                """
+            )
+
+        with self.store.lock:
+            # execute() steps the pragma once (one page); executescript runs it to completion
+            self.store.conn.executescript(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+            self.store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+        report = {
+            "deleted_threads": len(idle),
+            "pruned_checkpoints": pruned,
+            "db_bytes": os.path.getsize(self.store.db_path) if os.path.exists(self.store.db_path) else 0,
+            "seconds": time.perf_counter() - start,
+        }
+        print(f"Checkpoint compaction: {report['deleted_threads']} finished thread(s) deleted, "
+              f"{report['pruned_checkpoints']} old checkpoint(s) pruned, "
+              f"db {report['db_bytes'] / 1024:.0f} KiB ({report['seconds']:.2f}s)")
+        return report
+
+
+_stores: Dict[str, CheckpointStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_checkpointer(db_path: str, serde=None) -> CheckpointStore:
+    """The shared checkpointer for db_path, opened on first use (serde defaults to CompressedSerializer)"""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            from src.serde import CompressedSerializer
+            store = CheckpointStore(db_path, serde=serde or CompressedSerializer())
+            _stores[db_path] = store
+        return store
+
+
+def open_checkpointers() -> List[CheckpointStore]:
+    with _stores_lock:
+        return list(_stores.values())
+
+
+def checkpoint_stats() -> Dict[str, Dict]:
+    with _stores_lock:
+        return {db_path: store.stats.snapshot() for db_path, store in _stores.items()}
+
+
+def close_checkpointers() -> None:
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
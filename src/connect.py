@@ -1,19 +1,95 @@
-from queue import Queue
+from queue import Queue, Empty
+from collections import deque
+import threading
 import time
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.messages import (
+    NewEmailEvent, NotifyEvent, SpamEvent, ApprovalEvent, RewriteEvent,
+    SendEmailDraftEvent, SendEmailRewriteEvent, WorkflowFailedEvent, BackendStoppedEvent,
+    GenerateEmailCommand, ResumeWorkflowCommand, SendEmailDecisionCommand,
+    RetryFailedCommand, DiscardFailedCommand, CancelWorkflowCommand,
+    event_from_result, make_command,
+)
+
+class EventQueue(Queue):
+    """Queue that calls a listener after every put, so consumers can sleep until woken"""
+    
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.listener: Optional[Callable[[], None]] = None
+    
+    def set_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        self.listener = listener
+    
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        listener = self.listener
+        if listener:
+            try:
+                listener()
+            except Exception as e:
+                print(f"\nError waking event consumer: {e} - (EventQueue.put)")
+
+
+class CommandDispatcher:
+    """
+    Runs commands on an executor. Commands for the same workflow_id form a lane
+    and run one after another; different workflows run concurrently.
+    """
+    
+    def __init__(self, handler: Callable[[Any], None], executor):
+        self.handler = handler
+        self.executor = executor
+        self.lanes: Dict[Any, deque] = {}
+        self.lock = threading.Lock()
+    
+    def dispatch(self, command) -> None:
+        """Queue `command` on its lane; never blocks on the command itself"""
+        key = getattr(command, "workflow_id", None)
+        
+        with self.lock:
+            lane = self.lanes.get(key)
+            if lane is not None:
+                # The lane's runner picks it up once earlier commands finish
+                lane.append(command)
+                return
+            self.lanes[key] = deque([command])
+        
+        self.executor.submit(self._run_lane, key)
+    
+    def _run_lane(self, key) -> None:
+        while True:
+            with self.lock:
+                lane = self.lanes[key]
+                if not lane:
+                    del self.lanes[key]
+                    return
+                command = lane.popleft()
+            
+            try:
+                self.handler(command)
+            except Exception as e:
+                print(f"\nError running command {command!r}: {e} - (CommandDispatcher)")
+
 
 class Communicator:
-    def __init__(self):
-        self.events = Queue()
-        self.commands = Queue()
+    def __init__(self, events=None, commands=None):
+        # Any queue-like objects work here, e.g. multiprocessing queues in a child process
+        self.events = events if events is not None else EventQueue()
+        self.commands = commands if commands is not None else Queue()
         
-    def send_events(self, type_event: str, data: Any) -> None:
-        events = {"type": type_event, "data": data}
-        self.events.put(events)
+    def send_event(self, event) -> None:
+        """Queue a typed event (see src.messages) for the frontend"""
+        self.events.put(event)
+    
+    def send_command(self, command) -> None:
+        """Queue a typed command (see src.messages) for the backend"""
+        self.commands.put(command)
     
     def send_commands(self, type_command: str, data: Any) -> None:
-        commands = {"type": type_command, "data": data}
-        self.commands.put(commands)    
+        """Build the typed command for a GUI command name; raises ValueError if invalid"""
+        self.send_command(make_command(type_command, data))
         
     def poll_events(self, callback_func, max_events_per_poll=5):
         events_processed = 0
@@ -31,6 +107,21 @@ class Communicator:
         except Exception as e:
             print(f"\nError processing events: {e} - (poll_events)")
     
+    def set_event_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """Call `listener` (from the producing thread) whenever an event is enqueued"""
+        if isinstance(self.events, EventQueue):
+            self.events.set_listener(listener)
+    
+    def drain_events(self, max_events: int) -> List[Any]:
+        """Take up to `max_events` queued events without blocking"""
+        drained = []
+        while len(drained) < max_events:
+            try:
+                drained.append(self.events.get_nowait())
+            except Empty:
+                break
+        return drained
+    
     def poll_commands(self, callback_func):
         print(f"**START POLL COMMANDS** - (poll_commands)")
         time.sleep(0.05)
@@ -52,105 +143,71 @@ class BackendCommunicator(Communicator):
         self.commands = commands
         self.processor = processor 
         self.workflow_manager = workflow_manager
+        self.dispatcher: Optional[CommandDispatcher] = None
+        self.processors_by_email: Dict[str, Any] = {}
+        # Set by EmailManager
+        self.dead_letters = None
+        self._command_handlers = {
+            GenerateEmailCommand: self._handle_generate_email,
+            ResumeWorkflowCommand: self._handle_resume_workflow,
+            SendEmailDecisionCommand: self._handle_send_email_workflow,
+            RetryFailedCommand: self._handle_retry_failed,
+            DiscardFailedCommand: self._handle_discard_failed,
+            CancelWorkflowCommand: self._handle_cancel_workflow,
+        }
         
     def set_dependencies(self, processor, workflow_manager):
         """Set processor and workflow manager after initialization"""
         self.processor = processor
         self.workflow_manager = workflow_manager
+        self.dispatcher = CommandDispatcher(
+            self.process_commands,
+            processor.workflow_processor.executor
+        )
 
-    def process_events(self, event_results: Dict):
+    def dispatch_command(self, command) -> None:
+        """Validate and hand a command to the dispatcher (used by poll_commands)"""
+        if type(command) not in self._command_handlers:
+            print(f"\nUnknown command: {command!r} - (dispatch_command)")
+            return
         
-        if "new_email" in event_results:
-            email = event_results.get("new_email")
-            self.send_events(type_event= "new_email", data= email)            
+        # Cancels must not queue behind the run they cancel (same workflow_id lane)
+        if self.dispatcher is None or isinstance(command, CancelWorkflowCommand):
+            self.process_commands(command)
+            return
         
-        elif (event_results.get("decision", "") == "notify") and (event_results.get("first_write")):
-            summary = event_results.get("summary")
-            id = event_results.get("input_email")["id"]
-            
-            data = {
-                "summary": summary.summary_content,
-                "id": id
-            }
-            self.send_events(type_event= "notify", data= data)
-
-        elif (event_results.get("decision", "") == "ignore") and (event_results.get("first_write")):
-            id = event_results.get("input_email")["id"]
-            summary = event_results.get("summary", "")
+        self.dispatcher.dispatch(command)
 
-            
-            data = {
-                "summary": summary,
-                "id": id
-            }
-            self.send_events(type_event= "spam", data= data)
-    
-        elif not event_results.get("first_write") and not event_results.get("send_decision") and event_results.get("input_email"):
-            draft = event_results.get("draft_response")
-            id = event_results.get("input_email")["id"]
-            
-            data = {
-                "draft": draft,
-                "id": id
-            }
-            self.send_events(type_event= "approval", data= data)
-            
-        elif event_results and (event_results.get("send_decision") == "rewrite") and event_results.get("input_email"):
-            draft = event_results.get("draft_response")       
-            id = event_results.get("input_email")["id"]
-            data = {
-                "draft": draft,
-                "id": id
-            }
-                
-            self.send_events(type_event= "rewrite", data= data)
-
-        # Handle initial send email draft (first write)
-        elif not event_results.get("first_write") and not event_results.get("send_decision") and not event_results.get("input_email"):
-            draft = event_results.get("draft_response")
-            data = {"draft": draft}
-            self.send_events(type_event="send_email_draft", data=data)
-        
-        # Handle send email rewrite
-        elif event_results.get("send_decision") == "rewrite" and not event_results.get("input_email"):
-            print(f"\n\n\n{event_results.keys()}\n\n\n")
-            draft = event_results.get("draft_response")
-            data = {"draft": draft}
-            self.send_events(type_event="send_email_rewrite", data=data)
+    def process_events(self, event_results: Dict):
+        """Turn a paused workflow's result into the typed event the GUI needs"""
+        event = event_from_result(event_results)
+        
+        if event is None:
+            print(f"\nNo frontend event for workflow result - (process_events)")
+            return
+        
+        self.send_event(event)
 
-            
-    def process_commands(self, command: Dict):
+    def process_commands(self, command):
         """Process incoming commands from frontend"""
         try:
-            command_type = command.get("type")
-            command_data = command.get("data", {})
+            print(f"\nProcessing command: {type(command).__name__} - (process_commands)")
             
-            print(f"\nProcessing command: {command_type} - (process_commands)")
-
-            if command_type == "generate_email":
-                self._handle_generate_email(command_data)
-            
-            elif command_type in ["approve_draft", "reject_draft", "send_email"]:
-                # Handle send email workflow commands
-                self._handle_send_email_workflow(command_type, command_data)
+            handler = self._command_handlers.get(type(command))
+            if handler is None:
+                print(f"\nUnknown command: {command!r} - (process_commands)")
+                return
             
-            else:
-                # Handle regular email response workflow
-                self._handle_resume_workflow(command_data)
+            handler(command)
 
         except Exception as e:
             print(f"\nError processing command: {e} - (process_commands)")
 
-    def _handle_send_email_workflow(self, command_type: str, command_data: Dict):
+    def _handle_send_email_workflow(self, command: SendEmailDecisionCommand):
         """Handle send email workflow commands"""
         try:
             # Import here to avoid circular imports
-            from src.workflow import SendEmailWorkflow
-            
-            workflow_id = command_data.get("workflow_id")
-            if not workflow_id:
-                print("\nNo workflow_id provided for send email command")
-                return
+            from src.workflow import SendEmailWorkflow, get_compiled_workflow
             
             # Add missing attributes that nodes.py might need
             if not hasattr(self, 'model'):
@@ -158,27 +215,16 @@ class BackendCommunicator(Communicator):
             if not hasattr(self, 'db_path'):
                 self.db_path = "db/workflows.db"  # Default db path
                 
-            workflow_instance = SendEmailWorkflow(self.model, self.db_path)
-            wf = workflow_instance.get_workflow
-            
-            # Map command types to resume inputs
-            if command_type == "approve_draft":
-                resume_inputs = {"flag": True}
-            elif command_type == "reject_draft":
-                resume_inputs = {
-                    "flag": False, 
-                    "feedback": command_data.get("feedback", "")
-                }
-            elif command_type == "send_email":
-                resume_inputs = {"flag": True}
+            wf = get_compiled_workflow(SendEmailWorkflow, self.model, self.db_path)
             
             self.processor.workflow_processor.process_email(
-                workflow_id=workflow_id,
+                workflow_id=command.workflow_id,
                 wf=wf,
-                resume_inputs=resume_inputs,
+                resume_inputs=command.resume_inputs(),
                 wf_manager=self.workflow_manager,
                 communicator=self,
-                resume=True
+                resume=True,
+                wait=True
             )
             
         except Exception as e:
@@ -186,19 +232,14 @@ class BackendCommunicator(Communicator):
             import traceback
             traceback.print_exc()
         
-    def _handle_generate_email(self, command_data: Dict):
+    def _handle_generate_email(self, command: GenerateEmailCommand):
         from src.prompts import send_email_writer_prompt
         from langchain_core.messages import HumanMessage
         
-        from_email = command_data.get("from_email")
-        to_email = command_data.get("to_email")
-        users_intent = command_data.get("users_intent")
-        workflow_id = command_data.get("workflow_id")
-        
         messages = HumanMessage(content=send_email_writer_prompt.format(
-            from_user=from_email, 
-            to_user=to_email, 
-            users_intent=users_intent
+            from_user=command.from_email, 
+            to_user=command.to_email, 
+            users_intent=command.users_intent
         ))
         inputs = {"messages": [messages]}
         
@@ -206,15 +247,20 @@ class BackendCommunicator(Communicator):
             print("\nWorkflowManager or EmailProcessor not available")
             return
         
-        self.processor.process_generate_email(
+        # Send from the mailbox the user picked, if we monitor it
+        sender = (command.from_email or "").strip().lower()
+        processor = self.processors_by_email.get(sender, self.processor)
+        
+        processor.process_generate_email(
             inputs=inputs,
-            workflow_id=workflow_id
+            workflow_id=command.workflow_id,
+            wait=True
         )
 
-    def _handle_resume_workflow(self, command_data: Dict):
+    def _handle_resume_workflow(self, command: ResumeWorkflowCommand):
         """Handle workflow resume command"""
         try:
-            from src.workflow import EmailResponseWorkflow
+            from src.workflow import EmailResponseWorkflow, get_compiled_workflow
             
             # Add missing attributes
             if not hasattr(self, 'model'):
@@ -222,13 +268,7 @@ class BackendCommunicator(Communicator):
             if not hasattr(self, 'db_path'):
                 self.db_path = "db/workflows.db" 
                 
-            workflow_instance = EmailResponseWorkflow(self.model, self.db_path)
-            wf = workflow_instance.get_workflow
-            workflow_id = command_data.get("workflow_id")
-
-            if not workflow_id:
-                print("\nNo workflow_id provided in resume command")
-                return
+            wf = get_compiled_workflow(EmailResponseWorkflow, self.model, self.db_path)
             
             if not self.workflow_manager:
                 print("\nWorkflowManager not available")
@@ -240,18 +280,43 @@ class BackendCommunicator(Communicator):
             
             # Resume workflow through processor
             self.processor.workflow_processor.process_email(
-                workflow_id= workflow_id,
+                workflow_id= command.workflow_id,
                 wf= wf,
-                resume_inputs=command_data,
+                resume_inputs=command.resume_inputs(),
                 wf_manager=self.workflow_manager,
                 communicator=self,
-                resume=True
+                resume=True,
+                wait=True
             )
             
         except Exception as e:
             print(f"Error in _handle_resume_workflow: {e}")
             import traceback
             traceback.print_exc()
+    
+    def _handle_retry_failed(self, command: RetryFailedCommand):
+        """Make a dead-lettered workflow due now; the retry loop picks it up"""
+        if self.dead_letters is None or not self.dead_letters.retry_now(command.workflow_id):
+            print(f"\nWorkflow {command.workflow_id} is not in the dead-letter queue - (_handle_retry_failed)")
+            return
+        
+        if self.workflow_manager:
+            self.workflow_manager.update_workflow_status(command.workflow_id, "retrying")
+    
+    def _handle_discard_failed(self, command: DiscardFailedCommand):
+        """Drop a dead-lettered workflow; the compactor deletes its checkpoints"""
+        if self.dead_letters is not None:
+            self.dead_letters.resolve(command.workflow_id)
+        if self.workflow_manager:
+            self.workflow_manager.remove_workflow(command.workflow_id)
+    
+    def _handle_cancel_workflow(self, command: CancelWorkflowCommand):
+        """Cancel a workflow the user abandoned (e.g. a draft they no longer want)"""
+        if not self.processor:
+            print("\nEmailProcessor not available")
+            return
+        
+        self.processor.workflow_processor.cancel_workflow(command.workflow_id, self.workflow_manager)
             
 
 class FrontendCommunicator(Communicator):
@@ -259,146 +324,191 @@ class FrontendCommunicator(Communicator):
         self.events = events
         self.commands = commands
         self.gui = None 
+        self.notification = None
+        self._pending_notifications: List[Dict] = []
+        self._event_handlers = {
+            NewEmailEvent: self._handle_new_email,
+            NotifyEvent: self._handle_notify_decision,
+            SpamEvent: self._handle_spam_email,
+            ApprovalEvent: self._handle_draft_ready,
+            RewriteEvent: self._handle_rewrite,
+            SendEmailDraftEvent: self._handle_send_email_draft,
+            SendEmailRewriteEvent: self._handle_send_email_draft,
+            WorkflowFailedEvent: self._handle_workflow_failed,
+            BackendStoppedEvent: self._handle_backend_stopped,
+        }
         
     def set_gui(self, gui):
         """Set the GUI reference for updating the interface"""
         self.gui = gui
     
-    def process_events(self, event: Dict):
-        """Process events from backend and update GUI"""
-        try:
-            event_type = event.get("type")
-            event_data = event.get("data", {})
-            
-            print(f"\nFrontend processing event: {event_type} - (process_events)")
-            
-            if event_type == "new_email":
-                self._handle_new_email(event_data)
-                
-            elif event_type == "notify":
-                self._handle_notify_decision(event_data)
+    def process_events(self, event):
+        """Process a single event from backend and update GUI"""
+        self.refresh_views(self.apply_events([event]))
+
+    def apply_events(self, events: List[Any]) -> Set[str]:
+        """
+        Coalesce a batch of events and apply their model changes.
+        Returns the categories that changed; the caller refreshes the view once.
+        """
+        dirty = set()
+        
+        for event in self._coalesce(events):
+            try:
+                print(f"\nFrontend processing event: {type(event).__name__} - (apply_events)")
                 
-            elif event_type == "spam":
-                self._handle_spam_email(event_data)
+                handler = self._event_handlers.get(type(event))
+                if handler is None:
+                    print(f"\nUnknown event: {event!r} - (apply_events)")
+                    continue
                 
-            elif event_type == "approval":
-                self._handle_draft_ready(event_data)
-            
-            elif event_type == "rewrite":
-                self._handle_rewrite(event_data)
+                category = handler(event)
+                if category:
+                    dirty.add(category)
+                    
+            except Exception as e:
+                print(f"\nError processing frontend event: {e}")
+        
+        self._flush_notifications()
+        return dirty
 
-            elif event_type in ["send_email_draft", "send_email_rewrite"]:
-                self._handle_send_email_draft(event_data)
-                
-        except Exception as e:
-            print(f"\nError processing frontend event: {e}")
+    def refresh_views(self, dirty: Set[str]) -> None:
+        """Refresh the on-screen category once if any applied event touched it"""
+        if self.gui and self.gui.current_category in dirty:
+            self.gui.refresh_category(self.gui.current_category)
+
+    @staticmethod
+    def _coalesce(events: List[Any]) -> List[Any]:
+        """
+        Collapse back-to-back events with the same type and email ID, keeping the
+        latest one. Only consecutive repeats are merged, so the order of events
+        is never changed (a recovered New/Notify pair stays in that order), and
+        events without an ID (drafts for the send view) are never merged.
+        """
+        coalesced = []
+        for event in events:
+            key = (type(event), getattr(event, "id", None))
+            if key[1] is not None and coalesced:
+                last = coalesced[-1]
+                if (type(last), getattr(last, "id", None)) == key:
+                    coalesced[-1] = event
+                    continue
+            coalesced.append(event)
+        return coalesced
+
+    def _flush_notifications(self):
+        """Send one desktop notification per batch instead of one per email"""
+        if not self._pending_notifications:
+            return
+        
+        from src.utils import Notification
+        if self.notification is None:
+            self.notification = Notification()
+        
+        if len(self._pending_notifications) == 1:
+            pending = self._pending_notifications[0]
+            self.notification.new_notify_email(pending["sender"], pending["summary"])
+        else:
+            self.notification.new_notify_emails(len(self._pending_notifications))
+        
+        self._pending_notifications = []
 
-    def _handle_send_email_draft(self, data):
+    def _handle_send_email_draft(self, event):
         """Handle draft generated for send email"""
         if self.gui and hasattr(self.gui, 'send_email_view'):
-            draft = data.get("draft")
-            self.gui.handle_draft_generated(draft_content=draft)
+            self.gui.handle_draft_generated(draft_content=event.draft)
     
-    def _handle_new_email(self, data):
+    def _handle_new_email(self, event: NewEmailEvent):
         """Handle new email received"""
-
-        id = data.get("id")
-        thread = data.get("threadId")
-        snippet = data.get("snippet")
-        body = data.get("body")
-        subject = data.get("subject")
-        sender = data.get("sender")
-        time = data.get("time")
-        workflow_id = data.get("workflow_id")
+        from src.email_service import EmailService, EmailData
+        print(f"\nNew email received: {event.snippet} - (_handle_new_email")
         
-        if self.gui:
-            from src.email_service import EmailService, EmailData
-            print(f"\nNew email received: {snippet} - (_handle_new_email")
-            
-            EmailService.add_new_email(email= EmailData(subject, thread, sender, body, time, id= id, workflow_id= workflow_id))
-            if self.gui.current_category == "home":
-                self.gui.load_emails("home")
+        # Recovered workflows re-announce their email; keep the one already loaded
+        if EmailService.get_email("home", event.id) is not None:
+            return None
+        
+        EmailService.add_new_email(email= EmailData(event.subject, event.thread_id, event.sender, event.body, event.time, id= event.id, workflow_id= event.workflow_id))
+        return "home"
     
-    def _handle_notify_decision(self, data):
+    def _handle_notify_decision(self, event: NotifyEvent):
         """Handle email classified as notify"""
-        if self.gui:
-            from src.utils import Notification
-            from src.email_service import EmailService
-            
-            notification = Notification()
+        from src.email_service import EmailService
 
-            summary = data.get("summary") 
-            email_id = data.get("id")
-
-            print(f"\nEmail `{email_id}` classified as notify with summary - (_handle_notify_decision)")
-            
-            email = EmailService.get_email("home", email_id)
-            email.summary = summary
-            email.category = "notify"
-            sender = email.sender
-            
-            notification.new_notify_email(sender, summary)
-            
-            EmailService.add_to_notify(email)
-            
-            # Refresh notify view if currently viewing it
-            if self.gui.current_category == "notify":
-                self.gui.load_emails("notify")
+        print(f"\nEmail `{event.id}` classified as notify with summary - (_handle_notify_decision)")
+        
+        email = EmailService.get_email("home", event.id)
+        email.summary = event.summary
+        email.category = "notify"
+        
+        # Desktop notifications only make sense with the GUI running
+        if self.gui:
+            self._pending_notifications.append({"sender": email.sender, "summary": event.summary})
+        
+        EmailService.add_to_notify(email)
+        return "notify"
                 
-    def _handle_spam_email(self, data):
+    def _handle_spam_email(self, event: SpamEvent):
         """Handle email classified as spam"""
-        if self.gui:
+        from src.email_service import EmailService
+        print(f"\nEmail {event.id} classified as spam - (_handle_spam_email)")
 
-            from src.email_service import EmailService
-            email_id = data.get("id")
-            print(f"\nEmail {email_id} classified as spam - (_handle_spam_email)")
+        
+        email = EmailService.get_email("home", event.id)
+        email.category = "ignore"
+        EmailService.add_to_ignore(email)
+        return "ignore"
+                
 
+    def _handle_draft_ready(self, event: ApprovalEvent):
+        """Handle draft response ready for approval"""
+        try:
+            from src.email_service import EmailService
+            
+            print(f"\nDraft ready for approval {event.id} - (_handle_draft_ready)")
             
-            email = EmailService.get_email("home", email_id)
-            email.category = "ignore"
-            EmailService.add_to_ignore(email)
+            email = EmailService.get_email("home", event.id)
+            email.draft_response = event.draft
             
-            if self.gui.current_category == "ignore":
-                self.gui.load_emails("ignore")
+            EmailService.notify_to_pending(email)
+            return "human"
+        
+        except Exception:
+            if self.gui:
+                self.gui.handle_draft_generated(draft_content= event.draft)
                 
-
-    def _handle_draft_ready(self, data):
-        """Handle draft response ready for approval"""
+    def _handle_rewrite(self, event: RewriteEvent):
+        from src.email_service import EmailService
+        
+        print(f"\nRewrite draft response. Waiting for human approval - (_handle_rewrite)")
+        
+        email = EmailService.get_email("human", event.id)
+        EmailService.regenerate_draft_response(email, event.draft)
+        
         if self.gui:
-            try:
-                from src.email_service import EmailService
-                
-                draft = data.get("draft")
-                email_id = data.get("id")
-                
-                print(f"\nDraft ready for approval {email_id} - (_handle_draft_ready)")
+            self.gui.email_detail._show_draft_response(event.draft)
                 
-                email = EmailService.get_email("home", email_id)
-                email.draft_response = draft
-                
-                EmailService.notify_to_pending(email)
-                
-                # Refresh pending view if currently viewing it
-                if self.gui.current_category == "human":
-                    self.gui.load_emails("human")
-            
-            except Exception:
-                draft = data.get("draft")
-                self.gui.handle_draft_generated(draft_content= draft)
+    def _handle_workflow_failed(self, event: WorkflowFailedEvent):
+        """Handle a workflow that failed for good: show it under Failed with its error"""
+        from src.email_service import EmailService
+        
+        print(f"\nWorkflow for email {event.id} failed: {event.error_class} - (_handle_workflow_failed)")
+        
+        email = EmailService.get_email("home", event.id)
+        if email is None:
+            return None
+        
+        email.workflow_id = event.workflow_id
+        email.summary = f"{event.error_class}: {event.error}"
+        EmailService.add_to_failed(email)
+        return "failed"
                 
-    def _handle_rewrite(self, data):
+    def _handle_backend_stopped(self, event: BackendStoppedEvent):
+        """Tell the user the backend is down: no new emails arrive until a restart"""
+        print(f"\nBackend stopped after {event.restarts} restarts (exit code {event.exit_code}) - (_handle_backend_stopped)")
         if self.gui:
-            from src.email_service import EmailService
-            draft = data.get("draft")
-            email_id = data.get("id")
-            
-            print(f"\nRewrite draft response. Waiting for human approval - (_handle_rewrite)")
-            
-            email = EmailService.get_email("human", email_id)
-            EmailService.regenerate_draft_response(email, draft)
-            
-            self.gui.email_detail._show_draft_response(draft)
+            self.gui.show_backend_stopped(event.restarts, event.exit_code)
+        return None
                 
     def has_pending_events(self):
         """Check if there are pending events without removing them"""
-        return not self.events.empty()
\ No newline at end of file
+        return not self.events.empty()
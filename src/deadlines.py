@@ -0,0 +1,174 @@
+"""
+Deadlines and cooperative cancellation for workflow runs.
+
+A workflow run (one invoke of a compiled graph) gets a CancelScope keyed by its
+thread_id: a wall-clock deadline plus a cancel flag the GUI can set. Graph
+nodes are wrapped with `guarded`, which runs the node body on its own daemon
+thread and waits for it against the node timeout, the run's deadline and the
+cancel flag. Python cannot kill a thread, so a node stuck in a hung LLM or
+Gmail call is abandoned rather than stopped: the workflow worker raises and
+goes back to the pool, the abandoned thread exits whenever its socket call
+returns, and its result is discarded (the run has already failed, so nothing
+it returns is checkpointed).
+"""
+import time
+import inspect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# Seconds; a node covers one LLM request with the client's own retries
+LLM_TIMEOUT = 60
+LLM_MAX_RETRIES = 2
+NODE_TIMEOUT = LLM_TIMEOUT * (LLM_MAX_RETRIES + 1)
+WORKFLOW_TIMEOUT = 600
+# How often a waiting node checks for cancellation
+POLL_INTERVAL = 0.2
+
+
+class WorkflowCancelled(Exception):
+    """The user cancelled the workflow; it is cleaned up, not retried"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """A node or the whole run took too long (a TimeoutError, so it counts as transient)"""
+
+
+class CancelScope:
+    """Deadline and cancel flag of one workflow run"""
+
+    def __init__(self, workflow_id: str, timeout: Optional[float] = None):
+        self.workflow_id = workflow_id
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self.cancelled = threading.Event()
+        self.reason = ""
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        self.reason = reason
+        self.cancelled.set()
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise WorkflowCancelled(f"Workflow {self.workflow_id} {self.reason}")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Workflow {self.workflow_id} ran past its {self.deadline - self.started:g}s deadline")
+
+
+_scopes: Dict[str, CancelScope] = {}
+_scopes_lock = threading.Lock()
+
+# Inside a guarded node's thread: its run's scope and the node's own deadline
+_node_limits: contextvars.ContextVar = contextvars.ContextVar("node_limits", default=(None, None))
+
+# Node threads given up on that have not returned yet
+_abandoned = set()
+_abandoned_lock = threading.Lock()
+
+
+@contextmanager
+def open_scope(workflow_id: str, timeout: Optional[float] = WORKFLOW_TIMEOUT) -> Iterator[CancelScope]:
+    """Register a run's scope for the duration of an invoke"""
+    scope = CancelScope(workflow_id, timeout)
+    with _scopes_lock:
+        _scopes[workflow_id] = scope
+    try:
+        yield scope
+    finally:
+        with _scopes_lock:
+            if _scopes.get(workflow_id) is scope:
+                del _scopes[workflow_id]
+
+
+def cancel(workflow_id: str, reason: str = "cancelled") -> bool:
+    """Cancel a running workflow; False if it is not running (e.g. waiting on the user)"""
+    with _scopes_lock:
+        scope = _scopes.get(workflow_id)
+    if scope is None:
+        return False
+    scope.cancel(reason)
+    return True
+
+
+def get_scope(config) -> Optional[CancelScope]:
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    with _scopes_lock:
+        return _scopes.get(thread_id)
+
+
+def current_scope() -> Optional[CancelScope]:
+    """Scope of the run whose node is executing on this thread, if any"""
+    return _node_limits.get()[0]
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current node's timeout or its run's deadline, whichever is nearer (None if unbounded)"""
+    scope, node_deadline = _node_limits.get()
+    limits = [] if node_deadline is None else [node_deadline - time.monotonic()]
+    if scope is not None and scope.remaining() is not None:
+        limits.append(scope.remaining())
+    return min(limits) if limits else None
+
+
+def abandoned_threads() -> int:
+    """Node threads still stuck after their run gave up on them"""
+    with _abandoned_lock:
+        return sum(thread.is_alive() for thread in _abandoned)
+
+
+def guarded(node: Callable, timeout: Optional[float] = NODE_TIMEOUT) -> Callable:
+    """Wrap a graph node with the node timeout and its run's deadline/cancellation"""
+    takes_config = "config" in inspect.signature(node).parameters
+    name = getattr(node, "__name__", "node")
+
+    def run_node(state, config):
+        scope = get_scope(config)
+        if scope is not None:
+            scope.check()
+
+        outcome = {}
+        done = threading.Event()
+        node_deadline = time.monotonic() + timeout if timeout else None
+
+        def target():
+            _node_limits.set((scope, node_deadline))
+            try:
+                outcome["value"] = node(state, config) if takes_config else node(state)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        # The copied context carries LangGraph's config, so interrupt() and callbacks work in the thread
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(target,), daemon=True, name=f"node-{name}")
+        thread.start()
+
+        while not done.wait(POLL_INTERVAL):
+            try:
+                if scope is not None:
+                    scope.check()
+                if node_deadline is not None and time.monotonic() >= node_deadline:
+                    raise DeadlineExceeded(f"Node '{name}' did not finish within {timeout:g}s")
+            except (WorkflowCancelled, DeadlineExceeded):
+                with _abandoned_lock:
+                    _abandoned.difference_update([t for t in _abandoned if not t.is_alive()])
+                    _abandoned.add(thread)
+                raise
+
+        if "error" in outcome:
+            raise outcome["error"]
+
+        # A node that finished after its run was cancelled must not be checkpointed
+        if scope is not None and scope.cancelled.is_set():
+            scope.check()
+        return outcome["value"]
+
+    run_node.__name__ = name
+    return run_node
+
@@ -1,17 +1,66 @@
 import email.header
-from typing import List
+from functools import lru_cache
+from typing import Dict, List
 import os
 from datetime import datetime
 
+def _decode_email_header(header_value: str) -> str:
+    """
+    Decode MIME-encoded email headers (RFC 2047)
+    Handles formats like: =?UTF-8?B?base64text?= or =?UTF-8?Q?quoted-printable?=
+    """
+    if not header_value:
+        return ""
+    
+    # Plain headers need no decoding at all, and are kept out of the cache
+    if "=?" not in header_value:
+        return header_value.strip()
+    
+    return _decode_encoded_header(header_value)
+
+@lru_cache(maxsize=4096)
+def _decode_encoded_header(header_value: str) -> str:
+    """Memoized because the same encoded sender strings repeat across most of the inbox"""
+    try:
+        # Use email.header.decode_header to properly decode MIME headers
+        decoded_parts = email.header.decode_header(header_value)
+        decoded_string = ""
+        
+        for part, encoding in decoded_parts:
+            if isinstance(part, bytes):
+                if encoding:
+                    decoded_string += part.decode(encoding)
+                else:
+                    # Try UTF-8 first, then fallback to latin-1
+                    try:
+                        decoded_string += part.decode('utf-8')
+                    except UnicodeDecodeError:
+                        decoded_string += part.decode('latin-1', errors='ignore')
+            else:
+                decoded_string += str(part)
+        
+        return decoded_string.strip()
+        
+    except Exception as e:
+        print(f"Error decoding email header '{header_value}': {e}")
+        # Return original if decoding fails
+        return header_value
+
 class EmailData:
     """Data class for email information"""
+    
+    __slots__ = (
+        "subject", "thread", "sender", "body", "time", "category", "id",
+        "workflow_id", "summary", "draft_response", "timestamp",
+    )
+    
     def __init__(self, subject: str, thread: str, sender: str, body: str, 
                  time: str, category: str = None, id: str = None,  
                  workflow_id: str = None, summary: str = None, draft_response: str = None):
         
-        self.subject = self._decode_email_header(subject)
+        self.subject = _decode_email_header(subject)
         self.thread = thread
-        self.sender = self._decode_email_header(sender)
+        self.sender = _decode_email_header(sender)
         self.body = body
         self.time = time
         self.category = category
@@ -23,38 +72,33 @@ class EmailData:
         # Add timestamp for sorting (when email was processed by the system)
         self.timestamp = datetime.now()
     
-    def _decode_email_header(self, header_value: str) -> str:
-        """
-        Decode MIME-encoded email headers (RFC 2047)
-        Handles formats like: =?UTF-8?B?base64text?= or =?UTF-8?Q?quoted-printable?=
-        """
-        if not header_value:
-            return ""
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-ready dict (headers are stored already decoded)"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EmailData":
+        """Rebuild an email saved by `to_dict` without decoding headers again"""
+        email_data = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(email_data, name, data.get(name))
         
+        timestamp = data.get("timestamp")
         try:
-            # Use email.header.decode_header to properly decode MIME headers
-            decoded_parts = email.header.decode_header(header_value)
-            decoded_string = ""
-            
-            for part, encoding in decoded_parts:
-                if isinstance(part, bytes):
-                    if encoding:
-                        decoded_string += part.decode(encoding)
-                    else:
-                        # Try UTF-8 first, then fallback to latin-1
-                        try:
-                            decoded_string += part.decode('utf-8')
-                        except UnicodeDecodeError:
-                            decoded_string += part.decode('latin-1', errors='ignore')
-                else:
-                    decoded_string += str(part)
-            
-            return decoded_string.strip()
-            
-        except Exception as e:
-            print(f"Error decoding email header '{header_value}': {e}")
-            # Return original if decoding fails
-            return header_value
+            email_data.timestamp = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except (TypeError, ValueError):
+            email_data.timestamp = datetime.now()
+        
+        return email_data
+    
+    def copy(self) -> "EmailData":
+        """Shallow copy that keeps the already decoded headers"""
+        email_data = EmailData.__new__(EmailData)
+        for name in self.__slots__:
+            setattr(email_data, name, getattr(self, name))
+        return email_data
 
 class EmailService:
     """Service class for handling email data operations"""
@@ -63,22 +107,18 @@ class EmailService:
             "home": [],
             "notify": [],
             "ignore": [],
-            "human": []
+            "human": [],
+            "failed": []
         }
 
     @staticmethod
     def save_to_file(filename="db/emails.json"):
         import json
         
-        # Convert timestamps to strings for JSON serialization
-        data_to_save = {}
-        for category in EmailService.emails:
-            data_to_save[category] = []
-            for email in EmailService.emails[category]:
-                email_dict = email.__dict__.copy()
-                if hasattr(email, 'timestamp'):
-                    email_dict['timestamp'] = email.timestamp.isoformat()
-                data_to_save[category].append(email_dict)
+        data_to_save = {
+            category: [email.to_dict() for email in emails]
+            for category, emails in EmailService.emails.items()
+        }
         
         with open(filename, "w") as f:
             json.dump(data_to_save, f, indent=4)
@@ -92,22 +132,10 @@ class EmailService:
                 with open(filename, "r") as f:
                     data = json.load(f)
                     for category, emails_list in data.items():
-                        EmailService.emails[category] = []
-                        for email_dict in emails_list:
-                            # Restore timestamp if it exists
-                            if 'timestamp' in email_dict:
-                                try:
-                                    timestamp_str = email_dict.pop('timestamp')
-                                    email = EmailData(**email_dict)
-                                    email.timestamp = datetime.fromisoformat(timestamp_str)
-                                except:
-                                    email = EmailData(**email_dict)
-                                    email.timestamp = datetime.now()
-                            else:
-                                email = EmailData(**email_dict)
-                                email.timestamp = datetime.now()
-                            
-                            EmailService.emails[category].append(email)
+                        # Saved headers are already decoded, so skip __init__
+                        EmailService.emails[category] = [
+                            EmailData.from_dict(email_dict) for email_dict in emails_list
+                        ]
                         
                         # Sort by timestamp after loading (latest first)
                         EmailService._sort_emails_by_timestamp(category)
@@ -151,10 +179,24 @@ class EmailService:
     def add_to_notify(email: EmailData):
         """Add email to notify"""
         
-        if email in EmailService.emails["home"]:
+        if email in EmailService.emails["home"] and email not in EmailService.emails["notify"]:
             # Insert at the beginning instead of append
             EmailService.emails["notify"].insert(0, email)
     
+    @staticmethod
+    def add_to_failed(email: EmailData):
+        """Add email whose workflow failed for good (error in its summary)"""
+        
+        if email not in EmailService.emails["failed"]:
+            EmailService.emails["failed"].insert(0, email)
+    
+    @staticmethod
+    def remove_failed(email: EmailData):
+        """Remove email from failed once it is retried or discarded"""
+        
+        if email in EmailService.emails["failed"]:
+            EmailService.emails["failed"].remove(email)
+    
     @staticmethod
     def notify_to_ignore(email: EmailData):
         """Move email from notify to ignore category"""
@@ -182,12 +224,15 @@ class EmailService:
     def notify_to_pending(email: EmailData):
         """Generate a draft response with user context"""
         
+        # Already pending (e.g. re-sent after a restart): just refresh the draft
+        pending = EmailService.get_email("human", email.id)
+        if pending is not None:
+            pending.draft_response = email.draft_response
+            return
+        
         # Create new email with draft response
-        pending_email = EmailData(
-            email.subject, email.thread, email.sender, email.body, 
-            email.time, email.category, email.id, 
-            email.workflow_id, email.summary, email.draft_response
-        )
+        pending_email = email.copy()
+        pending_email.timestamp = datetime.now()
 
         # Add to pending at the beginning
         EmailService.emails["human"].insert(0, pending_email)
@@ -222,4 +267,59 @@ class EmailService:
                 if id == email.id:
                     return email
             except Exception as e:
-                print(f"\n Email not found! EmailService -> get_email(): {e}")
\ No newline at end of file
+                print(f"\n Email not found! EmailService -> get_email(): {e}")
+
+
+if __name__ == "__main__":
+    # Quick benchmark: per-email memory and load time for a saved inbox, against the old dict-based EmailData
+    import json
+    import sys
+    import tempfile
+    import time as _time
+    
+    class DictEmailData:
+        """EmailData as it was before: a __dict__ per email and headers decoded on every load"""
+        def __init__(self, subject, thread, sender, body, time, category=None, id=None,
+                     workflow_id=None, summary=None, draft_response=None, timestamp=None):
+            self.subject = _decode_encoded_header.__wrapped__(subject) if subject else ""
+            self.thread = thread
+            self.sender = _decode_encoded_header.__wrapped__(sender) if sender else ""
+            self.body = body
+            self.time = time
+            self.category = category
+            self.id = id
+            self.workflow_id = workflow_id
+            self.summary = summary
+            self.draft_response = draft_response
+            self.timestamp = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+    
+    count = 20000
+    senders = [f"=?UTF-8?B?TmfGsOG7nWkgZ+G7rWkgJ3tpfQ==?= <sender{i}@example.com>" for i in range(50)]
+    EmailService.emails["home"] = [
+        EmailData(f"Subject {i}", f"thread-{i}", senders[i % len(senders)], "body " * 40,
+                  "01/01/2025 - 09:00", id=f"id-{i}", workflow_id=f"wf-{i}")
+        for i in range(count)
+    ]
+    
+    sample = EmailService.emails["home"][0]
+    old_sample = DictEmailData(**{**sample.to_dict(), "sender": senders[0]})
+    print(f"EmailData size: {sys.getsizeof(sample)} bytes "
+          f"(dict-based: {sys.getsizeof(old_sample) + sys.getsizeof(old_sample.__dict__)} bytes)")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "emails.json")
+        EmailService.save_to_file(path)
+        
+        # The old save stored the raw headers and decoded them again on load
+        start = _time.perf_counter()
+        with open(path) as f:
+            saved = json.load(f)["home"]
+        [DictEmailData(**{**data, "sender": senders[n % len(senders)]}) for n, data in enumerate(saved)]
+        baseline = _time.perf_counter() - start
+        
+        start = _time.perf_counter()
+        EmailService.load_from_file(path)
+        elapsed = _time.perf_counter() - start
+    
+    print(f"Loaded {count} emails in {elapsed * 1000:.1f} ms (dict-based: {baseline * 1000:.1f} ms)")
+    print(f"Header cache: {_decode_encoded_header.cache_info()}")
@@ -0,0 +1,247 @@
+"""
+Quota-aware Gmail API client.
+
+Every Gmail call the app makes (polling searches, Date lookups, sends, the
+startup health check) goes through one GmailClient per account, which:
+
+- charges each method its cost in Gmail quota units (QUOTA_UNITS);
+- schedules calls against the per-user budget of 250 units per second (a
+  token bucket callers wait on) and a daily budget, which resets at midnight
+  Pacific time like Google's, raising GmailQuotaExceeded when it is spent;
+- coalesces duplicate in-flight requests: concurrent gets of the same message
+  (same id and format) share one API call and its result;
+- counts calls, units and waits per method, exported by gmail_usage() to size
+  the polling frequency (units per poll x polls per day must fit the budget).
+
+    python -m src.gmail_client     # quota cost of one poll, and the fastest sustainable interval
+"""
+import time
+import base64
+import email
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from src.accounts import DEFAULT_ACCOUNT
+from src.sources import message_to_email
+
+# https://developers.google.com/gmail/api/reference/quota
+QUOTA_UNITS = {
+    "labels.list": 1,
+    "users.getProfile": 1,
+    "history.list": 2,
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.modify": 5,
+    "threads.list": 10,
+    "threads.get": 10,
+    "messages.send": 100,
+    "drafts.send": 100,
+    "users.watch": 100,
+}
+
+UNITS_PER_SECOND = 250
+# Google's per-project cap is 1e9/day; a per-account budget keeps one mailbox from eating it
+DEFAULT_DAILY_UNITS = 10_000_000
+_QUOTA_DAY = ZoneInfo("America/Los_Angeles")
+
+
+class GmailQuotaExceeded(Exception):
+    """The daily unit budget is spent; `retry_after` is the wait until it resets"""
+
+    def __init__(self, account: str, retry_after: float):
+        super().__init__(f"Gmail daily quota budget spent for '{account}', resets in {retry_after / 3600:.1f}h")
+        self.retry_after = retry_after
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class GmailClient:
+    """Gmail API access for one account; see the module docstring"""
+
+    def __init__(self, service, account: str = DEFAULT_ACCOUNT, units_per_second: float = UNITS_PER_SECOND,
+                 daily_units: int = DEFAULT_DAILY_UNITS):
+        self.service = service
+        self.account = account
+        self.units_per_second = units_per_second
+        self.daily_units = daily_units
+
+        self.lock = threading.Lock()
+        self.level = float(units_per_second)
+        self.updated = time.monotonic()
+        self.day = self._quota_day()
+        self.units_today = 0
+
+        self.in_flight: Dict[tuple, _InFlight] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _quota_day():
+        return datetime.now(_QUOTA_DAY).date()
+
+    def _seconds_to_reset(self) -> float:
+        now = datetime.now(_QUOTA_DAY)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=_QUOTA_DAY)
+        return (midnight - now).total_seconds()
+
+    def _record(self, method: str, **amounts) -> None:
+        # Caller holds the lock
+        stats = self.stats.setdefault(method, {"calls": 0, "units": 0, "coalesced": 0, "wait_s": 0.0})
+        for key, amount in amounts.items():
+            stats[key] += amount
+
+    def _charge(self, method: str) -> None:
+        """Wait for the per-second budget, then spend `method`'s units"""
+        units = QUOTA_UNITS.get(method, 5)
+        start = time.monotonic()
+
+        while True:
+            with self.lock:
+                if self._quota_day() != self.day:
+                    self.day = self._quota_day()
+                    self.units_today = 0
+                if self.units_today + units > self.daily_units:
+                    raise GmailQuotaExceeded(self.account, self._seconds_to_reset())
+
+                now = time.monotonic()
+                self.level = min(self.units_per_second, self.level + (now - self.updated) * self.units_per_second)
+                self.updated = now
+
+                if self.level >= units:
+                    self.level -= units
+                    self.units_today += units
+                    self._record(method, calls=1, units=units, wait_s=now - start)
+                    return
+                wait = (units - self.level) / self.units_per_second
+
+            time.sleep(wait)
+
+    def call(self, method: str, request: Callable[[], object], key: Optional[tuple] = None):
+        """
+        Run `request` (which performs one `method` call) within the quota.
+        Calls with the same `key` while one is in flight wait for its result.
+        """
+        if key is not None:
+            with self.lock:
+                pending = self.in_flight.get(key)
+                if pending is None:
+                    pending = self.in_flight[key] = _InFlight()
+                    owner = True
+                else:
+                    owner = False
+                    self._record(method, coalesced=1)
+
+            if not owner:
+                pending.done.wait()
+                if pending.error is not None:
+                    raise pending.error
+                return pending.result
+
+        try:
+            self._charge(method)
+            result = request()
+        except BaseException as e:
+            if key is not None:
+                pending.error = e
+            raise
+        else:
+            if key is not None:
+                pending.result = result
+            return result
+        finally:
+            if key is not None:
+                with self.lock:
+                    del self.in_flight[key]
+                pending.done.set()
+
+    # ------------------------------------------------------------ methods
+
+    def list_messages(self, query: str, max_results: int = 10) -> List[Dict]:
+        response = self.call("messages.list", lambda: self.service.users().messages().list(
+            userId="me", q=query, maxResults=max_results).execute())
+        return response.get("messages", [])
+
+    def get_message(self, message_id: str, format: str = "full", **params) -> Dict:
+        return self.call(
+            "messages.get",
+            lambda: self.service.users().messages().get(userId="me", id=message_id, format=format, **params).execute(),
+            key=("messages.get", message_id, format, repr(sorted(params.items()))),
+        )
+
+    def send_message(self, raw: str) -> Dict:
+        return self.call("messages.send", lambda: self.service.users().messages().send(
+            userId="me", body={"raw": raw}).execute())
+
+    def list_labels(self) -> List[Dict]:
+        return self.call("labels.list", lambda: self.service.users().labels().list(userId="me").execute()).get("labels", [])
+
+    def search(self, query: str, max_results: int = 10) -> List[Dict]:
+        """Same result shape as GmailSearch, plus "time" (parsed from the raw message, which saves a get per email)"""
+        from langchain_google_community.gmail.utils import clean_email_body
+
+        results = []
+        for message in self.list_messages(query, max_results):
+            data = self.get_message(message["id"], format="raw")
+            parsed = email.message_from_bytes(base64.urlsafe_b64decode(data["raw"]))
+
+            result = message_to_email(parsed, message_id=message["id"], thread_id=data["threadId"])
+            result["snippet"] = data.get("snippet", result["snippet"])
+            result["body"] = clean_email_body(result["body"])
+            results.append(result)
+        return results
+
+    def usage(self) -> Dict:
+        with self.lock:
+            return {
+                "account": self.account,
+                "units_today": self.units_today,
+                "daily_units": self.daily_units,
+                "methods": {method: dict(stats) for method, stats in self.stats.items()},
+            }
+
+
+_clients: Dict[str, GmailClient] = {}
+_clients_lock = threading.Lock()
+
+
+def gmail_client(gmail_api, account: Optional[str] = None) -> GmailClient:
+    """
+    The account's shared client, calling through `gmail_api` (a GmailToolkit or
+    API resource). Quota is per user, so budgets and counters are kept per
+    account and survive the toolkit being rebuilt after a token refresh.
+    """
+    service = getattr(gmail_api, "api_resource", gmail_api)
+    account = account or DEFAULT_ACCOUNT
+    with _clients_lock:
+        client = _clients.get(account)
+        if client is None:
+            client = _clients[account] = GmailClient(service, account)
+        else:
+            client.service = service
+        return client
+
+
+def gmail_usage() -> Dict[str, Dict]:
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.account: client.usage() for client in clients}
+
+
+if __name__ == "__main__":
+    # Cost model only, no network: how often can one account be polled?
+    per_poll = QUOTA_UNITS["messages.list"]
+    per_new_email = QUOTA_UNITS["messages.get"]
+    per_reply = QUOTA_UNITS["messages.send"]
+
+    print(f"Poll: {per_poll} units + {per_new_email} per new email; reply: {per_reply} units")
+    for emails_per_day, replies_per_day in ((100, 10), (1_000, 100), (10_000, 500)):
+        spare = DEFAULT_DAILY_UNITS - emails_per_day * per_new_email - replies_per_day * per_reply
+        interval = 86_400 / (spare / per_poll)
+        print(f"{emails_per_day:>6} emails/day, {replies_per_day:>4} replies/day: "
+              f"poll every {interval:.2f}s at most to stay within {DEFAULT_DAILY_UNITS:,} units/day")
@@ -0,0 +1,218 @@
+"""
+Typed messages exchanged between the backend and the frontend.
+
+Events flow backend -> GUI, commands flow GUI -> backend. Each kind is a small
+slotted dataclass carrying only what the receiver needs (IDs and display text,
+never the full workflow state), and both sides dispatch on the class through a
+lookup table instead of inspecting loose dicts.
+"""
+from dataclasses import MISSING, dataclass, fields
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# ---------------------------------------------------------------- Events
+
+@dataclass(slots=True, frozen=True)
+class NewEmailEvent:
+    """A new email was picked up and a workflow started for it"""
+    id: str
+    thread_id: str
+    sender: str
+    subject: str
+    body: str
+    snippet: str
+    time: str
+    workflow_id: str
+
+    @classmethod
+    def from_email(cls, email: Dict) -> "NewEmailEvent":
+        return cls(
+            id=email["id"],
+            thread_id=email.get("threadId", ""),
+            sender=email.get("sender", ""),
+            subject=email.get("subject", ""),
+            body=email.get("body", ""),
+            snippet=email.get("snippet", ""),
+            time=email.get("time", ""),
+            workflow_id=email.get("workflow_id", ""),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class NotifyEvent:
+    """Email classified as notify, with its summary"""
+    id: str
+    summary: str
+
+
+@dataclass(slots=True, frozen=True)
+class SpamEvent:
+    """Email classified as ignore"""
+    id: str
+    summary: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class ApprovalEvent:
+    """First draft reply ready for human approval"""
+    id: str
+    draft: str
+
+
+@dataclass(slots=True, frozen=True)
+class RewriteEvent:
+    """Rewritten draft reply after human feedback"""
+    id: str
+    draft: str
+
+
+@dataclass(slots=True, frozen=True)
+class SendEmailDraftEvent:
+    """First draft of a user-initiated email"""
+    draft: str
+
+
+@dataclass(slots=True, frozen=True)
+class SendEmailRewriteEvent:
+    """Rewritten draft of a user-initiated email"""
+    draft: str
+
+
+@dataclass(slots=True, frozen=True)
+class WorkflowFailedEvent:
+    """An email's workflow failed for good and sits in the dead-letter queue"""
+    id: str
+    workflow_id: str
+    error_class: str
+    error: str
+
+
+@dataclass(slots=True, frozen=True)
+class BackendStoppedEvent:
+    """The backend process kept crashing and the supervisor gave up restarting it"""
+    restarts: int
+    exit_code: Optional[int]
+
+
+def _summary_text(summary: Any) -> str:
+    """Summaries are SummarizerOutputSchema objects once the summarizer ran"""
+    return getattr(summary, "summary_content", summary) or ""
+
+
+# Workflow results are keyed by (is reply workflow, stage); see `event_from_result`
+RESULT_EVENTS: Dict[Tuple[bool, str], Callable[[Dict], Any]] = {
+    (True, "notify"): lambda r: NotifyEvent(r["input_email"]["id"], _summary_text(r.get("summary"))),
+    (True, "ignore"): lambda r: SpamEvent(r["input_email"]["id"], _summary_text(r.get("summary"))),
+    (True, "draft"): lambda r: ApprovalEvent(r["input_email"]["id"], r.get("draft_response", "")),
+    (True, "rewrite"): lambda r: RewriteEvent(r["input_email"]["id"], r.get("draft_response", "")),
+    (False, "draft"): lambda r: SendEmailDraftEvent(r.get("draft_response", "")),
+    (False, "rewrite"): lambda r: SendEmailRewriteEvent(r.get("draft_response", "")),
+}
+
+
+def _result_stage(result: Dict) -> Optional[str]:
+    if result.get("first_write"):
+        # Nothing written yet: the classifier decision is what the GUI needs
+        return result.get("decision")
+    if result.get("send_decision") == "rewrite":
+        return "rewrite"
+    if not result.get("send_decision"):
+        return "draft"
+    return None
+
+
+def event_from_result(result: Dict):
+    """Map a LangGraph workflow result onto the event the GUI should receive"""
+    key = (bool(result.get("input_email")), _result_stage(result))
+    build = RESULT_EVENTS.get(key)
+    return build(result) if build else None
+
+
+# ---------------------------------------------------------------- Commands
+
+@dataclass(slots=True, frozen=True)
+class GenerateEmailCommand:
+    """Draft a new email from the user's intent"""
+    workflow_id: str
+    from_email: str
+    to_email: str
+    users_intent: str
+
+
+@dataclass(slots=True, frozen=True)
+class ResumeWorkflowCommand:
+    """Answer an interrupt of an email response workflow (respond/ignore, approve/reject)"""
+    workflow_id: str
+    flag: bool
+    feedback: str = ""
+
+    def resume_inputs(self) -> Dict:
+        return {"flag": self.flag, "feedback": self.feedback}
+
+
+@dataclass(slots=True, frozen=True)
+class SendEmailDecisionCommand:
+    """Approve or reject the draft of a user-initiated email"""
+    workflow_id: str
+    flag: bool
+    feedback: str = ""
+
+    def resume_inputs(self) -> Dict:
+        if self.flag:
+            return {"flag": True}
+        return {"flag": False, "feedback": self.feedback}
+
+
+@dataclass(slots=True, frozen=True)
+class RetryFailedCommand:
+    """Retry a dead-lettered workflow now, with a fresh retry budget"""
+    workflow_id: str
+
+
+@dataclass(slots=True, frozen=True)
+class DiscardFailedCommand:
+    """Give up on a dead-lettered workflow"""
+    workflow_id: str
+
+
+@dataclass(slots=True, frozen=True)
+class CancelWorkflowCommand:
+    """Stop a running or waiting workflow and delete its checkpoints"""
+    workflow_id: str
+
+
+# GUI command names -> (command class, fixed field values)
+COMMAND_TYPES: Dict[str, Tuple[type, Dict]] = {
+    "generate_email": (GenerateEmailCommand, {}),
+    "resume_workflow": (ResumeWorkflowCommand, {}),
+    "approve": (ResumeWorkflowCommand, {"flag": True}),
+    "reject": (ResumeWorkflowCommand, {"flag": False}),
+    "approve_draft": (SendEmailDecisionCommand, {"flag": True}),
+    "send_email": (SendEmailDecisionCommand, {"flag": True}),
+    "reject_draft": (SendEmailDecisionCommand, {"flag": False}),
+    "retry_failed": (RetryFailedCommand, {}),
+    "discard_failed": (DiscardFailedCommand, {}),
+    "cancel_workflow": (CancelWorkflowCommand, {}),
+}
+
+
+def make_command(command_type: str, data: Dict):
+    """Build and validate a typed command from a GUI command name and its data"""
+    if command_type not in COMMAND_TYPES:
+        raise ValueError(f"Unknown command type: {command_type}")
+
+    command_cls, fixed = COMMAND_TYPES[command_type]
+    values = {f.name: data[f.name] for f in fields(command_cls) if f.name in data}
+    values.update(fixed)
+
+    if not values.get("workflow_id"):
+        raise ValueError(f"No workflow_id provided for {command_type} command")
+    for f in fields(command_cls):
+        if f.name not in values and f.default is MISSING and f.default_factory is MISSING:
+            raise ValueError(f"Missing {f.name} for {command_type} command")
+    if "flag" in values and not isinstance(values["flag"], bool):
+        raise ValueError(f"Invalid flag for {command_type} command: {values['flag']!r}")
+    if values.get("feedback") is None and "feedback" in values:
+        values["feedback"] = ""
+
+    return command_cls(**values)
@@ -7,9 +7,14 @@ from src.prompts import summary_system_prompt, summary_user_prompt, default_summ
 from src.prompts import writer_system_prompt, default_writer_instruction, writer_user_prompt
 
 from src.utils import parse_email, format_email_markdown, format_send_email_markdown
+from src.accounts import get_gmail
+from src.deadlines import LLM_TIMEOUT, LLM_MAX_RETRIES, NODE_TIMEOUT, current_scope, time_left
+from src.ratelimit import get_rate_limiter, estimate_tokens
+from src.gmail_client import GmailQuotaExceeded, gmail_client
 
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END
 from langgraph.types import Command, interrupt
 
@@ -23,17 +28,67 @@ load_dotenv()
 
 class Nodes():
 
-    def __init__(self, model: str):
-        self.model= init_chat_model(model= model)
-        self.gmail = GmailToolkit()
+    def __init__(self, model: str, content_store=None):
+        # Bounded requests: a hung connection fails the call instead of holding the node forever
+        self.model= init_chat_model(model= model, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES)
+        # Every call is admitted by the model's shared RPM/TPM limiter, which learns from the response headers
+        self.model_name = model
+        self.limiter = get_rate_limiter(model)
+        if hasattr(self.model, "include_response_headers"):
+            self.model.include_response_headers = True
+        # Built on first send: batch runs only classify and summarize, and need no Gmail credentials
+        self.gmail = None
+        # Resolves the {"id", "hash"} reference kept in state (see CheckpointStore.put_email)
+        self.content_store = content_store
         
+    
+    def _input_email(self, state: EmailResponseState) -> dict:
+        """Full input email; state holds a reference unless the run has no store (batch mode)"""
+        email = state["input_email"]
+        if "body" in email or self.content_store is None:
+            return email
+        return self.content_store.get_email(email)
+    
+    def _call_llm(self, schema, messages, priority: bool = False, expected_output: int = 256):
+        """Structured LLM call through the rate limiter; interactive calls take its priority lane"""
+        llm = self.model.with_structured_output(schema, include_raw=True)
+        
+        # Wait for capacity only as long as still leaves the node time for the request itself,
+        # and give up the place in the queue as soon as the workflow is cancelled
+        scope = current_scope()
+        left = time_left()
+        wait = NODE_TIMEOUT - LLM_TIMEOUT if left is None else max(0.0, left - LLM_TIMEOUT)
+        reserved = self.limiter.acquire(
+            estimate_tokens(messages, self.model_name, expected_output), priority=priority, timeout=wait,
+            check=scope.check if scope is not None else None,
+        )
+        try:
+            result = llm.invoke(messages)
+        except Exception as e:
+            self.limiter.release(e)
+            raise
+        
+        raw = result["raw"]
+        self.limiter.settle(reserved, getattr(raw, "usage_metadata", None), raw.response_metadata.get("headers"))
+        
+        if result.get("parsing_error") is not None:
+            raise result["parsing_error"]
+        return result["parsed"]
+    
+    def _gmail_for(self, config: RunnableConfig):
+        """Gmail toolkit of the mailbox this workflow belongs to (shared graphs serve every account)"""
+        account = (config or {}).get("configurable", {}).get("account")
+        gmail = get_gmail(account)
+        if gmail is None:
+            if self.gmail is None:
+                self.gmail = GmailToolkit()
+            gmail = self.gmail
+        return gmail
         
         
     def classifier(self, state: EmailResponseState): 
         
-        llm = self.model.with_structured_output(ClassifierOutputSchema)
-        
-        author, to, subject, body, _ = parse_email(state["input_email"])
+        author, to, subject, body, _ = parse_email(self._input_email(state))
         system_msg = classifier_system_prompt.format(
             rules= default_rules
         )
@@ -44,7 +99,7 @@ class Nodes():
         
         message = [SystemMessage(content= system_msg), HumanMessage(content= body_message)]
         
-        result = llm.invoke(message)
+        result = self._call_llm(ClassifierOutputSchema, message, expected_output=128)
             
         if result.classification == "notify":
             
@@ -72,16 +127,14 @@ class Nodes():
         
         print(f"\nSummarizing the email...")
         
-        llm = self.model.with_structured_output(SummarizerOutputSchema)
-        
-        author, to, subject, body, id = parse_email(state["input_email"])
+        author, to, subject, body, id = parse_email(self._input_email(state))
         email_content = format_email_markdown(subject, author, to, body, id)
         
         sys_msg = summary_system_prompt.format(summarizer_instructions= default_summarizer_instruction)
         user_msg = summary_user_prompt.format(content= email_content)
         
         message = [SystemMessage(content= sys_msg), HumanMessage(content= user_msg)]
-        response = llm.invoke(message)
+        response = self._call_llm(SummarizerOutputSchema, message, expected_output=384)
         
         print(f"Summary: {response.summary_content}")
 
@@ -96,7 +149,7 @@ class Nodes():
         
 
     def interrupts_handler(self, state: EmailResponseState):
-        author, to, subject, email_thread, id = parse_email(state["input_email"])
+        author, to, subject, email_thread, id = parse_email(self._input_email(state))
         email = format_email_markdown(subject, author, to, email_thread, id)
 
         
@@ -133,14 +186,14 @@ class Nodes():
 
     def writer(self, state: Union[EmailResponseState, SendEmailState]):
         user_name = os.environ.get("EMAIL_DISPLAY_NAME")
-        llm = self.model.with_structured_output(WriterOutputSchema)
         messages = [SystemMessage(content= writer_system_prompt.format(writer_instruction=default_writer_instruction,  user_name= user_name))]\
                                                                 +                                                      \
                                                         state["messages"]
         
         print(f"\nWriting response...")
         
-        response = llm.invoke(messages)
+        # A user is waiting on the draft: jump ahead of background classification
+        response = self._call_llm(WriterOutputSchema, messages, priority=True, expected_output=768)
         to, subject, body = response.gmail_schema.to, response.gmail_schema.subject, response.gmail_schema.message
         draft = format_send_email_markdown(subject, to, body)
         
@@ -158,7 +211,7 @@ class Nodes():
             )
         
         
-    def send_response(self, state: Union[EmailResponseState, SendEmailState]):
+    def send_response(self, state: Union[EmailResponseState, SendEmailState], config: RunnableConfig):
         request = interrupt(
             {
                 "draft_response": state["draft_response"],
@@ -186,33 +239,37 @@ class Nodes():
             from src.utils import create_formatted_email
             formatted_message = create_formatted_email(to, subject, message)
             
+            # Get the Gmail toolkit and the account's quota-aware client
+            gmail = self._gmail_for(config)
+            client = gmail_client(gmail, (config or {}).get("configurable", {}).get("account"))
+            
             # Use the raw Gmail API instead of the LangChain tool
             try:
-                # Get the Gmail service from the toolkit
-                service = self.gmail.api_resource
-                
                 # Send the message
-                result = service.users().messages().send(
-                    userId='me',
-                    body={'raw': formatted_message}
-                ).execute()
+                result = client.send_message(formatted_message)
                 
                 print(f"\nResponse sent successfully!")
                 print(f"Message ID: {result['id']}")
                 
+            except GmailQuotaExceeded:
+                # No send can succeed until the budget resets; the dead-letter queue retries after retry_after
+                raise
+            
             except Exception as e:
                 print(f"Error sending email: {e}")
                 # Fallback to original method if the above fails
                 try:
-                    tool = GmailSendMessage(api_resource= self.gmail.api_resource)
-                    tool.invoke(
+                    tool = GmailSendMessage(api_resource= gmail.api_resource)
+                    client.call("messages.send", lambda: tool.invoke(
                         {
                             "to": to,
                             "subject": subject,
                             "message": message
                         }
-                    )
+                    ))
                     print(f"Email sent successfully using fallback method!")
+                except GmailQuotaExceeded:
+                    raise
                 except Exception as fallback_error:
                     print(f"Fallback method also failed: {fallback_error}")
                     return Command(goto=END, update={"send_decision": "error"})
@@ -0,0 +1,297 @@
+"""
+Client-side rate limiting for OpenAI calls.
+
+Every LLM call in Nodes goes through one OpenAIRateLimiter per model, shared by
+all workflows and mailboxes. It keeps two token buckets, requests per minute
+and tokens per minute, and a cap on requests in flight:
+
+- a call reserves one request plus a local token estimate (prompt + expected
+  output) before it is sent, and the reservation is settled against the
+  usage the response reports;
+- the `x-ratelimit-*` response headers replace the configured limits and
+  bucket levels with the server's view, so the limiter converges on the real
+  quota of the key;
+- a 429 pauses every caller for its retry-after and shrinks the effective
+  limits, which then grow back on successes;
+- interactive calls (the writer, which a user is waiting on) take a priority
+  lane: they are served before background work and can use a reserve of the
+  buckets that background calls (classifier, summarizer) may not touch.
+
+Initial limits come from OPENAI_RPM / OPENAI_TPM and default to tier-1 values
+for gpt-4o-mini; the headers correct them on the first response.
+"""
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+# Share of both buckets kept for priority calls
+PRIORITY_RESERVE = 0.2
+# Effective limits stay this far under the server's to absorb estimate error
+HEADROOM = 0.9
+# How often a waiting caller runs its `check` (e.g. for workflow cancellation)
+CHECK_INTERVAL = 0.2
+
+
+class RateLimitTimeout(TimeoutError):
+    """No capacity within the caller's deadline"""
+
+
+_encodings: Dict[str, object] = {}
+
+
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None (not installed, or its files cannot be downloaded)"""
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"tiktoken unavailable ({type(e).__name__}), estimating tokens from length")
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def estimate_tokens(messages, model: str = "", expected_output: int = 0) -> int:
+    """Prompt tokens of chat messages plus the output we expect (tiktoken if usable)"""
+    text = "\n".join(str(getattr(message, "content", message)) for message in messages)
+
+    encoding = _encoding(model)
+    if encoding is not None:
+        prompt = len(encoding.encode(text, disallowed_special=()))
+    else:
+        # ~4 characters per token for English text
+        prompt = len(text) // 4 + 1
+
+    # Per-message framing tokens
+    return prompt + 4 * len(messages) + expected_output
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `limit` per minute"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.level = limit
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, factor: float) -> None:
+        capacity = self.limit * factor
+        self.level = min(capacity, self.level + (now - self.updated) * capacity / 60)
+        self.updated = now
+
+    def wait_for(self, amount: float, floor: float, factor: float) -> float:
+        """Seconds until `amount` can be taken while leaving `floor` in the bucket"""
+        missing = amount + floor - self.level
+        return 0.0 if missing <= 0 else missing * 60 / (self.limit * factor)
+
+
+class OpenAIRateLimiter:
+    """Shared RPM/TPM limiter with a priority lane; see the module docstring"""
+
+    def __init__(self, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM, max_concurrent: int = 16,
+                 priority_reserve: float = PRIORITY_RESERVE):
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+        self.max_concurrent = max_concurrent
+        self.priority_reserve = priority_reserve
+        # Caller-imposed ceiling on the request rate (batch --rps), kept when headers arrive
+        self.rpm_cap: Optional[float] = None
+
+        # Multiplier on both limits: cut on 429s, recovered on successes
+        self.factor = HEADROOM
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.priority_waiting = 0
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.waited = 0.0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+
+    def acquire(self, tokens: int, priority: bool = False, timeout: Optional[float] = None,
+                check: Optional[Callable[[], None]] = None) -> int:
+        """
+        Block until the call may be sent; returns the reserved token count for `settle`.
+        `check` runs while waiting and aborts the wait by raising (a cancelled workflow).
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self.changed:
+            if priority:
+                self.priority_waiting += 1
+            try:
+                while True:
+                    if check is not None:
+                        check()
+                    now = time.monotonic()
+                    self.requests.refill(now, self.factor)
+                    self.tokens.refill(now, self.factor)
+
+                    # A single call larger than the bucket waits for a full bucket, not forever
+                    amount = min(tokens, self.tokens.limit * self.factor)
+                    reserve = 0.0 if priority else self.priority_reserve
+                    delay = max(
+                        self.paused_until - now,
+                        self.requests.wait_for(1, reserve * self.requests.limit * self.factor, self.factor),
+                        self.tokens.wait_for(amount, reserve * self.tokens.limit * self.factor, self.factor),
+                    )
+                    blocked = self.in_flight >= self.max_concurrent or (not priority and self.priority_waiting)
+
+                    if delay <= 0 and not blocked:
+                        self.requests.level -= 1
+                        self.tokens.level -= amount
+                        self.in_flight += 1
+                        self.calls += 1
+                        self.estimated_tokens += amount
+                        self.waited += now - start
+                        return amount
+
+                    if deadline is not None and now >= deadline:
+                        raise RateLimitTimeout(f"No OpenAI capacity within {timeout:g}s")
+
+                    wait = delay if delay > 0 else 1.0
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    if check is not None:
+                        wait = min(wait, CHECK_INTERVAL)
+                    self.changed.wait(max(0.01, wait))
+            finally:
+                if priority:
+                    self.priority_waiting -= 1
+                    self.changed.notify_all()
+
+    def settle(self, reserved: int, usage: Optional[Dict] = None, headers: Optional[Dict] = None) -> None:
+        """Finish a successful call: correct the token bucket and adopt the server's limits"""
+        with self.changed:
+            self.in_flight -= 1
+
+            actual = (usage or {}).get("total_tokens")
+            if actual is not None:
+                self.tokens.level += reserved - actual
+                self.actual_tokens += actual
+
+            if headers:
+                self._apply_headers(headers)
+
+            # Additive recovery after a 429 cut
+            self.factor = min(HEADROOM, self.factor + 0.01)
+            self.changed.notify_all()
+
+    def release(self, error: Optional[Exception] = None) -> None:
+        """Finish a failed call; a 429 pauses everyone for its retry-after"""
+        with self.changed:
+            self.in_flight -= 1
+
+            if _is_rate_limit(error):
+                self.rate_limited += 1
+                headers = _error_headers(error)
+                try:
+                    if "retry-after-ms" in headers:
+                        retry_after = float(headers["retry-after-ms"]) / 1000
+                    else:
+                        retry_after = float(headers.get("retry-after", 1))
+                except ValueError:
+                    retry_after = 1.0
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+                self.factor = max(0.25, self.factor * 0.7)
+                if headers:
+                    self._apply_headers(headers)
+
+            self.changed.notify_all()
+
+    def _apply_headers(self, headers: Dict) -> None:
+        headers = {key.lower(): value for key, value in headers.items()}
+        now = time.monotonic()
+
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            try:
+                limit = float(headers[f"x-ratelimit-limit-{kind}"])
+                remaining = float(headers[f"x-ratelimit-remaining-{kind}"])
+            except (KeyError, ValueError):
+                continue
+
+            if kind == "requests" and self.rpm_cap is not None:
+                limit = min(limit, self.rpm_cap)
+            bucket.limit = limit
+            # Never believe we have more than the server says (other clients share the key)
+            bucket.level = min(bucket.level, remaining * self.factor)
+            bucket.updated = now
+
+    def cap_requests(self, rpm: float) -> None:
+        """Never exceed `rpm` requests per minute, whatever the server allows"""
+        with self.changed:
+            self.rpm_cap = rpm
+            self.requests.limit = min(self.requests.limit, rpm)
+            self.requests.level = min(self.requests.level, self.requests.limit * self.factor)
+            self.changed.notify_all()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "rpm": self.requests.limit,
+                "tpm": self.tokens.limit,
+                "factor": self.factor,
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "avg_wait_s": self.waited / self.calls if self.calls else 0.0,
+                "estimated_tokens": self.estimated_tokens,
+                "actual_tokens": self.actual_tokens,
+            }
+
+
+def _is_rate_limit(error: Optional[Exception]) -> bool:
+    if error is None:
+        return False
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return any(cls.__name__ == "RateLimitError" for cls in type(error).__mro__)
+
+
+def _error_headers(error: Exception) -> Dict:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    return {key.lower(): value for key, value in dict(headers).items()}
+
+
+_limiters: Dict[str, OpenAIRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str, rpm: Optional[float] = None) -> OpenAIRateLimiter:
+    """
+    The shared limiter for a model (OpenAI limits are per model per organization).
+    `rpm` caps its request rate below the account's limits (batch --rps).
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = OpenAIRateLimiter(
+                rpm=float(os.environ.get("OPENAI_RPM", DEFAULT_RPM)),
+                tpm=float(os.environ.get("OPENAI_TPM", DEFAULT_TPM)),
+            )
+            _limiters[model] = limiter
+        if rpm is not None:
+            limiter.cap_requests(rpm)
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    with _limiters_lock:
+        return {model: limiter.stats() for model, limiter in _limiters.items()}
@@ -0,0 +1,183 @@
+"""
+Compressed checkpoint serialization.
+
+CompressedSerializer wraps LangGraph's JsonPlusSerializer the same way its
+EncryptedSerializer does: payloads above a size threshold are compressed and
+the codec is appended to the stored type ("msgpack+zlib-d1"), so rows written
+before compression was enabled, or below the threshold, still load unchanged.
+
+Both codecs are primed with a preset dictionary of strings that recur in this
+app's state (message classes, state keys, prompt and draft markup), which is
+what small email-sized payloads compress against. zstd is used when the
+optional `zstandard` package is installed, zlib otherwise. The dictionary is
+part of the stored format: change it only under a new codec name.
+
+    python -m src.serde        # write/read latency vs bytes saved per codec
+"""
+import zlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Frozen: referenced by the "-d1" codecs. Most useful strings last (closest to the data).
+_PRESET_DICTIONARY_V1 = b"".join([
+    b"Best regards,\nThank you for your email.\nPlease let me know if you have any questions.\n",
+    b"Unsubscribe | View in browser | Privacy Policy | This email was sent to ",
+    b"Do you want to response to this email?Do you want to send this response?",
+    b"**Subject**: **From**: **To**: **ID**: \n\n---\n\n",
+    b"recipients email_content summary_version users_intent gmail_schema to subject message ",
+    b"summary_content classification reasoning notify ignore response rewrite error ",
+    b"langchain_core.messages.human HumanMessage langchain_core.messages.ai AIMessage ",
+    b"langchain_core.messages.system SystemMessage src.states WriterOutputSchema GmailDraftSchema SummarizerOutputSchema ",
+    b"additional_kwargs response_metadata usage_metadata tool_calls invalid_tool_calls example content type name id ",
+    b"input_email messages decision interrupt_decision send_decision first_write summary draft_response output_schema ",
+    b"threadId snippet body sender subject time workflow_id account hash ",
+    b"channel_values channel_versions versions_seen pending_sends updated_channels __start__ __interrupt__ branch:to:",
+])
+
+
+class _ZlibCodec:
+    name = "zlib-d1"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zdict=_PRESET_DICTIONARY_V1)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(zdict=_PRESET_DICTIONARY_V1)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class _ZstdCodec:
+    name = "zstd-d1"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(
+            _PRESET_DICTIONARY_V1, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        # zstandard (de)compressors are not thread-safe; workflows serialize from many threads
+        self.local = threading.local()
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = getattr(self.local, "compressor", None)
+        if compressor is None:
+            compressor = self.local.compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary)
+        return compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = getattr(self.local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self.local.decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary)
+        return decompressor.decompress(data)
+
+
+def available_codecs() -> Dict[str, Any]:
+    codecs = {_ZlibCodec.name: _ZlibCodec()}
+    if zstandard is not None:
+        codecs[_ZstdCodec.name] = _ZstdCodec()
+    return codecs
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer that compresses payloads of at least `threshold` bytes"""
+
+    def __init__(self, serde: Optional[SerializerProtocol] = None, codec: Optional[str] = None,
+                 threshold: int = 1024):
+        self.serde = serde or JsonPlusSerializer()
+        self.threshold = threshold
+        self.codecs = available_codecs()
+
+        if codec is None:
+            codec = _ZstdCodec.name if _ZstdCodec.name in self.codecs else _ZlibCodec.name
+        if codec not in self.codecs:
+            raise ValueError(f"Checkpoint codec {codec!r} is not available (have: {', '.join(self.codecs)})")
+        self.codec = self.codecs[codec]
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.threshold:
+            return type_, data
+
+        compressed = self.codec.compress(data)
+        if len(compressed) >= len(data):
+            return type_, data
+        return f"{type_}+{self.codec.name}", compressed
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if "+" not in type_:
+            return self.serde.loads_typed(data)
+
+        type_, codec = type_.rsplit("+", 1)
+        if codec not in self.codecs:
+            raise ValueError(f"Checkpoint was written with codec {codec!r}, which is not available here")
+        return self.serde.loads_typed((type_, self.codecs[codec].decompress(payload)))
+
+
+if __name__ == "__main__":
+    # Benchmark on email-shaped checkpoints: a rewrite loop that keeps growing `messages`
+    import time
+    from langchain_core.messages import AIMessage, HumanMessage
+    from src.states import GmailDraftSchema, WriterOutputSchema
+
+    body = (
+        "Hi Anna,\n\nThanks for sending over the Q3 figures. I had a look at the revenue breakdown "
+        "and have a couple of questions about the EMEA numbers before Thursday's review.\n\n"
+        "Could you confirm whether the partner channel is included? Best regards,\nTom\n"
+    )
+
+    def checkpoint(rewrites: int) -> Dict:
+        messages = [HumanMessage(content=f"**Subject**: Q3 figures\n**From**: anna@example.com\n\n{body}")]
+        for i in range(rewrites):
+            messages.append(AIMessage(content=f"Draft {i}: {body}"))
+            messages.append(HumanMessage(content=f"Make it shorter and friendlier (round {i})"))
+
+        return {
+            "v": 4,
+            "id": "1f0a-checkpoint",
+            "channel_values": {
+                "input_email": {"id": "18c9a7e2b4f1d203", "hash": "9e107d9d372bb6826bd81d3542a419d6"},
+                "messages": messages,
+                "decision": "notify",
+                "summary": "Anna sent Q3 figures; questions on EMEA partner revenue before Thursday.",
+                "draft_response": f"**Subject**: Re: Q3 figures\n**To**: anna@example.com\n\n{body}",
+                "output_schema": WriterOutputSchema(gmail_schema=GmailDraftSchema(
+                    to="anna@example.com", subject="Re: Q3 figures", message=body)),
+                "first_write": False,
+            },
+        }
+
+    plain = JsonPlusSerializer()
+    variants = [("none", plain)] + [(name, CompressedSerializer(plain, codec=name)) for name in available_codecs()]
+    runs = 200
+
+    print(f"{'rewrites':>8} {'codec':>8} {'bytes':>8} {'saved':>7} {'write ms':>9} {'read ms':>8}")
+    for rewrites in (0, 3, 10):
+        obj = checkpoint(rewrites)
+        baseline = len(plain.dumps_typed(obj)[1])
+
+        for name, serde in variants:
+            start = time.perf_counter()
+            for _ in range(runs):
+                stored = serde.dumps_typed(obj)
+            write_ms = (time.perf_counter() - start) / runs * 1000
+
+            start = time.perf_counter()
+            for _ in range(runs):
+                serde.loads_typed(stored)
+            read_ms = (time.perf_counter() - start) / runs * 1000
+
+            size = len(stored[1])
+            print(f"{rewrites:>8} {name:>8} {size:>8} {1 - size / baseline:>6.0%} {write_ms:>9.3f} {read_ms:>8.3f}")
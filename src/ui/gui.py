@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Optional
 from tkinter import END, messagebox
 
 from customtkinter import *
@@ -8,6 +8,7 @@ from CTkListbox import *
 import pystray
 from PIL import Image, ImageDraw
 import threading
+import time
 
 from src.connect import FrontendCommunicator, Communicator
 from src.email_service import EmailData, EmailService
@@ -216,6 +217,15 @@ class UIConfig:
     TIME_FONT = ("Helvetica", 12)
     BODY_FONT = ("Helvetica", 13)
     ACTION_BUTTON_FONT = ("Helvetica", 12, "bold")
+    
+    # Email list virtualization
+    ROW_HEIGHT = 34
+    ROW_OVERSCAN = 2
+    DEFAULT_VIEWPORT_HEIGHT = 560
+    
+    # Event pump
+    EVENT_BATCH_SIZE = 50
+    EVENT_BUDGET_MS = 8
 
 
 class ContextDialog(CTkToplevel):
@@ -318,15 +328,25 @@ class ContextDialog(CTkToplevel):
         self.destroy()
 
 class EmailGrid:
-    """Manages the email list grid view"""
+    """Manages the email list grid view
+    
+    The list is virtualized: only enough `EmailRow` widgets to fill the viewport
+    (plus a small overscan) are built, and they are rebound to different emails
+    as the user scrolls. Render cost therefore doesn't grow with category size.
+    """
     def __init__(self, parent: CTkFrame, on_email_select: Callable):
         self.parent = parent
         self.on_email_select = on_email_select
         self.grid_frame = None
+        self.rows_frame = None
+        self.scrollbar = None
         self.email_rows = []
+        self.emails = []
+        self.first_index = 0
         self.current_view_type = "normal"
         self._destroyed = False
         self.empty_content_frame = None
+        self.row_pool = None
         self._create_widgets()
 
     def _create_empty_content(self):
@@ -334,8 +354,9 @@ class EmailGrid:
         if self.empty_content_frame:
             self.empty_content_frame.destroy()
         
+        self.rows_frame.grid_remove()
         self.empty_content_frame = CTkFrame(self.grid_frame, fg_color="transparent")
-        self.empty_content_frame.pack(fill="both", expand=True, pady=50)
+        self.empty_content_frame.grid(row=0, column=0, columnspan=2, sticky="nsew", pady=50)
         
         # Get appropriate message and icon based on current view
         message_config = self._get_empty_message_config()
@@ -402,6 +423,12 @@ class EmailGrid:
                 "title": "No Ignored Emails",
                 "subtitle": "No emails have been moved to the ignore list.",
             }
+        elif self.current_view_type == "failed":
+            return {
+                "icon": "✅",
+                "title": "No Failed Emails",
+                "subtitle": "Every workflow finished or is still being retried.",
+            }
         else:  # home or normal view
             return {
                 "icon": "📧",
@@ -426,6 +453,9 @@ class EmailGrid:
         if self.empty_content_frame:
             self.empty_content_frame.destroy()
             self.empty_content_frame = None
+        
+        if self.rows_frame:
+            self.rows_frame.grid()
 
     
     def _create_widgets(self):
@@ -438,77 +468,217 @@ class EmailGrid:
         self.grid_frame = CTkFrame(self.wrapper_frame, fg_color="#1e2124", corner_radius=10)
         self.grid_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Configure grid columns
+        # Configure grid: viewport on the left, scrollbar on the right
         self.grid_frame.grid_columnconfigure(0, weight=1)
-        self.grid_frame.grid_columnconfigure(1, weight=0, minsize=110)
-        self.grid_frame.grid_columnconfigure(2, weight=0, minsize=200)
+        self.grid_frame.grid_columnconfigure(1, weight=0)
+        self.grid_frame.grid_rowconfigure(0, weight=1)
+        
+        # Viewport holding the recycled row widgets
+        self.rows_frame = CTkFrame(self.grid_frame, fg_color="transparent")
+        self.rows_frame.grid(row=0, column=0, sticky="nsew")
+        self.rows_frame.grid_columnconfigure(0, weight=1)
+        self.rows_frame.grid_propagate(False)  # size comes from the window, not the rows
+        self.rows_frame.bind("<Configure>", self._on_viewport_resize)
+        self._bind_scroll(self.rows_frame)
+        
+        self.scrollbar = CTkScrollbar(self.grid_frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 5), pady=5)
+        
+        self.row_pool = EmailRowPool(self.rows_frame, self.on_email_select, self._bind_scroll)
     
     def update_emails(self, emails: List[EmailData], view_type: str = "normal"):
-        """Update the grid with new emails"""
+        """Show a category from the top (used when switching categories)"""
         
         try:
-            self._clear_grid()
-            self.email_rows = []
-            self.current_view_type = view_type
+            if view_type != self.current_view_type:
+                # Recycled rows only need their action buttons swapped
+                self.current_view_type = view_type
+                for row in self.email_rows:
+                    row.set_view_type(view_type)
 
-            # Hide empty content first
+            # The empty-state message depends on the category
             self._hide_empty_content()
-
-            if not emails:  # If no emails, show empty content
-                self._create_empty_content()
-            else:
-                # Add small delay to ensure proper cleanup
-                if hasattr(self.parent, 'after'):
-                    self.parent.after(10, lambda: self._create_rows_delayed(emails, view_type))
-                else:
-                    self._create_rows_delayed(emails, view_type)
+            self.first_index = 0
+            self.apply_emails(emails)
                 
         except Exception as e:
             print(f"Error in update_emails: {e}")
 
-    # Add this new method to EmailGrid:
-    def _create_rows_delayed(self, emails, view_type):
-        """Create email rows with delay"""
+    def apply_emails(self, emails: List[EmailData]):
+        """
+        Apply a changed email list in place, keeping the scroll position.
+        Rows are keyed by email ID, so a new email, a removed email or an edited
+        email only costs the widget work for the rows that actually changed.
+        """
+        try:
+            # Keep the first visible email in place unless we are at the top
+            anchor = None
+            if 0 < self.first_index < len(self.emails):
+                anchor = self._email_key(self.emails[self.first_index])
+            
+            self.emails = list(emails)
+            
+            if anchor is not None:
+                position = self._position_of(anchor)
+                if position is not None:
+                    self.first_index = position
+
+            if not self.emails:  # If no emails, show empty content
+                if not self.empty_content_frame:
+                    self._create_empty_content()
+                for row in self.email_rows:
+                    row.hide()
+            else:
+                if self.empty_content_frame:
+                    self._hide_empty_content()
+                self._render()
+            
+            self._update_scrollbar()
         
-        for idx, email in enumerate(emails):
+        except Exception as e:
+            print(f"Error in apply_emails: {e}")
+
+    @staticmethod
+    def _email_key(email: EmailData):
+        return email.id if email.id else id(email)
+
+    def _position_of(self, key) -> Optional[int]:
+        for index, email in enumerate(self.emails):
+            if self._email_key(email) == key:
+                return index
+        return None
+
+    def _visible_count(self) -> int:
+        """Number of rows that fit in the viewport"""
+        height = self.rows_frame.winfo_height() if self.rows_frame else 0
+        if height <= 1:
+            # Viewport not mapped yet, assume the default window size
+            height = UIConfig.DEFAULT_VIEWPORT_HEIGHT
+        return max(1, height // UIConfig.ROW_HEIGHT)
+
+    def _viewport_capacity(self) -> int:
+        """Number of row widgets needed: visible rows plus overscan"""
+        return self._visible_count() + UIConfig.ROW_OVERSCAN
+
+    def _ensure_row_slots(self):
+        """Grow or shrink the set of row widgets to match the viewport"""
+        capacity = self._viewport_capacity()
+        self.row_pool.resize(capacity)
+        needed = min(capacity, len(self.emails))
+        
+        while len(self.email_rows) < needed:
+            index = len(self.email_rows)
             try:
-                row = EmailRow(self.grid_frame, email, idx, self.on_email_select, view_type)
-                self.email_rows.append(row)
+                self.email_rows.append(
+                    self.row_pool.acquire(self.emails[index], index, self.current_view_type)
+                )
             except Exception as e:
-                print(f"Error creating email row {idx}: {e}")
-                continue
+                print(f"Error creating email row {index}: {e}")
+                break
+        
+        # Rows beyond what fits are kept hidden; only a smaller viewport returns them
+        while len(self.email_rows) > capacity:
+            self.row_pool.release(self.email_rows.pop())
+
+    def _render(self):
+        """Bind the visible slice of emails onto the existing row widgets"""
+        if getattr(self, '_destroyed', False) or not self.emails:
+            return
+        
+        self._ensure_row_slots()
+        
+        max_first = max(0, len(self.emails) - self._visible_count())
+        self.first_index = max(0, min(self.first_index, max_first))
+        visible = self.emails[self.first_index:self.first_index + len(self.email_rows)]
+        
+        # Rows already showing one of the target emails keep it; only the
+        # remaining rows get rebound to the emails that are new in the viewport
+        wanted = {self._email_key(email) for email in visible}
+        claimed, free = {}, []
+        for row in self.email_rows:
+            key = self._email_key(row.email)
+            if key in wanted and key not in claimed:
+                claimed[key] = row
+            else:
+                free.append(row)
+        
+        ordered = []
+        for offset, email in enumerate(visible):
+            row = claimed.pop(self._email_key(email), None) or free.pop()
+            row.bind_email(email, self.first_index + offset)
+            row.show(offset)
+            ordered.append(row)
+        
+        for row in free:
+            row.hide()
+        
+        self.email_rows = ordered + free
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        """Reflect the current viewport position on the scrollbar"""
+        total = len(self.emails)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        
+        first = self.first_index / total
+        last = min(1.0, (self.first_index + self._visible_count()) / total)
+        self.scrollbar.set(first, last)
+
+    def _scroll_to(self, first_index: int):
+        if first_index != self.first_index:
+            self.first_index = first_index
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        """Handle scrollbar drag ('moveto') and arrow/page clicks ('scroll')"""
+        try:
+            if action == "moveto":
+                self._scroll_to(int(float(args[0]) * len(self.emails)))
+            elif action == "scroll":
+                amount, unit = int(args[0]), args[1]
+                step = self._visible_count() if unit == "pages" else 1
+                self._scroll_to(self.first_index + amount * step)
+        except Exception as e:
+            print(f"Error scrolling email grid: {e}")
+
+    def _on_mousewheel(self, event):
+        """Scroll three rows per wheel notch (Button-4/5 on X11)"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self.first_index - 3)
+        else:
+            self._scroll_to(self.first_index + 3)
+
+    def _bind_scroll(self, *widgets):
+        for widget in widgets:
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", self._on_mousewheel)
+            widget.bind("<Button-5>", self._on_mousewheel)
+
+    def _on_viewport_resize(self, event=None):
+        """Re-render when the viewport height changes the number of visible rows"""
+        if self.emails:
+            self._render()
 
     def _clear_grid(self):
-        """Safely clear all widgets from the grid"""
+        """Return all row widgets to the pool"""
         if getattr(self, '_destroyed', False) or not self.grid_frame:
             return
             
         try:
             # Hide empty content if it exists
             self._hide_empty_content()
-            self.email_rows.clear()
-            # Get all children before starting destruction
-            children = list(self.grid_frame.winfo_children())
-            
-        # Use after_idle to destroy widgets safely
-            def destroy_widgets():
-                for widget in children:
-                    try:
-                        if widget.winfo_exists():
-                            widget.destroy()
-                    except Exception as e:
-                        # Widget might already be destroyed
-                        pass
-            
-            # Schedule widget destruction for next idle cycle
-            if hasattr(self.parent, 'after_idle'):
-                self.parent.after_idle(destroy_widgets)
-            else:
-                destroy_widgets()
+            while self.email_rows:
+                self.row_pool.release(self.email_rows.pop())
                 
         except Exception as e:
             print(f"Error clearing grid: {e}")          
 
+    def pool_stats(self) -> Dict:
+        """Row pool hit rate and widget counts"""
+        return self.row_pool.stats()
+
     
     def show(self):
         """Show the grid"""
@@ -519,6 +689,80 @@ class EmailGrid:
         self.wrapper_frame.pack_forget()
 
 
+class EmailRowPool:
+    """
+    Pool of pre-built `EmailRow` widgets.
+    Rows are reconfigured (email, time, action buttons) instead of being
+    destroyed and created again, which avoids the canvas redraw cost of new
+    CustomTkinter widgets and keeps the widget count flat over long uptimes.
+    """
+    def __init__(self, parent: CTkFrame, on_click: Callable, bind_scroll: Callable):
+        self.parent = parent
+        self.on_click = on_click
+        self.bind_scroll = bind_scroll
+        self.idle_rows: List["EmailRow"] = []
+        self.max_idle = 0
+        
+        # Instrumentation
+        self.hits = 0
+        self.misses = 0
+        self.rows_created = 0
+        self.rows_destroyed = 0
+    
+    def acquire(self, email: EmailData, index: int, view_type: str) -> "EmailRow":
+        """Get a row bound to `email`, reusing an idle one when possible"""
+        if self.idle_rows:
+            self.hits += 1
+            row = self.idle_rows.pop()
+            row.set_view_type(view_type)
+            row.bind_email(email, index)
+            return row
+        
+        self.misses += 1
+        self.rows_created += 1
+        row = EmailRow(self.parent, email, index, self.on_click, view_type)
+        self.bind_scroll(row.row_frame, row.left_label, row.time_label)
+        return row
+    
+    def release(self, row: "EmailRow"):
+        """Hide a row and keep it for reuse, or destroy it if the pool is full"""
+        row.hide()
+        if len(self.idle_rows) < self.max_idle:
+            self.idle_rows.append(row)
+        else:
+            row.destroy()
+            self.rows_destroyed += 1
+    
+    def resize(self, capacity: int):
+        """Tie the number of idle rows kept around to the viewport capacity"""
+        self.max_idle = capacity
+        while len(self.idle_rows) > capacity:
+            self.idle_rows.pop().destroy()
+            self.rows_destroyed += 1
+    
+    def stats(self) -> Dict:
+        acquires = self.hits + self.misses
+        return {
+            "hit_rate": self.hits / acquires if acquires else 1.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rows_live": self.rows_created - self.rows_destroyed,
+            "rows_idle": len(self.idle_rows),
+            "rows_created": self.rows_created,
+            "rows_destroyed": self.rows_destroyed,
+            "widgets": self._count_widgets(self.parent),
+        }
+    
+    @staticmethod
+    def _count_widgets(widget) -> int:
+        """Count the Tk widgets below `widget`"""
+        try:
+            children = widget.winfo_children()
+        except Exception:
+            return 0
+        return len(children) + sum(EmailRowPool._count_widgets(child) for child in children)
+
+
 class TaskbarButton:
     """Represents a single taskbar button"""
     def __init__(self, parent: CTkFrame, text: str, command: Callable, row: int, column: int):
@@ -563,8 +807,8 @@ class Taskbar:
         self.taskbar_frame = CTkFrame(self.parent, height=500, fg_color=UIConfig.TASKBAR_COLOR)
         self.taskbar_frame.pack(side="top", fill="x")
         
-        # Configure grid columns for equal spacing (4 columns for main buttons)
-        for i in range(5):
+        # Configure grid columns for equal spacing (6 columns for main buttons)
+        for i in range(6):
             self.taskbar_frame.grid_columnconfigure(i, weight=1)
         
         # Create buttons
@@ -573,7 +817,8 @@ class Taskbar:
             ("notify", "Notify", 1),
             ("ignore", "Ignore", 2),
             ("human", "Pending", 3),
-            ("send", "Send Email", 4)
+            ("failed", "Failed", 4),
+            ("send", "Send Email", 5)
         ]
         
         for key, text, column in button_configs:
@@ -851,6 +1096,34 @@ class EmailDetailView:
                 command=lambda: self._handle_approve()
             )
             approve_btn.pack(side="right", padx=(5,0))
+        
+        elif category == "failed":
+            
+            # Discard button
+            discard_btn = CTkButton(
+                self.action_frame,
+                text="Discard",
+                width=70,
+                height=25,
+                font=UIConfig.ACTION_BUTTON_FONT,
+                fg_color=UIConfig.REJECT_BUTTON_COLOR,
+                hover_color=UIConfig.REJECT_BUTTON_HOVER,
+                command=lambda: self._handle_failed("discard_failed")
+            )
+            discard_btn.pack(side="right", padx=(5,50))
+            
+            # Retry button
+            retry_btn = CTkButton(
+                self.action_frame,
+                text="Retry",
+                width=70,
+                height=25,
+                font=UIConfig.ACTION_BUTTON_FONT,
+                fg_color=UIConfig.ACTION_BUTTON_COLOR,
+                hover_color=UIConfig.ACTION_BUTTON_HOVER,
+                command=lambda: self._handle_failed("retry_failed")
+            )
+            retry_btn.pack(side="right", padx=(5,0))
             
     def _show_summary(self, content=""):
         """Return summary content as string, handling various input types"""
@@ -921,6 +1194,20 @@ class EmailDetailView:
         except Exception:
             pass
 
+    def _handle_failed(self, type: str):
+        """Retry or discard a workflow from the dead-letter queue"""
+        root = self._get_root()
+        data = {
+            "workflow_id": self.current_email.workflow_id
+        }
+        
+        EmailService.remove_failed(self.current_email)
+        
+        if self.action_callback:
+            self.content_frame.after(10, lambda: self.action_callback("refresh"))
+        
+        root.send_commands(type, data)
+
     def _handle_approve(self):
         root = self._get_root()
         type = "approve"
@@ -1187,6 +1474,17 @@ class SendEmailView:
             command=self._reject_draft
         )
         clear_btn.pack(side="left")
+        
+        # Discard button: cancels the draft workflow, even mid-generation
+        discard_btn = CTkButton(
+            button_frame,
+            text="Discard",
+            height=35,
+            font=UIConfig.ACTION_BUTTON_FONT,
+            fg_color="#282b30",
+            command=self._discard_draft
+        )
+        discard_btn.pack(side="right")
     
     def _generate_draft(self):
         """Generate draft email using AI"""
@@ -1202,6 +1500,9 @@ class SendEmailView:
             # Get root window to send command
             root = self._get_root()
             if root:
+                # A new draft replaces the previous one; stop that workflow
+                self._cancel_current_workflow(root)
+                
                 # Generate unique workflow ID for tracking
                 import uuid
                 workflow_id = str(uuid.uuid4())
@@ -1259,6 +1560,7 @@ class SendEmailView:
                 root.send_commands(type, data)
                 
                 messagebox.showinfo("Success", "Email sent successfully!")
+                self.current_workflow_id = None
                 self._clear_form()
             else:
                 messagebox.showerror("Error", "Unable to send email.")
@@ -1292,6 +1594,18 @@ class SendEmailView:
             callback=on_context_provided  
         )
 
+    def _discard_draft(self):
+        """Abandon the draft: cancel its workflow and clear the form"""
+        root = self._get_root()
+        if root:
+            self._cancel_current_workflow(root)
+        self._clear_form()
+    
+    def _cancel_current_workflow(self, root):
+        if self.current_workflow_id:
+            root.send_commands("cancel_workflow", {"workflow_id": self.current_workflow_id})
+            self.current_workflow_id = None
+
     def _clear_form(self):
         """Clear all form fields"""
         self.from_entry.delete(0, END)
@@ -1329,7 +1643,11 @@ class SendEmailView:
         self.content_frame.pack_forget()
 
 class EmailRow:
-    """Represents a single email row in the grid"""
+    """Represents a single email row in the grid
+    
+    Rows are recycled through `EmailRowPool`: `bind_email` points an existing
+    row at a different email and `set_view_type` swaps its action buttons.
+    """
     def __init__(self, parent: CTkFrame, email: EmailData, index: int, on_click: Callable, 
                  view_type: str = "normal"):
         self.parent = parent
@@ -1341,31 +1659,26 @@ class EmailRow:
         self.left_label = None
         self.time_label = None
         self.action_frame = None
+        self.action_frames = {}
+        self.slot = None
         
         self._create_widgets()
         self._bind_events()
+        self.bind_email(email, index)
     
     def _create_widgets(self):
         """Create the row widgets"""
-        from src.utils import get_sender_name
-        # Main row frame
-        self.row_frame = CTkFrame(self.parent, fg_color=UIConfig.ROW_COLOR)
-        self.row_frame.grid(row=self.index, column=0, columnspan=3, sticky="ewns", padx=0, pady=1)
-        
-        # Configure columns based on view type
-        if self.view_type in ["notify", "pending"]:
-            self.row_frame.grid_columnconfigure(0, weight=1)
-            self.row_frame.grid_columnconfigure(1, weight=0, minsize=110)
-            self.row_frame.grid_columnconfigure(2, weight=0, minsize=200)
-        else:
-            self.row_frame.grid_columnconfigure(0, weight=1)
-            self.row_frame.grid_columnconfigure(1, weight=0, minsize=110)
+        # Main row frame (fixed height so the grid can compute its viewport)
+        self.row_frame = CTkFrame(self.parent, fg_color=UIConfig.ROW_COLOR, height=UIConfig.ROW_HEIGHT - 2)
+        self.row_frame.grid_propagate(False)
+        self.row_frame.grid_columnconfigure(0, weight=1)
+        self.row_frame.grid_columnconfigure(1, weight=0, minsize=110)
+        self.row_frame.grid_rowconfigure(0, weight=1)
         
         # Left label (sender | snippet)
-        left_text = f"{get_sender_name(self.email.sender)} | {self.email.subject}"
         self.left_label = CTkLabel(
             self.row_frame, 
-            text=left_text, 
+            text="", 
             anchor="w", 
             font=UIConfig.EMAIL_FONT
         )
@@ -1374,23 +1687,77 @@ class EmailRow:
         # Time label
         self.time_label = CTkLabel(
             self.row_frame, 
-            text=self.email.time, 
+            text="", 
             anchor="e", 
             font=UIConfig.TIME_FONT, 
             width=100
         )
         self.time_label.grid(row=0, column=1, sticky="e", padx=(5,10), pady=2)
         
-        # Action buttons for notify and pending views
-        if self.view_type == "notify":
+        # Action buttons for notify and pending views (force the first setup)
+        view_type, self.view_type = self.view_type, None
+        self.set_view_type(view_type)
+    
+    def set_view_type(self, view_type: str):
+        """Show the action buttons belonging to `view_type`, building them once"""
+        if view_type == self.view_type:
+            return
+        self.view_type = view_type
+        
+        if view_type == "notify" and "notify" not in self.action_frames:
             self._create_notify_actions()
-        elif self.view_type == "pending":
+        elif view_type == "pending" and "pending" not in self.action_frames:
             self._create_pending_actions()
+        
+        # Configure columns based on view type
+        has_actions = view_type in ["notify", "pending"]
+        self.row_frame.grid_columnconfigure(2, weight=0, minsize=200 if has_actions else 0)
+        
+        self.action_frame = self.action_frames.get(view_type)
+        for kind, frame in self.action_frames.items():
+            if kind == view_type:
+                frame.grid()
+            else:
+                frame.grid_remove()
+    
+    def bind_email(self, email: EmailData, index: int):
+        """Point this row at another email, touching only the labels that changed"""
+        from src.utils import get_sender_name
+        
+        self.email = email
+        self.index = index
+        
+        left_text = f"{get_sender_name(email.sender)} | {email.subject}"
+        if self.left_label.cget("text") != left_text:
+            self.left_label.configure(text=left_text)
+        if self.time_label.cget("text") != email.time:
+            self.time_label.configure(text=email.time)
+    
+    def show(self, slot: int):
+        """Place the row at a viewport slot"""
+        if self.slot != slot:
+            self.row_frame.grid(row=slot, column=0, sticky="ew", padx=0, pady=1)
+            self.slot = slot
+    
+    def hide(self):
+        """Remove the row from the viewport without destroying it"""
+        if self.slot is not None:
+            self.row_frame.grid_remove()
+            self.slot = None
+    
+    def destroy(self):
+        try:
+            if self.row_frame.winfo_exists():
+                self.row_frame.destroy()
+        except Exception:
+            # Widget might already be destroyed
+            pass
     
     def _create_notify_actions(self):
         """Create action buttons for notify view"""
         self.action_frame = CTkFrame(self.row_frame, fg_color="transparent")
         self.action_frame.grid(row=0, column=2, sticky="e", padx=(5,10), pady=2)
+        self.action_frames["notify"] = self.action_frame
         
         # Ignore button
         ignore_btn = CTkButton(
@@ -1422,6 +1789,7 @@ class EmailRow:
         """Create action buttons for pending view"""
         self.action_frame = CTkFrame(self.row_frame, fg_color="transparent")
         self.action_frame.grid(row=0, column=2, sticky="e", padx=(5,10), pady=2)
+        self.action_frames["pending"] = self.action_frame
         
         # Reject button
         reject_btn = CTkButton(
@@ -1576,7 +1944,7 @@ class EmailRow:
 class EmailAgentGUI(CTk):
     """Main application class"""
     
-    def __init__(self, communicator: Communicator):
+    def __init__(self, communicator: Communicator, event_budget_ms: float = None):
         super().__init__()
         self.wm_attributes('-toolwindow', False)
         
@@ -1597,6 +1965,9 @@ class EmailAgentGUI(CTk):
         self.current_emails = []
         self.selected_email_index = None
         self._processing_response = False
+        
+        # Time the event pump may spend per tick before yielding to Tk
+        self.event_budget_ms = event_budget_ms or UIConfig.EVENT_BUDGET_MS
 
 
         self._setup_window()
@@ -1628,6 +1999,7 @@ class EmailAgentGUI(CTk):
             "notify": lambda: self.load_emails("notify"),
             "ignore": lambda: self.load_emails("ignore"),
             "human": lambda: self.load_emails("human"),
+            "failed": lambda: self.load_emails("failed"),
             "send": self.show_send_email
         }
         self.taskbar = Taskbar(self, taskbar_callbacks)
@@ -1683,6 +2055,8 @@ class EmailAgentGUI(CTk):
             view_type = "notify"
         elif category == "human":
             view_type = "pending"
+        elif category == "failed":
+            view_type = "failed"
             
         # Update grid view
         self.email_grid.update_emails(self.current_emails, view_type)
@@ -1692,12 +2066,22 @@ class EmailAgentGUI(CTk):
         self.show_email_list()
 
     
+    def refresh_category(self, category: str):
+        """Apply model changes to the grid in place if the category is on screen"""
+        if category != self.current_category:
+            return
+        
+        self.current_emails = EmailService.load_emails_by_category(category)
+        self.email_grid.apply_emails(self.current_emails)
+    
     def handle_email_interaction(self, action):
         """Handle email interaction (click or action)"""
         
         if action == "refresh":
-            # Refresh the current view
-            self.load_emails(self.current_category)
+            # Refresh the current view and return to the list
+            self.refresh_category(self.current_category)
+            self.email_detail.current_email = None
+            self.show_email_list()
             
         elif isinstance(action, int):
             
@@ -1750,31 +2134,66 @@ class EmailAgentGUI(CTk):
         if hasattr(self, 'send_email_view'):
             self.send_email_view.update_draft(draft_content)
         
+    def show_backend_stopped(self, restarts: int, exit_code):
+        """Warn that email monitoring stopped (shown after the event pump returns)"""
+        self.after(0, lambda: messagebox.showerror(
+            "Error",
+            f"The email backend crashed {restarts + 1} times (exit code {exit_code}) and was not restarted.\n\n"
+            "New emails will not be picked up. Please restart the application."
+        ))
+        
     def _start_event_polling(self):
-        """Start polling for events from backend"""
+        """Start draining backend events whenever the backend pushes one"""
+        self._wakeup_pending = threading.Event()
+        self.bind("<<BackendEvents>>", lambda event: self._poll_events())
+        
+        # Register the wakeup once the main loop is running, then catch up on
+        # anything queued during startup
+        self.after_idle(self._register_event_listener)
+    
+    def _register_event_listener(self):
+        self.frontend_communicator.set_event_listener(self._wake_event_pump)
         self._poll_events()
     
+    def _wake_event_pump(self):
+        """Called from backend threads: post one virtual event per drain"""
+        if self._wakeup_pending.is_set():
+            return
+        self._wakeup_pending.set()
+        try:
+            self.event_generate("<<BackendEvents>>", when="tail")
+        except Exception as e:
+            # Window is gone or Tk is shutting down
+            self._wakeup_pending.clear()
+            print(f"Error waking GUI event pump: {e}")
+    
     def _poll_events(self):
-        """Poll for events and schedule next poll"""
+        """Drain events within the per-tick time budget, then refresh the view once"""
+        # Clear first so an event pushed while draining triggers another pass
+        self._wakeup_pending.clear()
+        
         try:
-            # Process up to 5 events per poll cycle to prevent GUI freezing
-            self.frontend_communicator.poll_events(
-                callback_func=self.frontend_communicator.process_events,
-                max_events_per_poll=5
-            )
+            deadline = time.perf_counter() + self.event_budget_ms / 1000
+            dirty = set()
+            
+            # Apply model changes batch by batch until the queue or the budget runs out
+            while True:
+                events = self.frontend_communicator.drain_events(UIConfig.EVENT_BATCH_SIZE)
+                if not events:
+                    break
+                dirty |= self.frontend_communicator.apply_events(events)
+                if time.perf_counter() >= deadline:
+                    break
+            
+            self.frontend_communicator.refresh_views(dirty)
             
-            # If there are still events pending, schedule immediate next poll
+            # Over budget with events left: continue on the next tick.
+            # Otherwise sleep until the backend pushes the next event.
             if self.frontend_communicator.has_pending_events():
-                poll_interval = 10  
-            else:
-                poll_interval = 100 
+                self.after(10, self._poll_events)
                 
         except Exception as e:
             print(f"Error in GUI event polling: {e}")
-            poll_interval = 100  # Default interval on error
-        
-        # Schedule next poll
-        self.after(poll_interval, self._poll_events)
         
     def send_commands(self, command_type: str, data: dict):
         """Send commands to backend"""
@@ -1834,6 +2253,17 @@ class EmailAgentGUI(CTk):
     
     def shutdown(self):
         """Shutdown method that can be called externally"""
+        # Stop backend threads from posting events to a closing window
+        self.frontend_communicator.set_event_listener(None)
+        
+        # Row pool instrumentation, once per session (it walks the whole widget tree)
+        try:
+            stats = self.email_grid.pool_stats()
+            print(f"Row pool: {stats['hit_rate']:.0%} hit rate, {stats['rows_live']} rows, "
+                  f"{stats['widgets']} widgets - (shutdown)")
+        except Exception as e:
+            print(f"Error reading row pool stats: {e}")
+        
         if self.tray_manager:
             self.tray_manager.stop_tray_icon()    
             
@@ -63,6 +63,11 @@ class Notification:
         """Send new email notification"""
         title = "New notify email!" + " - " + get_sender_name(sender)
         self._send_notification(title, content[:255])
+    
+    def new_notify_emails(self, count: int):
+        """Send a single notification for a burst of notify emails"""
+        title = f"{count} new notify emails!"
+        self._send_notification(title, "Open SmartEmailBot to review them.")
 
     
     def _send_notification(self, title: str, message: str, timeout: Optional[int] = None):
@@ -159,7 +164,8 @@ def format_email_body(email_body: str) -> str:
 
 def parse_email(email_input: dict):
     author = email_input["sender"]
-    to = os.environ["MY_EMAIL"]
+    # The mailbox the email arrived in; MY_EMAIL for emails from before multi-account support
+    to = email_input.get("account_email") or os.environ.get("MY_EMAIL", "")
     subject = email_input["subject"]
     body = email_input["body"]
     id = email_input["id"]
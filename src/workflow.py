@@ -3,9 +3,10 @@ from abc import ABC, abstractmethod
 from src.nodes import Nodes
 from src.states import EmailResponseState, SendEmailState
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite import SqliteSaver
+from src.checkpoint import get_checkpointer
+from src.deadlines import guarded, NODE_TIMEOUT
 
-import sqlite3
+import threading
 from dotenv import load_dotenv
 
 try:
@@ -15,27 +16,29 @@ except Exception as e:
     
 
 class Workflow(ABC):
-    def __init__(self, model: str, db_path: str):
+    def __init__(self, model: str, db_path: str, node_timeout: float = NODE_TIMEOUT):
         self.model = model
         self.db_path = db_path
-        self.node = Nodes(model)
+        self.node_timeout = node_timeout
         self.checkpointer = self._initialize_checkpointer()
+        self.node = Nodes(model, content_store=self.checkpointer)
         
         
     def _initialize_checkpointer(self):
         """Initialize SQLite checkpointer for persistence"""
+        # Stateless runs (batch mode) never resume, so they skip persistence entirely
+        if self.db_path is None:
+            return None
+        
         try:
             # Validate db_paths
             if not self.db_path:
                 print(f"ERROR: db_path is None or empty")
                 return None
             
-            # Create connection to SQLite database
-            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Every workflow shares the process-wide store for this database
+            checkpointer = get_checkpointer(self.db_path)
             print(f"DEBUG: Connect to SQLITE")
-            
-            # Create Sqlitesaver with connection
-            checkpointer = SqliteSaver(conn)
             return checkpointer
         
         except Exception as e:
@@ -44,6 +47,10 @@ class Workflow(ABC):
             return None
         
     
+    def _guard(self, node):
+        """Node timeout plus the run's deadline and cancellation (see src.deadlines)"""
+        return guarded(node, self.node_timeout)
+    
     def save_graph(self, path: str = "workflow.png") -> None:
             """
             Dump the Mermaid‑based PNG to a file so you can open it in your OS.
@@ -67,8 +74,8 @@ class SendEmailWorkflow(Workflow):
     
     def _create_workflow(self):
         # Bind node methods
-        writer          = self.node.writer
-        send_response   = self.node.send_response
+        writer          = self._guard(self.node.writer)
+        send_response   = self._guard(self.node.send_response)
 
         # Register nodes in the graph
         self.graph.add_node("writer", writer)
@@ -97,11 +104,11 @@ class EmailResponseWorkflow(Workflow):
                    
     def _create_workflow(self): 
         # Bind node methods
-        classifier         = self.node.classifier
-        summarizer         = self.node.summarizer
-        interrupts_handler = self.node.interrupts_handler
-        writer             = self.node.writer
-        send_response      = self.node.send_response
+        classifier         = self._guard(self.node.classifier)
+        summarizer         = self._guard(self.node.summarizer)
+        interrupts_handler = self._guard(self.node.interrupts_handler)
+        writer             = self._guard(self.node.writer)
+        send_response      = self._guard(self.node.send_response)
         
         
         # Register nodes in the graph
@@ -138,6 +145,25 @@ class EmailResponseWorkflow(Workflow):
         workflow = self.graph.compile(checkpointer= self.checkpointer)
         return workflow
     
+_compiled_workflows = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+def get_compiled_workflow(workflow_cls, model: str, db_path: str):
+    """
+    Compile each workflow kind once per (model, db_path) and share it.
+    Compiled graphs are reentrant, so every mailbox, email and command reuses
+    the same graph, Nodes instance and chat model client.
+    """
+    key = (workflow_cls, model, db_path)
+    with _compiled_workflows_lock:
+        workflow = _compiled_workflows.get(key)
+        if workflow is None:
+            workflow = workflow_cls(model, db_path).get_workflow
+            _compiled_workflows[key] = workflow
+        return workflow
+
+
 if "__main__" == __name__:
     workflow_instance = EmailResponseWorkflow(model="gpt-4o-mini", db_path= "db/workflows.json")
     workflow = workflow_instance.workflow
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Local IMAP server stand-in for ImapIdleSource tests.
+
+Speaks just enough IMAP4rev1 over a real TCP socket for imaplib and the IDLE
+loop: CAPABILITY, LOGIN, SELECT (with UIDVALIDITY), UID SEARCH, UID FETCH,
+IDLE/DONE and LOGOUT. Tests drive the mailbox from outside: add mail (pushed as
+"* n EXISTS" to idling sessions), drop every connection, or rebuild the
+mailbox under a new UIDVALIDITY.
+"""
+import re
+import socket
+import threading
+import socketserver
+from typing import List, Tuple
+
+
+# What the stand-in reports as every message's INTERNALDATE (arrival time)
+INTERNALDATE = "07-Jan-2025 10:30:00 +0000"
+
+
+def make_message(subject: str, message_id: str, body: str = "Hello", date: bool = True) -> bytes:
+    return (
+        f"From: Alice <alice@example.com>\r\n"
+        f"To: me@example.com\r\n"
+        f"Subject: {subject}\r\n"
+        f"Message-ID: <{message_id}>\r\n"
+        + ("Date: Mon, 06 Jan 2025 09:00:00 +0000\r\n" if date else "")
+        + f"\r\n"
+        f"{body}\r\n"
+    ).encode()
+
+
+class _Session(socketserver.StreamRequestHandler):
+    server: "FakeImapServer"
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.idling = False
+        self.server.register(self)
+
+    def finish(self):
+        self.server.unregister(self)
+        try:
+            super().finish()
+        except OSError:
+            pass
+
+    def send(self, *lines: bytes) -> None:
+        with self.write_lock:
+            for line in lines:
+                self.wfile.write(line if line.endswith(b"\r\n") else line + b"\r\n")
+            self.wfile.flush()
+
+    def handle(self):
+        self.send(b"* OK [CAPABILITY IMAP4rev1 IDLE] Fake IMAP ready")
+        while True:
+            try:
+                line = self.rfile.readline()
+            except OSError:
+                return
+            if not line:
+                return
+
+            tag, _, rest = line.decode().rstrip("\r\n").partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+
+            if command == "CAPABILITY":
+                self.send(b"* CAPABILITY IMAP4rev1 IDLE", f"{tag} OK CAPABILITY completed".encode())
+            elif command == "LOGIN":
+                self.send(f"{tag} OK LOGIN completed".encode())
+            elif command in ("SELECT", "EXAMINE"):
+                uid_validity, messages = self.server.snapshot()
+                self.send(
+                    f"* {len(messages)} EXISTS".encode(),
+                    f"* OK [UIDVALIDITY {uid_validity}] UIDs valid".encode(),
+                    f"{tag} OK [READ-ONLY] {command} completed".encode(),
+                )
+            elif command == "UID":
+                self._uid(tag, args)
+            elif command == "IDLE":
+                self._idle(tag)
+            elif command == "LOGOUT":
+                self.send(b"* BYE logging out", f"{tag} OK LOGOUT completed".encode())
+                return
+            else:
+                self.send(f"{tag} BAD unknown command {command}".encode())
+
+    def _uid(self, tag: str, args: str) -> None:
+        subcommand, _, args = args.partition(" ")
+        _, messages = self.server.snapshot()
+        self.server.commands.append(f"UID {subcommand.upper()} {args}")
+
+        if subcommand.upper() == "SEARCH":
+            match = re.search(r"UID (\d+):\*", args)
+            if match and messages:
+                # Like real servers, "n:*" always includes the newest message
+                uids = [uid for uid, _ in messages if uid >= int(match.group(1))] or [messages[-1][0]]
+            else:
+                uids = [uid for uid, _ in messages]
+            self.send(("* SEARCH " + " ".join(map(str, uids))).rstrip().encode(), f"{tag} OK SEARCH completed".encode())
+
+        elif subcommand.upper() == "FETCH":
+            wanted = {int(uid) for uid in args.split(" ", 1)[0].split(",")}
+            lines = []
+            for seq, (uid, raw) in enumerate(messages, start=1):
+                if uid in wanted:
+                    lines.append(f'* {seq} FETCH (UID {uid} INTERNALDATE "{INTERNALDATE}" BODY[] {{{len(raw)}}}'.encode()
+                                 + b"\r\n" + raw + b")")
+            self.send(*lines, f"{tag} OK FETCH completed".encode())
+
+        else:
+            self.send(f"{tag} BAD unknown UID command".encode())
+
+    def _idle(self, tag: str) -> None:
+        self.send(b"+ idling")
+        self.idling = True
+        try:
+            line = self.rfile.readline()
+        finally:
+            self.idling = False
+        if line.strip().upper() == b"DONE":
+            self.send(f"{tag} OK IDLE terminated".encode())
+
+
+class FakeImapServer(socketserver.ThreadingTCPServer):
+    """Threaded IMAP stand-in on 127.0.0.1 with a random port"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Session)
+        self.port = self.server_address[1]
+        self.lock = threading.Lock()
+        self.sessions: List[_Session] = []
+        self.uid_validity = 1
+        self.messages: List[Tuple[int, bytes]] = []
+        self.next_uid = 1
+        self.connections = 0
+        self.commands: List[str] = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.drop_connections()
+        self.server_close()
+
+    # ---- sessions
+
+    def register(self, session: _Session) -> None:
+        with self.lock:
+            self.sessions.append(session)
+            self.connections += 1
+
+    def unregister(self, session: _Session) -> None:
+        with self.lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+
+    def idle_sessions(self) -> int:
+        with self.lock:
+            return sum(session.idling for session in self.sessions)
+
+    def snapshot(self) -> Tuple[int, List[Tuple[int, bytes]]]:
+        with self.lock:
+            return self.uid_validity, list(self.messages)
+
+    # ---- mailbox changes driven by the tests
+
+    def add_message(self, raw: bytes, notify: bool = True) -> int:
+        with self.lock:
+            uid = self.next_uid
+            self.next_uid += 1
+            self.messages.append((uid, raw))
+            exists = len(self.messages)
+            sessions = [session for session in self.sessions if session.idling] if notify else []
+
+        for session in sessions:
+            session.send(f"* {exists} EXISTS".encode())
+        return uid
+
+    def rebuild(self, uid_validity: int, messages: List[bytes]) -> None:
+        """Replace the mailbox under a new UIDVALIDITY, numbering UIDs from 1 again"""
+        with self.lock:
+            self.uid_validity = uid_validity
+            self.messages = [(uid, raw) for uid, raw in enumerate(messages, start=1)]
+            self.next_uid = len(messages) + 1
+
+    def drop_connections(self) -> None:
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            try:
+                session.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
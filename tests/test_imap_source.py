@@ -0,0 +1,144 @@
+"""ImapIdleSource against the local IMAP stand-in (tests/imap_server.py)"""
+import time
+import imaplib
+import threading
+from datetime import datetime
+
+import pytest
+
+from imap_server import INTERNALDATE, FakeImapServer, make_message
+from src.sources import ImapIdleSource
+
+
+class Inbox:
+    """Collects what the source delivers"""
+
+    def __init__(self):
+        self.emails = []
+        self.changed = threading.Condition()
+
+    def __call__(self, emails):
+        with self.changed:
+            self.emails.extend(emails)
+            self.changed.notify_all()
+
+    def subjects(self):
+        with self.changed:
+            return [email["subject"] for email in self.emails]
+
+    def wait_for(self, count: int, timeout: float = 5.0):
+        with self.changed:
+            assert self.changed.wait_for(lambda: len(self.emails) >= count, timeout), self.subjects()
+        return self.subjects()
+
+
+def wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.02)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture
+def server():
+    with FakeImapServer() as server:
+        yield server
+
+
+@pytest.fixture
+def source(server):
+    source = ImapIdleSource(
+        host="127.0.0.1", user="me@example.com", password="secret", use_ssl=False,
+        imap_factory=lambda: imaplib.IMAP4("127.0.0.1", server.port),
+    )
+    yield source
+    source.stop()
+    if source._thread is not None:
+        source._thread.join(timeout=5)
+
+
+def test_catch_up_then_push_delivery(server, source):
+    server.add_message(make_message("Before start", "m1@example.com"))
+
+    inbox = Inbox()
+    source.start(inbox)
+    assert inbox.wait_for(1) == ["Before start"]
+
+    wait_until(lambda: server.idle_sessions() == 1)
+    server.add_message(make_message("Pushed", "m2@example.com"))
+
+    assert inbox.wait_for(2) == ["Before start", "Pushed"]
+    assert inbox.emails[1]["id"] == "m2@example.com"
+    assert source.last_uid == 2
+    # The push only fetched what was new
+    assert server.commands[-1].startswith("UID FETCH 2 ")
+
+
+def test_reconnect_catches_up_on_mail_missed_while_disconnected(server, source):
+    inbox = Inbox()
+    source.start(inbox)
+    wait_until(lambda: server.idle_sessions() == 1)
+
+    server.add_message(make_message("First", "m1@example.com"))
+    inbox.wait_for(1)
+    wait_until(lambda: server.idle_sessions() == 1)
+
+    server.drop_connections()
+    # Arrives while nobody is idling: only the catch-up sync can find it
+    server.add_message(make_message("Missed", "m2@example.com"), notify=False)
+
+    assert inbox.wait_for(2) == ["First", "Missed"]
+    assert server.connections == 2
+
+    # Pushes work again on the new connection
+    wait_until(lambda: server.idle_sessions() == 1)
+    server.add_message(make_message("After reconnect", "m3@example.com"))
+    assert inbox.wait_for(3) == ["First", "Missed", "After reconnect"]
+
+
+def test_uidvalidity_change_resyncs(server, source):
+    for n in range(3):
+        server.add_message(make_message(f"Old {n}", f"old{n}@example.com"))
+
+    inbox = Inbox()
+    source.start(inbox)
+    inbox.wait_for(3)
+    assert source.last_uid == 3
+    wait_until(lambda: server.idle_sessions() == 1)
+
+    # Rebuilt mailbox: the new message gets UID 1, below the last UID seen
+    server.rebuild(uid_validity=2, messages=[make_message("Rebuilt", "new@example.com")])
+    server.drop_connections()
+
+    subjects = inbox.wait_for(4)
+    assert subjects[-1] == "Rebuilt"
+    assert source.uid_validity == "2"
+    assert source.last_uid == 1
+
+
+def test_time_falls_back_to_internaldate(server, source):
+    server.add_message(make_message("Dated", "m1@example.com"))
+    server.add_message(make_message("Undated", "m2@example.com", date=False))
+
+    inbox = Inbox()
+    source.start(inbox)
+    inbox.wait_for(2)
+
+    arrived = datetime.strptime(INTERNALDATE, "%d-%b-%Y %H:%M:%S %z").astimezone().replace(tzinfo=None)
+    assert [email["time"] for email in inbox.emails] == [
+        "06/01/2025 - 09:00", arrived.strftime("%d/%m/%Y - %H:%M"),
+    ]
+
+
+def test_stop_unblocks_idle(server, source):
+    source.start(Inbox())
+    wait_until(lambda: server.idle_sessions() == 1)
+
+    started = time.monotonic()
+    source.stop()
+    source._thread.join(timeout=5)
+
+    assert not source._thread.is_alive()
+    assert time.monotonic() - started < 2
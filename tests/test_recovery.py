@@ -0,0 +1,157 @@
+"""EmailManager.recover_workflows after a crash: waiting workflows come back from checkpoints alone"""
+import sys
+import time
+import types
+from collections import Counter
+
+import pytest
+from langgraph.graph import END
+from langgraph.types import Command, interrupt
+
+from src.accounts import Account
+from src.connect import Communicator
+from src.messages import ApprovalEvent, NewEmailEvent, NotifyEvent
+
+TRIAGE = 20
+APPROVAL = 10
+# Generous for CI; a crash recovery of this size takes a few hundredths of a second
+RECOVERY_BOUND = 2.0
+
+
+class ScriptedNodes:
+    """Stand-in for src.nodes.Nodes: canned LLM answers, and LLM nodes fail while `llm_enabled` is off"""
+
+    llm_enabled = True
+    llm_calls = 0
+
+    def __init__(self, model, content_store=None):
+        self.content_store = content_store
+
+    def _llm(self):
+        if not ScriptedNodes.llm_enabled:
+            raise AssertionError("recovery must not call the model")
+        ScriptedNodes.llm_calls += 1
+
+    def _input_email(self, state):
+        email = state["input_email"]
+        return email if "body" in email else self.content_store.get_email(email)
+
+    def classifier(self, state):
+        self._llm()
+        return Command(goto="summarizer", update={"decision": "notify"})
+
+    def summarizer(self, state):
+        self._llm()
+        return Command(goto="interrupts_handler", update={"summary": f"Summary of {self._input_email(state)['subject']}"})
+
+    def interrupts_handler(self, state):
+        request = interrupt({"question": "Do you want to response to this email?"})
+        if request["flag"]:
+            return Command(goto="writer", update={"interrupt_decision": "response"})
+        return Command(goto=END, update={"interrupt_decision": "ignore"})
+
+    def writer(self, state):
+        self._llm()
+        return Command(goto="send_response", update={"first_write": False, "draft_response": "Draft reply"})
+
+    def send_response(self, state, config):
+        interrupt({"question": "Do you want to send this response?"})
+        return Command(goto=END, update={"send_decision": "response"})
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Fresh src.workflow compiled against ScriptedNodes, in a scratch working directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MY_EMAIL", "me@example.com")
+
+    nodes = types.ModuleType("src.nodes")
+    nodes.Nodes = ScriptedNodes
+    monkeypatch.setitem(sys.modules, "src.nodes", nodes)
+    monkeypatch.delitem(sys.modules, "src.workflow", raising=False)
+    monkeypatch.setattr(ScriptedNodes, "llm_enabled", True)
+    monkeypatch.setattr(ScriptedNodes, "llm_calls", 0)
+
+    import src.workflow
+    yield src.workflow
+    src.workflow._compiled_workflows.clear()
+
+
+def make_manager(tmp_path):
+    from src.backend import EmailManager
+
+    account = Account("default", "me@example.com", str(tmp_path / "token.json"), str(tmp_path / "db" / "email_state.json"))
+    gmail = types.SimpleNamespace(api_resource=None)
+    return EmailManager("scripted", Communicator(), gmail_api=gmail, check_interval=60,
+                        db_path=str(tmp_path / "db" / "checkpoints.sqlite"), accounts=[account])
+
+
+def seed_and_crash(app, tmp_path):
+    """Leave TRIAGE workflows waiting at triage and APPROVAL at draft approval, then lose everything but the checkpoints"""
+    manager = make_manager(tmp_path)
+    wf = app.get_compiled_workflow(app.EmailResponseWorkflow, manager.model, manager.db_path)
+
+    emails = [
+        {"id": f"email-{n}", "threadId": f"thread-{n}", "sender": "Alice <alice@example.com>",
+         "subject": f"Subject {n}", "body": "Body " * 200, "snippet": "Body", "time": "06/01/2025 - 09:00",
+         "workflow_id": f"wf-{n}", "account": "default"}
+        for n in range(TRIAGE + APPROVAL)
+    ]
+    for email in emails:
+        manager.workflow_processor.process_email(
+            email=email, wf=wf, wf_manager=manager.workflow_manager, communicator=manager.communicator, wait=True
+        )
+    for email in emails[TRIAGE:]:
+        manager.workflow_processor.process_email(
+            workflow_id=email["workflow_id"], wf=wf, wf_manager=manager.workflow_manager,
+            communicator=manager.communicator, resume=True, resume_inputs={"flag": True, "feedback": ""}, wait=True
+        )
+
+    # The crash: registry rows, emails.json and the email state never reach disk
+    with manager.workflow_manager.lock:
+        manager.workflow_manager.conn.execute("DELETE FROM workflows")
+        manager.workflow_manager.conn.commit()
+    manager.workflow_processor.executor.shutdown(wait=True)
+
+    app._compiled_workflows.clear()
+    return emails
+
+
+def test_recover_waiting_workflows_without_llm_calls(app, tmp_path):
+    emails = seed_and_crash(app, tmp_path)
+    assert ScriptedNodes.llm_calls == 2 * TRIAGE + 3 * APPROVAL
+
+    ScriptedNodes.llm_enabled = False
+    manager = make_manager(tmp_path)
+    assert manager.workflow_manager.active_ids() == set()
+
+    start = time.perf_counter()
+    counts = manager.recover_workflows()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < RECOVERY_BOUND
+    assert counts == {"waiting": TRIAGE + APPROVAL, "continued": 0, "finished": 0, "skipped": 0}
+
+    # Re-registered and waiting on the user
+    workflow_ids = {email["workflow_id"] for email in emails}
+    assert manager.workflow_manager.active_ids() == workflow_ids
+    assert {manager.workflow_manager.get_workflow(w)["status"] for w in workflow_ids} == {"waiting"}
+
+    # Marked as seen, so polling does not start them over
+    state = manager.mailboxes[0].state
+    assert {email["id"] for email in emails} <= state.current_email_ids
+
+    # The GUI's queues are refilled: NewEmail for all, then Notify (triage) or Approval (draft)
+    events = manager.communicator.drain_events(1000)
+    assert Counter(type(event) for event in events) == {
+        NewEmailEvent: TRIAGE + APPROVAL, NotifyEvent: TRIAGE, ApprovalEvent: APPROVAL,
+    }
+    notified = {event.id for event in events if isinstance(event, NotifyEvent)}
+    approvals = {event.id: event.draft for event in events if isinstance(event, ApprovalEvent)}
+    assert notified == {email["id"] for email in emails[:TRIAGE]}
+    assert approvals == {email["id"]: "Draft reply" for email in emails[TRIAGE:]}
+    for event in events:
+        if isinstance(event, NewEmailEvent):
+            assert event.body.startswith("Body ")
+
+    assert ScriptedNodes.llm_calls == 2 * TRIAGE + 3 * APPROVAL